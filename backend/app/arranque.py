@@ -0,0 +1,139 @@
+# backend/app/arranque.py
+"""
+Arranque de cada worker (lifespan de app/main.py) y estado para /health.
+
+Importar app.main no abre ninguna conexión. En el lifespan, una vez por worker:
+
+1. esquema: la revisión de alembic_version tiene que ser la cabeza de migrations/.
+   No se crea ni se altera ninguna tabla; el esquema se actualiza con
+   `alembic upgrade head` antes del despliegue. Solo fuera de producción
+   (ENTORNO distinto de "produccion") y con ARRANQUE_MIGRAR=1 se ejecuta aquí.
+2. catálogo de códigos de turno en memoria (services/codigos.py).
+3. precarga de lo que usan los reportes: mappers del ORM configurados, años de
+   festivos alrededor del actual expandidos en festivos_fecha (si no, la primera
+   consulta de un año los expande dentro de la petición) y la consulta de
+   usuarios de los reportes ya compilada.
+4. trabajos en segundo plano: se encolan los pendientes y se dan por fallidos los
+   que dejó a medias un worker caído (services/trabajos.py).
+
+Si la base no responde o el esquema no está al día el worker arranca igual, sin
+listo=True (/health/ready da 503), y reintenta cada ARRANQUE_REINTENTO_S segundos.
+"""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Callable, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+from starlette.concurrency import run_in_threadpool
+from app import database
+from app.routers.reportes import get_usuarios_reporte
+from app.schemas.reporte import ReporteRequest
+from app.services.codigos import cargar_catalogo
+from app.services.festivos import VENTANA_YEARS, asegurar_years
+from app.services.trabajos import recuperar_trabajos
+
+logger = logging.getLogger(__name__)
+
+ENTORNO = os.getenv("ENTORNO", "produccion").strip().lower()
+MIGRAR_AL_ARRANCAR = os.getenv("ARRANQUE_MIGRAR", "0") == "1" and ENTORNO != "produccion"
+REINTENTO_S = float(os.getenv("ARRANQUE_REINTENTO_S", "5"))
+
+RUTA_ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+class EsquemaDesactualizado(Exception):
+    """La revisión de la base no coincide con la cabeza de las migraciones"""
+
+@dataclass
+class EstadoArranque:
+    listo: bool = False
+    revision: Optional[str] = None
+    error: Optional[str] = None
+    intentos: int = 0
+    importacion_s: Optional[float] = None  # import de app.main
+    arranque_s: Optional[float] = None  # último intento del lifespan, todos los pasos
+    pasos_s: dict[str, float] = field(default_factory=dict)
+
+estado = EstadoArranque()
+
+def cabezas_migraciones() -> set[str]:
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+    return set(ScriptDirectory.from_config(Config(str(RUTA_ALEMBIC_INI))).get_heads())
+
+def migrar():
+    from alembic import command
+    from alembic.config import Config
+    command.upgrade(Config(str(RUTA_ALEMBIC_INI)), "head")
+
+def verificar_esquema() -> str:
+    """Revisión actual de la base; EsquemaDesactualizado si no es la cabeza de migrations/"""
+    from alembic.runtime.migration import MigrationContext
+    with database.engine.connect() as conexion:
+        actuales = set(MigrationContext.configure(conexion).get_current_heads())
+    cabezas = cabezas_migraciones()
+    if actuales != cabezas:
+        raise EsquemaDesactualizado(
+            f"Base en {', '.join(sorted(actuales)) or 'ninguna revisión'}, "
+            f"migraciones en {', '.join(sorted(cabezas))}: falta `alembic upgrade head`"
+        )
+    return ", ".join(sorted(actuales))
+
+def cargar_codigos():
+    db = database.SessionLocal()
+    try:
+        cargar_catalogo(db)
+    finally:
+        db.close()
+
+def precargar_reportes():
+    configure_mappers()
+    db = database.SessionLocal()
+    try:
+        asegurar_years(db, (date.today().year + d for d in VENTANA_YEARS))
+        db.commit()
+        get_usuarios_reporte(ReporteRequest(year=date.today().year), db)
+    finally:
+        db.close()
+
+def _paso(nombre: str, funcion: Callable):
+    inicio = time.perf_counter()
+    try:
+        return funcion()
+    finally:
+        estado.pasos_s[nombre] = round(time.perf_counter() - inicio, 4)
+
+def arrancar() -> bool:
+    """Ejecuta todos los pasos; nunca lanza, el resultado queda en `estado`"""
+    inicio = time.perf_counter()
+    estado.intentos += 1
+    try:
+        if MIGRAR_AL_ARRANCAR:
+            _paso("migracion", migrar)
+        estado.revision = _paso("esquema", verificar_esquema)
+        _paso("codigos", cargar_codigos)
+        _paso("reportes", precargar_reportes)
+        _paso("trabajos", recuperar_trabajos)
+        estado.listo, estado.error = True, None
+    except Exception as e:
+        estado.listo, estado.error = False, str(e)
+        logger.error("Arranque incompleto (intento %s): %s", estado.intentos, e)
+    estado.arranque_s = round(time.perf_counter() - inicio, 4)
+    if estado.listo:
+        logger.info("Worker listo: importación %.3f s, arranque %.3f s %s",
+                    estado.importacion_s or 0, estado.arranque_s, estado.pasos_s)
+    return estado.listo
+
+async def reintentar():
+    """Repite el arranque hasta que termina bien (tarea de fondo del lifespan)"""
+    while not estado.listo:
+        await asyncio.sleep(REINTENTO_S)
+        await run_in_threadpool(arrancar)
+
+def comprobar_conexion():
+    with database.engine.connect() as conexion:
+        conexion.execute(text("SELECT 1"))
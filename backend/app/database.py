@@ -1,22 +1,167 @@
 # backend/app/database.py
+from typing import Optional
+from fastapi import Header
 from sqlalchemy import create_engine
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 import os
 from dotenv import load_dotenv
+from .monitor_pool import QueuePoolMedido, AsyncQueuePoolMedido
+from .replicas import (
+    CLAVE_REPLICA, DESCRIPCION_CONSISTENCIA, Replica, SelectorReplicas, consistencia_fuerte, nombre_replica
+)
 
 load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# "sync": rutas def sobre el threadpool (por defecto). "async": rutas async def sobre AsyncSession
+DB_MODO = os.getenv("DB_MODO", "sync").lower()
+
+# Réplicas de lectura (ver replicas.py); sin ninguna, get_read_db usa la primaria
+URLS_LECTURA = [
+    url.strip() for url in (os.getenv("DATABASE_READ_URLS") or os.getenv("DATABASE_READ_URL") or "").split(",")
+    if url.strip()
+]
+
+def _env_bool(nombre: str, defecto: bool) -> bool:
+    return os.getenv(nombre, str(defecto)).strip().lower() in ("1", "true", "si", "yes")
+
+def opciones_pool(url: str, asincrono: bool = False) -> dict:
+    """Parámetros del pool desde el entorno (DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING)"""
+    opciones = {
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),  # segundos; -1 desactiva
+    }
+    if not url.startswith("sqlite"):
+        # SQLite usa su propio pool; tamaño, overflow y timeout solo aplican a QueuePool
+        opciones.update(
+            poolclass=AsyncQueuePoolMedido if asincrono else QueuePoolMedido,
+            pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        )
+    return opciones
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **opciones_pool(SQLALCHEMY_DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+def insert_dialecto(db):
+    """INSERT con soporte de ON CONFLICT del dialecto de la sesión"""
+    dialecto = db.get_bind().dialect.name
+    if dialecto == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialecto == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"INSERT ... ON CONFLICT no soportado para '{dialecto}'")
+    return insert
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def url_async(url: str) -> str:
+    """Misma base de datos con el driver asíncrono (asyncpg / aiosqlite)"""
+    driver, resto = url.split("://", 1)
+    if driver.startswith("postgresql"):
+        return "postgresql+asyncpg://" + resto
+    if driver.startswith("sqlite"):
+        return "sqlite+aiosqlite://" + resto
+    return url
+
+async_engine = None
+AsyncSessionLocal = None
+if DB_MODO == "async":
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_engine = create_async_engine(
+        url_async(SQLALCHEMY_DATABASE_URL),
+        **opciones_pool(SQLALCHEMY_DATABASE_URL, asincrono=True)
+    )
+    # expire_on_commit=False: los objetos devueltos se serializan fuera de la sesión
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+replicas_lectura = SelectorReplicas(
+    [
+        Replica(
+            nombre_replica(url),
+            create_engine(url, **opciones_pool(url)),
+            create_async_engine(url_async(url), **opciones_pool(url, asincrono=True)) if DB_MODO == "async" else None,
+        )
+        for url in URLS_LECTURA
+    ],
+    estrategia=os.getenv("DB_LECTURA_SELECCION", "round_robin").strip().lower(),
+    reintento_s=float(os.getenv("DB_LECTURA_REINTENTO_S", "30")),
+)
+
+# Clave de session.info en las sesiones de abrir_sesion_lectura (réplica o primaria): nadie hace commit en ellas
+CLAVE_SOLO_LECTURA = "solo_lectura"
+
+def es_sesion_replica(db) -> bool:
+    """True si la sesión (sync o async) está abierta en una réplica: no se puede escribir en ella"""
+    return CLAVE_REPLICA in db.info
+
+def es_sesion_lectura(db) -> bool:
+    """True si la sesión (sync o async) es de una ruta de solo lectura: lo que se escriba en ella no se guarda"""
+    return CLAVE_SOLO_LECTURA in db.info
+
+def abrir_sesion_lectura(fuerte: bool = False) -> Session:
+    """Sesión en la primera réplica que dé conexión; en la primaria si no hay, si fallan todas o con `fuerte`"""
+    if not fuerte:
+        for replica in replicas_lectura.candidatas():
+            db = SessionLocal(bind=replica.engine)
+            try:
+                db.connection()
+            except DBAPIError as e:
+                db.close()
+                replicas_lectura.apartar(replica, e)
+                continue
+            db.info[CLAVE_REPLICA] = replica.nombre
+            db.info[CLAVE_SOLO_LECTURA] = True
+            return db
+    db = SessionLocal()
+    db.info[CLAVE_SOLO_LECTURA] = True
+    return db
+
+def get_read_db(x_consistencia: Optional[str] = Header(None, description=DESCRIPCION_CONSISTENCIA)):
+    """Como get_db, para rutas que solo leen (ver replicas.py)"""
+    db = abrir_sesion_lectura(consistencia_fuerte(x_consistencia))
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def abrir_sesion_lectura_async(fuerte: bool = False):
+    if not fuerte:
+        for replica in replicas_lectura.candidatas():
+            db = AsyncSessionLocal(bind=replica.engine_async)
+            try:
+                await db.connection()
+            except DBAPIError as e:
+                await db.close()
+                replicas_lectura.apartar(replica, e)
+                continue
+            db.info[CLAVE_REPLICA] = replica.nombre
+            db.info[CLAVE_SOLO_LECTURA] = True
+            return db
+    db = AsyncSessionLocal()
+    db.info[CLAVE_SOLO_LECTURA] = True
+    return db
+
+async def get_async_read_db(x_consistencia: Optional[str] = Header(None, description=DESCRIPCION_CONSISTENCIA)):
+    db = await abrir_sesion_lectura_async(consistencia_fuerte(x_consistencia))
+    try:
+        yield db
+    finally:
+        await db.close()
@@ -1,18 +1,41 @@
 # backend/app/main.py
+import time
+_inicio_importacion = time.perf_counter()
+
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .routers import usuarios, roles,turnos, festivos,reportes
+from fastapi.middleware.gzip import GZipMiddleware
+from .routers import usuarios, roles,turnos, festivos,reportes, admin, codigos, salud, trabajos
+from . import database
 from .database import engine
-from .models import base
+from .routers.asincrono import version_asincrona
+from .perfilado import PERFILADO_ACTIVO, instalar_perfilado
+from starlette.concurrency import run_in_threadpool
+from . import arranque
+from .services.trabajos import ejecutor as ejecutor_trabajos
+
+# El esquema lo crea y actualiza Alembic (desde backend/: alembic upgrade head); al
+# importar no se abre ninguna conexión. El lifespan solo lo comprueba (ver app/arranque.py)
 
-# Crear tablas si no existen (solo en desarrollo)
-# En producción usar Alembic
-base.Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Esquema, catálogo de códigos y precarga de reportes; si falla, se reintenta en segundo plano
+    reintento = None
+    if not await run_in_threadpool(arranque.arrancar):
+        reintento = asyncio.create_task(arranque.reintentar())
+    yield
+    if reintento is not None:
+        reintento.cancel()
+    # Los trabajos en curso paran en su siguiente paso y vuelven a pendiente (ver services/trabajos.py)
+    await run_in_threadpool(ejecutor_trabajos.detener)
 
 app = FastAPI(
     title="Gestor de Turnos - Fase 1",
     description="API para gestión de usuarios, ausencias y turnos.",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -21,15 +44,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Cursor-Cambios"],  # la lee el cliente para sincronizar con /turnos/cambios
 )
 
-app.include_router(usuarios.router)
-app.include_router(roles.router)
-app.include_router(turnos.router)
-#app.include_router(ausencias.router)
-app.include_router(festivos.router)
-app.include_router(reportes.router)
+# Comprime respuestas grandes (mes de turnos, reportes anuales)
+app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=5)
+
+# Perfilado de SQL por petición: cabecera Server-Timing, aviso de N+1 y log de lentas
+if PERFILADO_ACTIVO:
+    instalar_perfilado(app, [engine, database.async_engine])
+
+routers_api = [usuarios.router, roles.router, turnos.router, festivos.router, reportes.router, codigos.router]
+#routers_api.append(ausencias.router)
+if database.DB_MODO == "async":
+    # Mismos endpoints como async def sobre AsyncSession (ver routers/asincrono.py)
+    routers_api = [version_asincrona(r) for r in routers_api]
+for router in routers_api:
+    app.include_router(router)
+app.include_router(admin.router)
+# Los trabajos se ejecutan en hilos propios con sesiones síncronas, también con DB_MODO=async
+app.include_router(trabajos.router)
+app.include_router(salud.router)
 
 @app.get("/")
 def read_root():
-    return {"mensaje": "Bienvenido al Gestor de Turnos - Backend"}
\ No newline at end of file
+    return {"mensaje": "Bienvenido al Gestor de Turnos - Backend"}
+
+arranque.estado.importacion_s = round(time.perf_counter() - _inicio_importacion, 4)
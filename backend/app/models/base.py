@@ -1,4 +1,20 @@
 # backend/app/models/base.py
+from sqlalchemy import TIMESTAMP
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.sql.expression import FunctionElement
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+class ahora_utc(FunctionElement):
+    """Hora actual en UTC sin zona. now() en Postgres da la hora local del servidor en columnas TIMESTAMP"""
+    type = TIMESTAMP()
+    inherit_cache = True
+
+@compiles(ahora_utc)
+def _ahora_utc(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"  # SQLite: ya es UTC
+
+@compiles(ahora_utc, "postgresql")
+def _ahora_utc_postgresql(element, compiler, **kw):
+    return "timezone('utc', now())"
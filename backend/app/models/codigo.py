@@ -0,0 +1,23 @@
+# backend/app/models/codigo.py
+from sqlalchemy import Column, Integer, String, Boolean
+from .base import Base
+
+class TurnoCodigo(Base):
+    """Catálogo de códigos de turno: horas, franja y tipo de ausencia de cada código"""
+    __tablename__ = "turnos_codigos"
+
+    codigo = Column(String(10), primary_key=True)
+    descripcion = Column(String(100), nullable=False)
+    horas = Column(Integer, nullable=False, default=0)
+    franja = Column(String(10), nullable=True)  # "mañana", "tarde" o "noche" (solo contables)
+    contable = Column(Boolean, nullable=False, default=False)  # cuenta como día/horas trabajadas
+    ausencia = Column(String(20), nullable=True)  # "vacaciones", "baja", "cumpleaños" o "descanso"
+    color = Column(String(8), nullable=True)  # ARGB, como en las exportaciones a Excel
+    hora_inicio = Column(Integer, nullable=True)  # hora de entrada (0-23); con horas da el fin, para los descansos
+
+class TurnoCodigoVersion(Base):
+    """Fila única (id = 1) que sube con cada cambio del catálogo; cada worker recarga el suyo al verla cambiar"""
+    __tablename__ = "turnos_codigos_version"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(Integer, nullable=False, default=0)
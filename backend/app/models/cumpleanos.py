@@ -0,0 +1,12 @@
+# backend/app/models/cumpleanos.py
+from sqlalchemy import Column, Integer, String, TIMESTAMP, func
+from .base import Base
+
+class CumpleanosProcesado(Base):
+    """Meses cuyos cumpleaños ya se asignaron, con la firma de usuarios usada"""
+    __tablename__ = "cumpleanos_procesados"
+
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    firma = Column(String(100), nullable=False)  # Cambia si se altera algún usuario
+    procesado_en = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
@@ -1,5 +1,5 @@
 # backend/app/models/festivo.py
-from sqlalchemy import Column, Integer, String, TIMESTAMP, func
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, TIMESTAMP, func
 
 from .base import Base
 
@@ -7,8 +7,26 @@ class FestivoMadrid(Base):
     __tablename__ = "festivos_madrid_espana"
 
     id = Column(Integer, primary_key=True, index=True)
-    dia_mes = Column(String(5), nullable=False)  # Formato: "01/01"
+    regla = Column(String(10), nullable=False, default="fijo")  # "fijo", "pascua" o "unico"
+    dia_mes = Column(String(5), nullable=True)  # regla "fijo". Formato: "01/01"
+    desplazamiento_pascua = Column(Integer, nullable=True)  # regla "pascua": días respecto al Domingo de Pascua (-2 = Viernes Santo)
+    fecha = Column(Date, nullable=True)  # regla "unico": festivo de un solo año
     descripcion = Column(String(255), nullable=False)
     tipo = Column(String(20), nullable=False)  # "Nacional" o "Madrid"
     estado = Column(String(20), default="activo")
-    created_at = Column(TIMESTAMP, server_default=func.now())
\ No newline at end of file
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+class FestivoFecha(Base):
+    """Festivos activos expandidos a fechas concretas, año a año"""
+    __tablename__ = "festivos_fecha"
+
+    festivo_id = Column(Integer, ForeignKey("festivos_madrid_espana.id", ondelete="CASCADE"), primary_key=True)
+    fecha = Column(Date, primary_key=True, index=True)
+    year = Column(Integer, nullable=False, index=True)
+
+class FestivoYear(Base):
+    """Años ya expandidos en festivos_fecha (aunque no tengan festivos)"""
+    __tablename__ = "festivos_years"
+
+    year = Column(Integer, primary_key=True)
+    generado_en = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
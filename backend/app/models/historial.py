@@ -0,0 +1,42 @@
+# backend/app/models/historial.py
+from sqlalchemy import Column, Integer, BigInteger, Date, String, Boolean, JSON, TIMESTAMP, Index
+from .base import Base, ahora_utc
+
+class TurnoHistorial(Base):
+    """
+    Histórico de solo inserción de turnos_asignados: cada escritura de la API deja una
+    fila por celda con el valor anterior y el nuevo (turno null = la celda no existe).
+    seq es el mismo de turnos_cambios; a diferencia de este, no se poda.
+    """
+    __tablename__ = "turnos_historial"
+
+    seq = Column(BigInteger, primary_key=True, autoincrement=False)
+    usuario_id = Column(Integer, nullable=False)  # sin FK: el histórico sobrevive al usuario
+    fecha = Column(Date, nullable=False)
+    turno = Column(String(10), nullable=True)
+    es_reten = Column(Boolean, nullable=True)
+    modificado_manual = Column(Boolean, nullable=True)
+    turno_anterior = Column(String(10), nullable=True)
+    es_reten_anterior = Column(Boolean, nullable=True)
+    modificado_manual_anterior = Column(Boolean, nullable=True)
+    registrado_at = Column(TIMESTAMP, server_default=ahora_utc(), nullable=False)  # UTC
+
+    __table_args__ = (
+        Index('ix_turnos_historial_fecha_seq', 'fecha', 'seq'),
+        Index('ix_turnos_historial_usuario_fecha', 'usuario_id', 'fecha'),
+    )
+
+class TurnoInstantanea(Base):
+    """Rejilla completa de un mes en un momento; punto de partida para reconstruir el pasado"""
+    __tablename__ = "turnos_instantaneas"
+
+    id = Column(Integer, primary_key=True)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    seq = Column(BigInteger, nullable=False)  # todo cambio con seq <= este ya está en `celdas`
+    tomada_at = Column(TIMESTAMP, server_default=ahora_utc(), nullable=False)  # UTC
+    celdas = Column(JSON, nullable=False)  # [[usuario_id, día del mes, turno, es_reten, modificado_manual], ...]
+
+    __table_args__ = (
+        Index('ix_turnos_instantaneas_mes', 'year', 'month', 'tomada_at'),
+    )
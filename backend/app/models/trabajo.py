@@ -0,0 +1,33 @@
+# backend/app/models/trabajo.py
+from sqlalchemy import Column, Integer, String, Float, Boolean, Text, JSON, TIMESTAMP, func, Index
+from sqlalchemy.orm import deferred
+from .base import Base
+
+class Trabajo(Base):
+    """
+    Operación pesada ejecutada en segundo plano (POST /jobs, ver services/trabajos.py).
+    estado: pendiente -> en_curso -> completado | error | cancelado
+    """
+    __tablename__ = "trabajos"
+
+    id = Column(Integer, primary_key=True)
+    tipo = Column(String(30), nullable=False)
+    parametros = Column(JSON, nullable=False)
+    estado = Column(String(20), nullable=False, default="pendiente")
+    progreso = Column(Float, nullable=False, default=0)  # 0 a 1
+    mensaje = Column(String(200), nullable=True)
+    cancelar = Column(Boolean, nullable=False, default=False)  # pedido por el cliente; el trabajo para en su siguiente paso
+    error = Column(Text, nullable=True)
+    # Resultado: JSON (diferido para no cargarlo al consultar el estado) o fichero en TRABAJOS_DIR
+    resultado = deferred(Column(JSON, nullable=True))
+    ruta_fichero = Column(String(100), nullable=True)  # nombre dentro de TRABAJOS_DIR
+    nombre_fichero = Column(String(200), nullable=True)
+    tipo_medio = Column(String(100), nullable=True)
+    creado_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    iniciado_at = Column(TIMESTAMP, nullable=True)
+    actualizado_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)  # también latido mientras corre
+    terminado_at = Column(TIMESTAMP, nullable=True)
+
+    __table_args__ = (
+        Index('ix_trabajos_estado_creado', 'estado', 'creado_at'),
+    )
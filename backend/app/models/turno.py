@@ -1,5 +1,5 @@
 # backend/app/models/turno.py
-from sqlalchemy import Column, Integer, Date, String, Boolean, ForeignKey, TIMESTAMP, func, UniqueConstraint
+from sqlalchemy import Column, Integer, BigInteger, Date, String, Boolean, ForeignKey, TIMESTAMP, func, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from .base import Base
 
@@ -20,4 +20,53 @@ class Turno(Base):
     usuario = relationship("Usuario")
 
     # ✅ ¡AGREGA ESTA LÍNEA!
-    __table_args__ = (UniqueConstraint('usuario_id', 'fecha', name='uq_usuario_fecha'),)
\ No newline at end of file
+    # En Postgres la tabla está particionada por año de fecha (ver migrations/); ix_turnos_fecha
+    # sirve a las consultas por rango de fechas sin filtro de usuario (rejilla del mes)
+    __table_args__ = (
+        UniqueConstraint('usuario_id', 'fecha', name='uq_usuario_fecha'),
+        Index('ix_turnos_fecha', 'fecha'),
+    )
+
+class TurnoVersionMes(Base):
+    """Contador de escrituras por mes: se incrementa cada vez que cambia algún turno del mes"""
+    __tablename__ = "turnos_version_mes"
+
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=1)
+
+class TurnosYear(Base):
+    """Catálogo de años con turnos; lo mantiene registrar_escritura y lo lee /reportes/years"""
+    __tablename__ = "turnos_years"
+
+    year = Column(Integer, primary_key=True)
+
+class TurnoCambio(Base):
+    """
+    Registro de cambios de turnos_asignados para /turnos/cambios: una fila por celda
+    (usuario, fecha) escrita, con su estado tras la escritura; eliminado = lápida.
+    """
+    __tablename__ = "turnos_cambios"
+
+    seq = Column(BigInteger, primary_key=True, autoincrement=False)  # la asigna TurnoCambioContador
+    usuario_id = Column(Integer, nullable=False)  # sin FK: la lápida sobrevive al usuario
+    fecha = Column(Date, nullable=False)
+    turno_id = Column(Integer, nullable=True)
+    turno = Column(String(10), nullable=True)
+    es_reten = Column(Boolean, nullable=True)
+    generado_automático = Column(Boolean, nullable=True)
+    modificado_manual = Column(Boolean, nullable=True)
+    estado = Column(String(20), nullable=True)
+    eliminado = Column(Boolean, nullable=False, default=False)
+    registrado_at = Column(TIMESTAMP, server_default=func.now())
+
+    __table_args__ = (
+        Index('ix_turnos_cambios_registrado_at', 'registrado_at'),
+    )
+
+class TurnoCambioContador(Base):
+    """Fila única (id = 1) con el último seq repartido en turnos_cambios"""
+    __tablename__ = "turnos_cambios_contador"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    seq = Column(BigInteger, nullable=False, default=0)
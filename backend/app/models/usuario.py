@@ -1,5 +1,5 @@
 # backend/app/models/usuario.py
-from sqlalchemy import Column, Integer, String, Date, TIMESTAMP, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Date, TIMESTAMP, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from .base import Base
 
@@ -19,4 +19,19 @@ class Usuario(Base):
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
-    rol = relationship("Rol")
\ No newline at end of file
+    rol = relationship("Rol")
+
+    # Filtros del listado paginado (GET /usuarios): terminan en id para servir el orden del cursor.
+    # Los de nombre son por prefijo sin mayúsculas: lower(col) LIKE 'x%' (varchar_pattern_ops en PostgreSQL)
+    __table_args__ = (
+        Index("ix_usuarios_rol_estado", "rol_id", "estado", "id"),
+        Index("ix_usuarios_estado", "estado", "id"),
+        Index("ix_usuarios_fecha_ingreso", "fecha_ingreso"),
+        Index("ix_usuarios_fecha_salida", "fecha_salida"),
+        Index("ix_usuarios_nombres_lower", func.lower(nombres).label("nombres_lower"),
+              postgresql_ops={"nombres_lower": "varchar_pattern_ops"}),
+        Index("ix_usuarios_apellidos_lower", func.lower(apellidos).label("apellidos_lower"),
+              postgresql_ops={"apellidos_lower": "varchar_pattern_ops"}),
+        Index("ix_usuarios_usuario_lower", func.lower(usuario).label("usuario_lower"),
+              postgresql_ops={"usuario_lower": "varchar_pattern_ops"}),
+    )
\ No newline at end of file
@@ -0,0 +1,116 @@
+# backend/app/monitor_pool.py
+"""
+Estadísticas del pool de conexiones.
+
+Los contadores (conexiones abiertas, checkouts, checkins, invalidaciones) se
+recogen con los eventos de pool de SQLAlchemy. El tiempo que tarda cada checkout
+en conseguir conexión se mide en _do_get de las clases de pool de este módulo,
+porque no hay ningún evento que se dispare antes de esperar.
+"""
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+# Límites superiores (ms) de los tramos del histograma de espera
+TRAMOS_ESPERA_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+# Por debajo de este tiempo se considera que el checkout no ha esperado
+UMBRAL_ESPERA_MS = 1.0
+
+class EstadisticasPool:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.conexiones_abiertas = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidaciones = 0
+        self.esperas = 0
+        self.timeouts = 0
+        self.espera_total_ms = 0.0
+        self.espera_max_ms = 0.0
+        self.histograma = [0] * (len(TRAMOS_ESPERA_MS) + 1)
+
+    def escuchar(self, pool):
+        event.listen(pool, "connect", self._on_connect)
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "checkin", self._on_checkin)
+        event.listen(pool, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.conexiones_abiertas += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidaciones += 1
+
+    def registrar_espera(self, ms: float, timeout: bool = False):
+        tramo = next((i for i, limite in enumerate(TRAMOS_ESPERA_MS) if ms <= limite), len(TRAMOS_ESPERA_MS))
+        with self._lock:
+            self.histograma[tramo] += 1
+            self.espera_total_ms += ms
+            self.espera_max_ms = max(self.espera_max_ms, ms)
+            if ms > UMBRAL_ESPERA_MS:
+                self.esperas += 1
+            if timeout:
+                self.timeouts += 1
+
+    def instantanea(self, pool) -> dict:
+        with self._lock:
+            medidos = sum(self.histograma)
+            etiquetas = [f"<={l}ms" for l in TRAMOS_ESPERA_MS] + [f">{TRAMOS_ESPERA_MS[-1]}ms"]
+            return {
+                "tamano": pool.size(),
+                "en_uso": pool.checkedout(),
+                "libres": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "conexiones_abiertas": self.conexiones_abiertas,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidaciones": self.invalidaciones,
+                "esperas": self.esperas,
+                "timeouts": self.timeouts,
+                "espera_media_ms": round(self.espera_total_ms / medidos, 3) if medidos else 0.0,
+                "espera_max_ms": round(self.espera_max_ms, 3),
+                "histograma_espera": dict(zip(etiquetas, self.histograma)),
+            }
+
+class _EsperaMedida:
+    """Mixin para QueuePool: mide cuánto tarda cada checkout en obtener una conexión"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.estadisticas = EstadisticasPool()
+        self.estadisticas.escuchar(self)
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        timeout = False
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            timeout = True
+            raise
+        finally:
+            self.estadisticas.registrar_espera((time.perf_counter() - inicio) * 1000, timeout)
+
+class QueuePoolMedido(_EsperaMedida, QueuePool):
+    pass
+
+class AsyncQueuePoolMedido(_EsperaMedida, AsyncAdaptedQueuePool):
+    pass
+
+def estadisticas_engine(engine) -> dict | None:
+    """Instantánea del pool de un engine (sync o async); None si su pool no está medido"""
+    pool = getattr(engine, "sync_engine", engine).pool
+    estadisticas = getattr(pool, "estadisticas", None)
+    return estadisticas.instantanea(pool) if estadisticas else None
@@ -0,0 +1,194 @@
+# backend/app/perfilado.py
+"""
+Perfilado de SQL por petición (opcional, SQL_PERFIL=1).
+
+Cuenta las sentencias que lanza cada petición y el tiempo que pasan en la base
+de datos, y lo devuelve en la cabecera Server-Timing (visible en la pestaña
+Network del navegador). Si la misma forma de sentencia se repite más de
+SQL_PERFIL_N1_UMBRAL veces se marca la petición como N+1. Las sentencias que
+superan SQL_PERFIL_LENTA_MS se escriben con su plan (EXPLAIN) en SQL_PERFIL_LOG.
+
+Para tests hay un fixture en app/pytest_perfilado.py que usa contar_consultas().
+"""
+import contextvars
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+PERFILADO_ACTIVO = os.getenv("SQL_PERFIL", "0") == "1"
+UMBRAL_N1 = int(os.getenv("SQL_PERFIL_N1_UMBRAL", "5"))
+UMBRAL_LENTA_MS = float(os.getenv("SQL_PERFIL_LENTA_MS", "100"))
+FICHERO_LENTAS = os.getenv("SQL_PERFIL_LOG", "sql_lentas.log")
+# Sentencias más lentas que se detallan en Server-Timing
+MAX_DETALLE = 3
+
+logger = logging.getLogger("app.perfilado")
+
+_perfil_actual: contextvars.ContextVar = contextvars.ContextVar("perfil_sql", default=None)
+# Perfiles de contar_consultas(): reciben todas las sentencias, sea cual sea el hilo
+_observadores: set = set()
+_lock_observadores = threading.Lock()
+_engines_instalados: set = set()
+
+_RE_LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_RE_LISTAS = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|%s|:\w+|\$\d+)\s*,?)+\)")
+_RE_ESPACIOS = re.compile(r"\s+")
+
+def forma_sentencia(statement: str) -> str:
+    """Sentencia sin literales ni longitud de listas IN, para agrupar repeticiones"""
+    forma = _RE_LITERALES.sub("?", statement)
+    forma = _RE_LISTAS.sub("(?)", forma)
+    return _RE_ESPACIOS.sub(" ", forma).strip()
+
+class PerfilConsultas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.consultas = 0
+        self.tiempo_ms = 0.0
+        self.formas: Counter = Counter()
+        self.sentencias: list[tuple[float, str]] = []
+
+    def registrar(self, statement: str, ms: float):
+        with self._lock:
+            self.consultas += 1
+            self.tiempo_ms += ms
+            self.formas[forma_sentencia(statement)] += 1
+            self.sentencias.append((ms, statement))
+
+    def mas_lentas(self, n: int = MAX_DETALLE) -> list[tuple[float, str]]:
+        return sorted(self.sentencias, key=lambda s: s[0], reverse=True)[:n]
+
+    def repetidas(self, umbral: int = UMBRAL_N1) -> list[tuple[str, int]]:
+        """Formas de sentencia que se repiten más de `umbral` veces (sospechosas de N+1)"""
+        return [(forma, n) for forma, n in self.formas.most_common() if n > umbral]
+
+    def server_timing(self) -> str:
+        partes = [f'db;dur={self.tiempo_ms:.2f};desc="{self.consultas} consultas"']
+        for i, (ms, statement) in enumerate(self.mas_lentas(), start=1):
+            partes.append(f'sql-{i};dur={ms:.2f};desc="{_descripcion(statement)}"')
+        for forma, n in self.repetidas()[:1]:
+            partes.append(f'n1;desc="{n}x {_descripcion(forma)}"')
+        return ", ".join(partes)
+
+def _descripcion(statement: str, largo: int = 80) -> str:
+    texto = _RE_ESPACIOS.sub(" ", statement).strip().replace('"', "'").replace("\\", "")
+    return texto if len(texto) <= largo else texto[:largo - 3] + "..."
+
+# --- Eventos de SQLAlchemy ---
+
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("perfil_inicio", []).append(time.perf_counter())
+
+def _despues(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get("perfil_inicio")
+    if not inicios:
+        return
+    ms = (time.perf_counter() - inicios.pop()) * 1000
+    perfil = _perfil_actual.get()
+    if perfil is not None:
+        perfil.registrar(statement, ms)
+    if _observadores:
+        with _lock_observadores:
+            observadores = list(_observadores)
+        for observador in observadores:
+            if observador is not perfil:
+                observador.registrar(statement, ms)
+    if PERFILADO_ACTIVO and ms >= UMBRAL_LENTA_MS and not executemany:
+        _registrar_lenta(conn, statement, parameters, ms)
+
+def escuchar_engine(engine):
+    """Engancha el perfilado a un engine (sync o async); idempotente"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if id(sync_engine) in _engines_instalados:
+        return
+    event.listen(sync_engine, "before_cursor_execute", _antes)
+    event.listen(sync_engine, "after_cursor_execute", _despues)
+    _engines_instalados.add(id(sync_engine))
+
+# --- Log de sentencias lentas ---
+
+def _logger_lentas() -> logging.Logger:
+    log = logging.getLogger("app.perfilado.lentas")
+    if not log.handlers:
+        handler = logging.FileHandler(FICHERO_LENTAS, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        log.addHandler(handler)
+        log.setLevel(logging.INFO)
+        log.propagate = False
+    return log
+
+def _plan(conn, statement, parameters) -> str:
+    """EXPLAIN de una SELECT con un cursor aparte (el original aún tiene filas por leer)"""
+    if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return "(sin plan: no es una consulta de lectura)"
+    prefijo = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefijo + statement, parameters)
+        return "\n".join("    " + " | ".join(str(c) for c in fila) for fila in cursor.fetchall())
+    except Exception as e:
+        return f"(no se pudo obtener el plan: {e})"
+    finally:
+        cursor.close()
+
+def _registrar_lenta(conn, statement, parameters, ms):
+    try:
+        plan = _plan(conn, statement, parameters)
+        _logger_lentas().info("%.1f ms\n%s\nparámetros: %r\nplan:\n%s\n", ms, statement.strip(), parameters, plan)
+    except Exception:
+        logger.exception("Error registrando sentencia lenta")
+
+# --- Middleware y utilidades ---
+
+class PerfiladoSQLMiddleware:
+    """Middleware ASGI: un PerfilConsultas por petición y cabecera Server-Timing"""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        perfil = PerfilConsultas()
+        token = _perfil_actual.set(perfil)
+
+        async def enviar(message):
+            if message["type"] == "http.response.start":
+                cabeceras = MutableHeaders(scope=message)
+                cabeceras.append("Server-Timing", perfil.server_timing())
+                cabeceras.append("Timing-Allow-Origin", "*")
+                for forma, n in perfil.repetidas():
+                    logger.warning("Posible N+1 en %s %s: %dx %s", scope["method"], scope["path"], n, forma)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _perfil_actual.reset(token)
+
+def instalar_perfilado(app, engines):
+    """Añade el middleware y engancha los eventos a los engines dados"""
+    for engine in engines:
+        if engine is not None:
+            escuchar_engine(engine)
+    app.add_middleware(PerfiladoSQLMiddleware)
+
+@contextmanager
+def contar_consultas(*engines):
+    """Cuenta todas las sentencias ejecutadas dentro del bloque (en cualquier hilo)"""
+    for engine in engines:
+        escuchar_engine(engine)
+    perfil = PerfilConsultas()
+    with _lock_observadores:
+        _observadores.add(perfil)
+    try:
+        yield perfil
+    finally:
+        with _lock_observadores:
+            _observadores.discard(perfil)
@@ -0,0 +1,32 @@
+# backend/app/pytest_perfilado.py
+"""
+Plugin de pytest para limitar el número de consultas SQL de un endpoint.
+
+Activarlo en conftest.py con:
+
+    pytest_plugins = ["app.pytest_perfilado"]
+
+y usarlo en los tests:
+
+    def test_mes(client, max_consultas):
+        with max_consultas(4):
+            client.get("/turnos/mes/2025/3")
+"""
+from contextlib import contextmanager
+import pytest
+from app import database
+from app.perfilado import contar_consultas
+
+@pytest.fixture
+def max_consultas():
+    engines = [database.engine] + ([database.async_engine] if database.async_engine is not None else [])
+
+    @contextmanager
+    def limite(maximo: int):
+        with contar_consultas(*engines) as perfil:
+            yield perfil
+        if perfil.consultas > maximo:
+            detalle = "\n".join(f"  {n}x {forma}" for forma, n in perfil.formas.most_common(5))
+            pytest.fail(f"{perfil.consultas} consultas SQL (máximo {maximo}):\n{detalle}", pytrace=False)
+
+    return limite
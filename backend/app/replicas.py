@@ -0,0 +1,100 @@
+# backend/app/replicas.py
+"""
+Réplicas de lectura (opcional, DATABASE_READ_URLS).
+
+Con DATABASE_READ_URLS (URLs separadas por comas) o DATABASE_READ_URL, las rutas
+de solo lectura (database.get_read_db: reportes, rejilla del mes, listados) abren
+su sesión en una réplica; todo lo que escribe sigue yendo a DATABASE_URL. La
+réplica se elige según DB_LECTURA_SELECCION:
+
+- round_robin: por turno (por defecto)
+- menos_conexiones: la que tiene menos conexiones de su pool en uso en este worker
+  (a igualdad, por turno)
+
+Una réplica que no da conexión se aparta DB_LECTURA_REINTENTO_S segundos y se
+prueba la siguiente; si no queda ninguna se lee de la primaria.
+
+Las réplicas van con algo de retraso. Para ver lo que uno acaba de escribir, la
+petición lleva la cabecera `X-Consistencia: fuerte` y se atiende en la primaria
+(el cliente la manda un rato después de cada edición, ver frontend services/api.ts).
+/turnos/cambios y /turnos/stream siempre leen de la primaria: un cursor de una
+réplica atrasada es menor que el de la primaria y solo hace repetir cambios, pero
+uno de la primaria sería "del futuro" para una réplica y daría 410.
+"""
+import itertools
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+ESTRATEGIAS = ("round_robin", "menos_conexiones")
+
+# Clave de session.info con el nombre de la réplica en la que está abierta la sesión
+CLAVE_REPLICA = "replica"
+DESCRIPCION_CONSISTENCIA = "fuerte: leer de la base principal, no de una réplica (justo después de escribir)"
+
+class Replica:
+    def __init__(self, nombre: str, engine, engine_async=None):
+        self.nombre = nombre
+        self.engine = engine
+        self.engine_async = engine_async
+        self.apartada_hasta = 0.0
+        self.fallos = 0
+        self.ultimo_error: Optional[str] = None
+
+    @property
+    def en_uso(self) -> int:
+        total = 0
+        for engine in (self.engine, self.engine_async):
+            if engine is not None:
+                checkedout = getattr(getattr(engine, "sync_engine", engine).pool, "checkedout", None)
+                total += checkedout() if checkedout else 0
+        return total
+
+class SelectorReplicas:
+    def __init__(self, replicas: list[Replica], estrategia: str = "round_robin", reintento_s: float = 30):
+        if estrategia not in ESTRATEGIAS:
+            raise ValueError(f"DB_LECTURA_SELECCION no válida: {estrategia} (opciones: {', '.join(ESTRATEGIAS)})")
+        self.replicas = replicas
+        self.estrategia = estrategia
+        self.reintento_s = reintento_s
+        self._turno = itertools.count()
+
+    def candidatas(self) -> list[Replica]:
+        """Réplicas no apartadas, en el orden en que hay que probarlas"""
+        ahora = time.monotonic()
+        disponibles = [r for r in self.replicas if r.apartada_hasta <= ahora]
+        if not disponibles:
+            return []
+        inicio = next(self._turno) % len(disponibles)
+        orden = disponibles[inicio:] + disponibles[:inicio]
+        if self.estrategia == "menos_conexiones":
+            # sorted es estable: a igualdad de conexiones se sigue repartiendo por turno
+            return sorted(orden, key=lambda r: r.en_uso)
+        return orden
+
+    def apartar(self, replica: Replica, error: Exception) -> None:
+        replica.apartada_hasta = time.monotonic() + self.reintento_s
+        replica.fallos += 1
+        replica.ultimo_error = str(error).splitlines()[0] if str(error) else type(error).__name__
+        logger.warning("Réplica %s sin conexión, se aparta %s s: %s", replica.nombre, self.reintento_s, replica.ultimo_error)
+
+    def estado(self) -> list[dict]:
+        ahora = time.monotonic()
+        return [{
+            "nombre": r.nombre,
+            "disponible": r.apartada_hasta <= ahora,
+            "en_uso": r.en_uso,
+            "fallos": r.fallos,
+            "ultimo_error": r.ultimo_error,
+        } for r in self.replicas]
+
+def consistencia_fuerte(valor: Optional[str]) -> bool:
+    """Valor de la cabecera X-Consistencia"""
+    return (valor or "").strip().lower() == "fuerte"
+
+def nombre_replica(url: str) -> str:
+    """host[:puerto]/base de la URL, sin credenciales (para logs y /admin/pool)"""
+    resto = url.split("://", 1)[-1]
+    return resto.rsplit("@", 1)[-1] or url
@@ -0,0 +1,28 @@
+# backend/app/routers/admin.py
+from fastapi import APIRouter
+from app import database
+from app.monitor_pool import estadisticas_engine
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+# ✅ Estado del pool de conexiones (en uso, overflow, esperas e histograma de espera) y de las réplicas
+@router.get("/pool")
+def estado_pool():
+    pools = {"principal": estadisticas_engine(database.engine)}
+    if database.async_engine is not None:
+        pools["principal_async"] = estadisticas_engine(database.async_engine)
+    for replica in database.replicas_lectura.replicas:
+        pools[f"replica {replica.nombre}"] = estadisticas_engine(replica.engine)
+        if replica.engine_async is not None:
+            pools[f"replica {replica.nombre} async"] = estadisticas_engine(replica.engine_async)
+    return {
+        "configuracion": {
+            clave: valor for clave, valor in database.opciones_pool(database.SQLALCHEMY_DATABASE_URL).items()
+            if clave != "poolclass"
+        },
+        "pools": pools,
+        "replicas": {
+            "seleccion": database.replicas_lectura.estrategia,
+            "estado": database.replicas_lectura.estado(),
+        },
+    }
@@ -0,0 +1,112 @@
+# backend/app/routers/asincrono.py
+"""
+Versión async def de los routers para DB_MODO=async.
+
+Cada ruta que depende de get_db (o get_read_db) se vuelve a registrar como
+corrutina que recibe una AsyncSession (get_async_db o get_async_read_db) y
+ejecuta el manejador original con AsyncSession.run_sync. La E/S con la base de datos la hace el driver asíncrono,
+así que una petición que espera a Postgres no ocupa un hilo del threadpool.
+La lógica de cada endpoint sigue estando en un único sitio.
+
+run_sync ejecuta el manejador en el hilo del bucle de eventos: mientras calcula,
+no se atiende ninguna otra petición (ni los streams SSE). Los manejadores con
+trabajo de CPU apreciable (reportes, rejilla del mes, validación, rotación) tienen
+su propia corrutina, registrada con @implementacion_async(manejador): espera sus
+consultas con `await db.execute(select(...))` (las pequeñas, con db.run_sync) y
+calcula con run_in_threadpool sobre las filas ya leídas. Lo que devuelve se valida
+y serializa con el response_model de la ruta también en el threadpool.
+"""
+import inspect
+from functools import lru_cache
+from fastapi import APIRouter, Depends, params
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+from starlette.concurrency import run_in_threadpool
+from app import database
+
+# Dependencia síncrona -> su equivalente con AsyncSession
+DEPENDENCIAS_ASYNC = {
+    database.get_db: database.get_async_db,
+    database.get_read_db: database.get_async_read_db,
+}
+
+def implementacion_async(endpoint):
+    """
+    Registra la corrutina que sustituye a `endpoint` con DB_MODO=async (ver arriba). Recibe
+    los mismos argumentos, con la AsyncSession en lugar de la Session
+    """
+    def decorador(corrutina):
+        endpoint.implementacion_async = corrutina
+        return corrutina
+    return decorador
+
+@lru_cache(maxsize=None)
+def _adaptador(modelo) -> TypeAdapter:
+    return TypeAdapter(modelo)
+
+def serializar(modelo, valor, status_code: int = 200, headers: dict | None = None) -> JSONResponse:
+    """Respuesta JSON de `valor` validado con `modelo`, como la de FastAPI; para run_in_threadpool"""
+    adaptador = _adaptador(modelo)
+    contenido = adaptador.dump_python(adaptador.validate_python(valor, from_attributes=True),
+                                      mode="json", by_alias=True)
+    return JSONResponse(content=contenido, status_code=status_code, headers=headers)
+
+def _parametro_db(endpoint) -> str | None:
+    for nombre, parametro in inspect.signature(endpoint).parameters.items():
+        if isinstance(parametro.default, params.Depends) and parametro.default.dependency in DEPENDENCIAS_ASYNC:
+            return nombre
+    return None
+
+def asincronizar(endpoint, response_model=None, status_code: int | None = None):
+    """Envuelve un manejador síncrono con get_db / get_read_db en una corrutina sobre AsyncSession"""
+    nombre_db = _parametro_db(endpoint)
+    if nombre_db is None or inspect.iscoroutinefunction(endpoint):
+        return endpoint
+    corrutina = getattr(endpoint, "implementacion_async", None)
+
+    async def envoltorio(**kwargs):
+        db_async = kwargs.pop(nombre_db)
+        if corrutina is None:
+            return await db_async.run_sync(lambda sesion: endpoint(**kwargs, **{nombre_db: sesion}))
+        resultado = await corrutina(**kwargs, **{nombre_db: db_async})
+        if response_model is None or isinstance(resultado, Response):
+            return resultado
+        return await run_in_threadpool(serializar, response_model, resultado, status_code or 200)
+
+    firma = inspect.signature(endpoint)
+    envoltorio.__signature__ = firma.replace(parameters=[
+        p.replace(default=Depends(DEPENDENCIAS_ASYNC[p.default.dependency])) if n == nombre_db else p
+        for n, p in firma.parameters.items()
+    ])
+    envoltorio.__name__ = endpoint.__name__
+    envoltorio.__qualname__ = endpoint.__qualname__
+    envoltorio.__doc__ = endpoint.__doc__
+    envoltorio.__module__ = endpoint.__module__
+    return envoltorio
+
+def version_asincrona(router: APIRouter) -> APIRouter:
+    """Copia del router con sus rutas de base de datos convertidas en async def"""
+    nuevo = APIRouter()
+    for ruta in router.routes:
+        if not isinstance(ruta, APIRoute):
+            nuevo.routes.append(ruta)
+            continue
+        nuevo.add_api_route(
+            ruta.path,
+            asincronizar(ruta.endpoint, ruta.response_model, ruta.status_code),
+            methods=list(ruta.methods),
+            response_model=ruta.response_model,
+            status_code=ruta.status_code,
+            tags=ruta.tags,
+            dependencies=ruta.dependencies,
+            summary=ruta.summary,
+            description=ruta.description,
+            response_description=ruta.response_description,
+            responses=ruta.responses,
+            deprecated=ruta.deprecated,
+            name=ruta.name,
+            include_in_schema=ruta.include_in_schema,
+            response_class=ruta.response_class,
+        )
+    return nuevo
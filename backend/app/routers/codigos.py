@@ -0,0 +1,94 @@
+# backend/app/routers/codigos.py
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from typing import List
+from app import database
+from app.models.codigo import TurnoCodigo
+from app.models.turno import Turno as TurnoModel
+from app.schemas import codigo as schemas
+from app.services.codigos import CLAVE_CATALOGO, leer_catalogo, publicar_catalogo, subir_version_catalogo
+from app.services.resumen import recalcular_meses
+
+router = APIRouter(prefix="/codigos", tags=["codigos"])
+
+# Campos que cambian los totales de resumen_mensual de los meses donde aparece el código
+CAMPOS_RESUMEN = ("horas", "contable", "ausencia")
+
+def _meses_con_codigo(db: Session, codigo: str) -> set[tuple[int, int]]:
+    filas = db.query(
+        func.extract('year', TurnoModel.fecha),
+        func.extract('month', TurnoModel.fecha)
+    ).filter(TurnoModel.turno == codigo).distinct().all()
+    return {(int(y), int(m)) for y, m in filas}
+
+def _guardar_catalogo(db: Session, meses: set[tuple[int, int]] = frozenset()):
+    """
+    Sube la versión, recalcula los meses afectados con el catálogo nuevo, hace commit y
+    solo entonces lo publica: hasta el commit las demás peticiones siguen con el anterior
+    """
+    db.flush()
+    subir_version_catalogo(db)
+    nuevo = leer_catalogo(db)
+    db.info[CLAVE_CATALOGO] = nuevo
+    try:
+        recalcular_meses(db, meses)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.info.pop(CLAVE_CATALOGO, None)
+    publicar_catalogo(nuevo)
+
+def _obtener(db: Session, codigo: str) -> TurnoCodigo:
+    db_codigo = db.get(TurnoCodigo, codigo)
+    if db_codigo is None:
+        raise HTTPException(status_code=404, detail="Código de turno no encontrado")
+    return db_codigo
+
+@router.get("/", response_model=List[schemas.TurnoCodigo])
+def listar_codigos(db: Session = Depends(database.get_db)):
+    return db.query(TurnoCodigo).order_by(TurnoCodigo.codigo).all()
+
+@router.get("/{codigo}", response_model=schemas.TurnoCodigo)
+def obtener_codigo(codigo: str, db: Session = Depends(database.get_db)):
+    return _obtener(db, codigo)
+
+@router.post("/", response_model=schemas.TurnoCodigo)
+def crear_codigo(codigo: schemas.TurnoCodigoCreate, db: Session = Depends(database.get_db)):
+    if db.get(TurnoCodigo, codigo.codigo) is not None:
+        raise HTTPException(status_code=400, detail="Ya existe ese código de turno")
+    db_codigo = TurnoCodigo(**codigo.model_dump())
+    db.add(db_codigo)
+    # Puede haber turnos con el código desde antes de darlo de alta
+    _guardar_catalogo(db, _meses_con_codigo(db, codigo.codigo))
+    db.refresh(db_codigo)
+    return db_codigo
+
+@router.patch("/{codigo}", response_model=schemas.TurnoCodigo)
+def actualizar_codigo(codigo: str, cambios: schemas.TurnoCodigoUpdate, db: Session = Depends(database.get_db)):
+    db_codigo = _obtener(db, codigo)
+    datos = cambios.model_dump(exclude_unset=True)
+    for key, value in datos.items():
+        setattr(db_codigo, key, value)
+    try:
+        schemas.validar_codigo(db_codigo.contable, db_codigo.franja, db_codigo.ausencia, db_codigo.hora_inicio)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    meses = _meses_con_codigo(db, codigo) if any(c in datos for c in CAMPOS_RESUMEN) else set()
+    _guardar_catalogo(db, meses)
+    db.refresh(db_codigo)
+    return db_codigo
+
+@router.delete("/{codigo}")
+def eliminar_codigo(codigo: str, db: Session = Depends(database.get_db)):
+    db_codigo = _obtener(db, codigo)
+    en_uso = db.query(TurnoModel.id).filter(TurnoModel.turno == codigo).first()
+    if en_uso is not None:
+        raise HTTPException(status_code=400, detail="El código está asignado en turnos y no se puede eliminar")
+    db.delete(db_codigo)
+    _guardar_catalogo(db)
+    return {"ok": True}
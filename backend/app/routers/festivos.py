@@ -1,36 +1,106 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import date
 from app.schemas import festivo as schemas
+from app.schemas.paginacion import Pagina
 from app.models import festivo as models
 from app import database
+from app.services.paginacion import paginar, LIMITE_DEFECTO, LIMITE_MAXIMO
+from app.services.festivos import asegurar_years, regenerar_festivos
+from app.services.resumen import recalcular_meses
 
 
 router = APIRouter(prefix="/festivos", tags=["festivos"])
 
-@router.get("/", response_model=List[schemas.Festivo])
-def listar_festivos(db: Session = Depends(database.get_db)):
-    return db.query(models.FestivoMadrid).all()
+def _aplicar_cambios_calendario(db: Session):
+    """Regenera festivos_fecha y los meses del resumen cuyas fechas festivas han cambiado"""
+    cambiadas = regenerar_festivos(db)
+    recalcular_meses(db, {(f.year, f.month) for f in cambiadas})
+
+@router.get("/", response_model=Pagina[schemas.Festivo])
+def listar_festivos(
+    cursor: Optional[str] = None,
+    limit: int = Query(LIMITE_DEFECTO, ge=1, le=LIMITE_MAXIMO),
+    estado: Optional[str] = None,
+    tipo: Optional[str] = None,
+    regla: Optional[str] = None,
+    db: Session = Depends(database.get_read_db)
+):
+    query = db.query(models.FestivoMadrid)
+    if estado is not None:
+        query = query.filter(models.FestivoMadrid.estado == estado)
+    if tipo is not None:
+        query = query.filter(models.FestivoMadrid.tipo == tipo)
+    if regla is not None:
+        query = query.filter(models.FestivoMadrid.regla == regla)
+
+    try:
+        filtros = {"estado": estado, "tipo": tipo, "regla": regla}
+        return paginar(query, models.FestivoMadrid.id, cursor, limit, filtros)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/", response_model=schemas.Festivo)
 def crear_festivo(festivo: schemas.FestivoCreate, db: Session = Depends(database.get_db)):
-    # Verificar si ya existe un festivo en esa fecha
+    # Verificar si ya existe un festivo con la misma regla y tipo
+    filtro_regla = {
+        "fijo": models.FestivoMadrid.dia_mes == festivo.dia_mes,
+        "pascua": models.FestivoMadrid.desplazamiento_pascua == festivo.desplazamiento_pascua,
+        "unico": models.FestivoMadrid.fecha == festivo.fecha,
+    }[festivo.regla]
     festivo_existente = db.query(models.FestivoMadrid).filter(
-        models.FestivoMadrid.dia_mes == festivo.dia_mes,
+        models.FestivoMadrid.regla == festivo.regla,
+        filtro_regla,
         models.FestivoMadrid.tipo == festivo.tipo
     ).first()
     
     if festivo_existente:
         raise HTTPException(status_code=400, detail="Ya existe un festivo en esta fecha y tipo")
     
-    db_festivo = models.FestivoMadrid(**festivo.dict())
+    db_festivo = models.FestivoMadrid(**festivo.model_dump())
     db.add(db_festivo)
+    db.flush()
+    _aplicar_cambios_calendario(db)
     db.commit()
     db.refresh(db_festivo)
     return db_festivo
 
+def _fechas_festivas(db: Session, inicio: date, fin: date) -> list:
+    return db.query(
+        models.FestivoFecha.fecha,
+        models.FestivoFecha.festivo_id,
+        models.FestivoMadrid.descripcion,
+        models.FestivoMadrid.tipo
+    ).join(
+        models.FestivoMadrid, models.FestivoMadrid.id == models.FestivoFecha.festivo_id
+    ).filter(
+        models.FestivoFecha.fecha >= inicio,
+        models.FestivoFecha.fecha < fin
+    ).order_by(models.FestivoFecha.fecha).all()
+
+# Fechas festivas concretas de un año (o mes), ya expandidas desde las reglas
+@router.get("/fechas", response_model=List[schemas.FestivoFechaDisplay])
+def listar_fechas_festivas(year: int, month: Optional[int] = None, db: Session = Depends(database.get_read_db)):
+    if month is not None and not 1 <= month <= 12:
+        raise HTTPException(status_code=400, detail="Mes no válido")
+
+    if month is None:
+        inicio, fin = date(year, 1, 1), date(year + 1, 1, 1)
+    else:
+        inicio = date(year, month, 1)
+        fin = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    if asegurar_years(db, [year]) and database.es_sesion_replica(db):
+        # Recién expandido en la primaria: la réplica aún no tiene esas fechas
+        primaria = database.abrir_sesion_lectura(fuerte=True)
+        try:
+            return _fechas_festivas(primaria, inicio, fin)
+        finally:
+            primaria.close()
+    return _fechas_festivas(db, inicio, fin)
+
 @router.get("/{festivo_id}", response_model=schemas.Festivo)
-def obtener_festivo(festivo_id: int, db: Session = Depends(database.get_db)):
+def obtener_festivo(festivo_id: int, db: Session = Depends(database.get_read_db)):
     festivo = db.query(models.FestivoMadrid).filter(
         models.FestivoMadrid.id == festivo_id
     ).first()
@@ -46,11 +116,18 @@ def actualizar_festivo(festivo_id: int, festivo: schemas.FestivoUpdate, db: Sess
     if db_festivo is None:
         raise HTTPException(status_code=404, detail="Festivo no encontrado")
     
-    for key, value in festivo.dict(exclude_unset=True).items():
+    for key, value in festivo.model_dump(exclude_unset=True).items():
         if value is not None:
             setattr(db_festivo, key, value)
+
+    try:
+        schemas.validar_regla(db_festivo.regla, db_festivo.dia_mes, db_festivo.desplazamiento_pascua, db_festivo.fecha)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
     
+    db.flush()
+    _aplicar_cambios_calendario(db)
     db.commit()
     db.refresh(db_festivo)
     return db_festivo
-
@@ -1,57 +1,48 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
-from datetime import date
+from sqlalchemy import func, cast, select, Date
+from starlette.concurrency import run_in_threadpool
+from typing import List, Literal, Optional
+from datetime import date, datetime, timedelta
+import os
 from app import database
+from app.routers.asincrono import implementacion_async
 from app.models import usuario as models_usuario
 from app.models.turno import Turno as TurnoModel
-from app.models.festivo import FestivoMadrid as FestivoModel
+from app.models.resumen import ResumenMensual
+from app.models.codigo import TurnoCodigo
+from app.services.resumen import years_con_turnos, resumen_al_dia
+from app.services.festivos import get_festivos_rango, fechas_festivas_query
+from app.services.codigos import catalogo
+from app.services.exportacion import (
+    Hoja, MESES, exportar, hoja_tabla, estilo_rol_tabla, tipo_medio, cabeceras_descarga
+)
 from app.schemas.reporte import (
     ReporteTrabajado, ReporteTurnos, ReporteFestivos, 
-    ReporteVacaciones, ReporteRequest
+    ReporteVacaciones, ReporteRequest,
+    PeriodoTrabajado, PeriodoTurnos, PeriodoVacaciones
 )
 
 router = APIRouter(prefix="/reportes", tags=["reportes"])
 
+# Los reportes anuales de turnos y vacaciones leen resumen_mensual (backfill: python -m app.services.resumen)
+USAR_RESUMEN = os.getenv("REPORTES_USAR_RESUMEN", "1") == "1"
+
 @router.get("/years", response_model=list[int])
-def obtener_years_disponibles(db: Session = Depends(database.get_db)):
-    """Devuelve los años distintos en los que existen turnos asignados (y opcionalmente festivos)."""
-    years_turnos = db.query(func.extract('year', TurnoModel.fecha).label('y')).distinct().all()
-    years = sorted({int(r.y) for r in years_turnos if r.y is not None})
-    return years
-
-def get_festivos_mes(year: int, month: int, db: Session):
-    """Obtiene festivos activos para un mes/año específico"""
-    festivos = db.query(FestivoModel).filter(
-        FestivoModel.estado == "activo"
-    ).all()
-    
-    festivos_fechas = set()
-    for festivo in festivos:
-        dia, mes = map(int, festivo.dia_mes.split('/'))
-        if mes == month:
-            try:
-                fecha_festivo = date(year, mes, dia)
-                festivos_fechas.add(fecha_festivo)
-            except ValueError:
-                continue
-    
-    return festivos_fechas
-
-def calcular_horas_turno(turno_codigo: str) -> int:
-    """Calcula horas según el tipo de turno"""
-    if turno_codigo in ['M', 'T', 'N']:
-        return 8
-    elif turno_codigo in ['FM1', 'FM2', 'FN1', 'FN2']:
-        return 12
-    return 0
-
-TURNOS_CONTABLES = {'M','T','N','FM1','FM2','FN1','FN2'}
+def obtener_years_disponibles(db: Session = Depends(database.get_read_db)):
+    """Devuelve los años en los que existen turnos asignados (catálogo turnos_years)."""
+    return years_con_turnos(db)
 
-@router.post("/trabajados", response_model=List[ReporteTrabajado])
-def reporte_dias_trabajados(request: ReporteRequest, db: Session = Depends(database.get_db)):
-    # Construir rango de fechas
+# Horas, franja y tipo de ausencia salen del join con turnos_codigos, así se calculan en la BD
+JOIN_CODIGO = TurnoCodigo.codigo == TurnoModel.turno
+ES_CONTABLE = TurnoCodigo.contable.is_(True)
+
+def rango_reporte(request: ReporteRequest) -> tuple[date, date]:
+    """Devuelve el rango [inicio, fin) del reporte: desde/hasta, el mes pedido o el año completo"""
+    if request.desde is not None:
+        return request.desde, request.hasta + timedelta(days=1)
     if request.month:
         start_date = date(request.year, request.month, 1)
         if request.month == 12:
@@ -61,218 +52,381 @@ def reporte_dias_trabajados(request: ReporteRequest, db: Session = Depends(datab
     else:
         start_date = date(request.year, 1, 1)
         end_date = date(request.year + 1, 1, 1)
-    
-    # Obtener festivos si es reporte mensual
-    festivos_set = set()
-    if request.month:
-        festivos_set = get_festivos_mes(request.year, request.month, db)
-    
-    # Determinar usuarios a consultar
+    return start_date, end_date
+
+def usar_resumen(request: ReporteRequest, db: Session) -> bool:
+    """resumen_mensual sirve para años completos, con o sin desglose mensual, si ya recoge todos sus turnos"""
+    return (
+        USAR_RESUMEN and request.year is not None and request.month is None and request.agrupar != "semana"
+        and resumen_al_dia(db, request.year)
+    )
+
+def inicio_periodo(fecha: date, agrupar: str) -> date:
+    """Primer día del mes o lunes de la semana de `fecha`"""
+    if agrupar == "mes":
+        return fecha.replace(day=1)
+    return fecha - timedelta(days=fecha.weekday())
+
+def periodos_rango(start_date: date, end_date: date, agrupar: str) -> list[date]:
+    """Inicios de todos los periodos que tocan [start_date, end_date)"""
+    periodos = []
+    periodo = inicio_periodo(start_date, agrupar)
+    while periodo < end_date:
+        periodos.append(periodo)
+        if agrupar == "mes":
+            periodo = date(periodo.year + periodo.month // 12, periodo.month % 12 + 1, 1)
+        else:
+            periodo += timedelta(days=7)
+    return periodos
+
+def periodo_sql(db: Session, agrupar: str, columna):
+    """Expresión SQL con el inicio del periodo (mes o semana ISO) de una columna fecha"""
+    dialecto = db.get_bind().dialect.name
+    if dialecto == "postgresql":
+        return cast(func.date_trunc("month" if agrupar == "mes" else "week", columna), Date)
+    if dialecto == "sqlite":
+        if agrupar == "mes":
+            return func.strftime("%Y-%m-01", columna)
+        # 'weekday 0' avanza al domingo (o se queda si ya lo es); 6 días antes es el lunes
+        return func.date(columna, "weekday 0", "-6 days")
+    raise NotImplementedError(f"Agrupación por periodo no soportada en {dialecto}")
+
+def a_fecha(valor) -> date:
+    """Normaliza el periodo devuelto por la BD (date, datetime o texto ISO en SQLite)"""
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, str):
+        return date.fromisoformat(valor)
+    return valor
+
+def filtros_usuarios_reporte(request: ReporteRequest) -> list:
+    """Condiciones sobre usuarios que entran en los reportes (jefes y operadores activos)"""
+    filtros = [
+        models_usuario.Usuario.estado == "activo",
+        models_usuario.Usuario.rol_id.in_([1, 2])
+    ]
     if request.usuario_id is not None:
-        usuarios = db.query(models_usuario.Usuario).filter(
-            models_usuario.Usuario.id == request.usuario_id,
-            models_usuario.Usuario.estado == "activo",
-            models_usuario.Usuario.rol_id.in_([1, 2])
-        ).all()
-    else:
-        usuarios = db.query(models_usuario.Usuario).filter(
-            models_usuario.Usuario.estado == "activo",
-            models_usuario.Usuario.rol_id.in_([1, 2])
-        ).all()
-    
+        filtros.append(models_usuario.Usuario.id == request.usuario_id)
+    return filtros
+
+def select_usuarios_reporte(request: ReporteRequest):
+    return select(models_usuario.Usuario).where(
+        *filtros_usuarios_reporte(request)
+    ).order_by(models_usuario.Usuario.id)
+
+def get_usuarios_reporte(request: ReporteRequest, db: Session) -> list:
+    return db.execute(select_usuarios_reporte(request)).scalars().all()
+
+async def get_usuarios_reporte_async(request: ReporteRequest, db: AsyncSession) -> list:
+    return (await db.execute(select_usuarios_reporte(request))).scalars().all()
+
+def comprobar_usuarios(usuarios: list) -> None:
     if not usuarios:
         raise HTTPException(status_code=404, detail="No se encontraron usuarios válidos")
-    
+
+def nombre_rol(rol_id: int) -> str:
+    return "Jefe de Turno" if rol_id == 1 else "Operador"
+
+# Cada reporte se reparte en sus consultas (select_*, compartidas por la versión síncrona y
+# la async) y una función que arma el reporte con las filas leídas, sin tocar la base
+
+def _select_trabajados(request: ReporteRequest, start_date: date, end_date: date):
+    """Una sola consulta agrupada para todos los usuarios: (usuario, fecha, código) con sus horas"""
+    return select(
+        TurnoModel.usuario_id,
+        TurnoModel.fecha,
+        TurnoModel.turno,
+        func.count().label('n'),
+        TurnoCodigo.horas.label('horas')
+    ).join(
+        models_usuario.Usuario, models_usuario.Usuario.id == TurnoModel.usuario_id
+    ).join(
+        TurnoCodigo, JOIN_CODIGO
+    ).where(
+        *filtros_usuarios_reporte(request),
+        TurnoModel.fecha >= start_date,
+        TurnoModel.fecha < end_date,
+        ES_CONTABLE
+    ).group_by(
+        TurnoModel.usuario_id, TurnoModel.fecha, TurnoModel.turno, TurnoCodigo.horas
+    ).order_by(
+        TurnoModel.usuario_id, TurnoModel.fecha, TurnoModel.turno
+    )
+
+def _reporte_trabajados(request: ReporteRequest, start_date: date, end_date: date,
+                        usuarios: list, filas: list, festivos_set: set[date]) -> list[ReporteTrabajado]:
+    filas_por_usuario: dict[int, list] = {}
+    for fila in filas:
+        filas_por_usuario.setdefault(fila.usuario_id, []).append(fila)
+
     reporte = []
     for usuario in usuarios:
-        turnos = db.query(TurnoModel).filter(
-            TurnoModel.usuario_id == usuario.id,
-            TurnoModel.fecha >= start_date,
-            TurnoModel.fecha < end_date
-        ).all()
-
         horas_trabajadas_raw = 0  # suma directa por registro
         festivos_visitados = set()
-        dias_unicos = set()
         codigos: dict[str,int] = {}
         dias_detalle: dict[str, list[str]] = {}
-        for turno in turnos:
-            if turno.turno in TURNOS_CONTABLES:
-                horas_trabajadas_raw += calcular_horas_turno(turno.turno)
-                dias_unicos.add(turno.fecha)
-                codigos[turno.turno] = codigos.get(turno.turno,0)+1
-                key = turno.fecha.isoformat()
-                dias_detalle.setdefault(key, []).append(turno.turno)
-                if request.month and turno.fecha in festivos_set:
-                    festivos_visitados.add(turno.fecha)
-
-        # Consolidar horas: por cada fecha tomar el máximo de las horas de sus códigos (evita doble conteo si hubo dos turnos en el mismo día accidentalmente)
-        horas_trabajadas = 0
-        for fecha_iso, cods in dias_detalle.items():
-            max_dia = 0
-            for c in cods:
-                h = calcular_horas_turno(c)
-                if h > max_dia:
-                    max_dia = h
-            horas_trabajadas += max_dia
-
-        total_dias = len(dias_unicos)
+        horas_por_dia: dict[date, int] = {}
+        for fila in filas_por_usuario.get(usuario.id, []):
+            horas_trabajadas_raw += fila.horas * fila.n
+            codigos[fila.turno] = codigos.get(fila.turno, 0) + fila.n
+            dias_detalle.setdefault(fila.fecha.isoformat(), []).extend([fila.turno] * fila.n)
+            # Consolidar horas: por cada fecha tomar el máximo de las horas de sus códigos (evita doble conteo si hubo dos turnos en el mismo día accidentalmente)
+            horas_por_dia[fila.fecha] = max(horas_por_dia.get(fila.fecha, 0), fila.horas)
+            if fila.fecha in festivos_set:
+                festivos_visitados.add(fila.fecha)
+
+        horas_trabajadas = sum(horas_por_dia.values())
+        total_dias = len(horas_por_dia)
         festivos_count = len(festivos_visitados)
+
+        periodos = None
+        if request.agrupar:
+            por_periodo = {p: [0, 0, 0] for p in periodos_rango(start_date, end_date, request.agrupar)}
+            for fecha, horas in horas_por_dia.items():
+                acumulado = por_periodo[inicio_periodo(fecha, request.agrupar)]
+                acumulado[0] += 1
+                acumulado[1] += fecha in festivos_visitados
+                acumulado[2] += horas
+            periodos = [
+                PeriodoTrabajado(periodo=p, dias_trabajados=d, dias_festivos=f, horas_trabajadas=h)
+                for p, (d, f, h) in por_periodo.items()
+            ]
         reporte.append(ReporteTrabajado(
             usuario_id=usuario.id,
             nombres=usuario.nombres,
             apellidos=usuario.apellidos,
-            rol="Jefe de Turno" if usuario.rol_id == 1 else "Operador",
+            rol=nombre_rol(usuario.rol_id),
             dias_trabajados=total_dias,
             dias_festivos=festivos_count,
             dias_trabajados_no_festivo=total_dias - festivos_count,
             horas_trabajadas=horas_trabajadas,
             horas_trabajadas_raw=horas_trabajadas_raw,
             turnos_codigos=codigos,
-            dias_detalle=dias_detalle
+            dias_detalle=dias_detalle,
+            periodos=periodos
         ))
-    
+
     return reporte
 
-@router.post("/turnos", response_model=List[ReporteTurnos])
-def reporte_turnos_por_tipo(request: ReporteRequest, db: Session = Depends(database.get_db)):
-    if request.month:
-        start_date = date(request.year, request.month, 1)
-        if request.month == 12:
-            end_date = date(request.year + 1, 1, 1)
-        else:
-            end_date = date(request.year, request.month + 1, 1)
-    else:
-        start_date = date(request.year, 1, 1)
-        end_date = date(request.year + 1, 1, 1)
-    
-    if request.usuario_id is not None:
-        usuarios = db.query(models_usuario.Usuario).filter(
-            models_usuario.Usuario.id == request.usuario_id,
-            models_usuario.Usuario.estado == "activo",
-            models_usuario.Usuario.rol_id.in_([1, 2])
-        ).all()
-    else:
-        usuarios = db.query(models_usuario.Usuario).filter(
-            models_usuario.Usuario.estado == "activo",
-            models_usuario.Usuario.rol_id.in_([1, 2])
-        ).all()
-    
-    if not usuarios:
-        raise HTTPException(status_code=404, detail="No se encontraron usuarios válidos")
-    
+def _con_festivos(request: ReporteRequest) -> bool:
+    """Los festivos solo cuentan en el reporte mensual o de rango"""
+    return bool(request.month) or request.desde is not None
+
+@router.post("/trabajados", response_model=List[ReporteTrabajado])
+def reporte_dias_trabajados(request: ReporteRequest, db: Session = Depends(database.get_read_db)):
+    start_date, end_date = rango_reporte(request)
+    festivos_set = get_festivos_rango(db, start_date, end_date) if _con_festivos(request) else set()
+    usuarios = get_usuarios_reporte(request, db)
+    comprobar_usuarios(usuarios)
+    filas = db.execute(_select_trabajados(request, start_date, end_date)).all()
+    return _reporte_trabajados(request, start_date, end_date, usuarios, filas, festivos_set)
+
+@implementacion_async(reporte_dias_trabajados)
+async def _reporte_dias_trabajados_async(request: ReporteRequest, db: AsyncSession):
+    start_date, end_date = rango_reporte(request)
+    festivos_set = await db.run_sync(get_festivos_rango, start_date, end_date) if _con_festivos(request) else set()
+    usuarios = await get_usuarios_reporte_async(request, db)
+    comprobar_usuarios(usuarios)
+    filas = (await db.execute(_select_trabajados(request, start_date, end_date))).all()
+    return await run_in_threadpool(_reporte_trabajados, request, start_date, end_date, usuarios, filas, festivos_set)
+
+def _select_conteos(request: ReporteRequest, start_date: date, end_date: date, db: Session):
+    """GROUP BY de _conteos_desde_turnos; con agrupar lleva además la columna `periodo`"""
+    columnas = [TurnoModel.usuario_id, TurnoModel.turno, TurnoCodigo.franja]
+    if request.agrupar:
+        columnas.append(periodo_sql(db, request.agrupar, TurnoModel.fecha).label('periodo'))
+    return select(
+        *columnas,
+        func.count().label('n'),
+        func.sum(TurnoCodigo.horas).label('horas')
+    ).join(
+        models_usuario.Usuario, models_usuario.Usuario.id == TurnoModel.usuario_id
+    ).join(
+        TurnoCodigo, JOIN_CODIGO
+    ).where(
+        *filtros_usuarios_reporte(request),
+        TurnoModel.fecha >= start_date,
+        TurnoModel.fecha < end_date,
+        ES_CONTABLE
+    ).group_by(*columnas)
+
+def _agrupar_conteos(request: ReporteRequest, filas: list) -> dict:
+    conteos: dict[int, dict] = {}
+    for fila in filas:
+        clave = a_fecha(fila.periodo) if request.agrupar else None
+        conteos.setdefault(fila.usuario_id, {}).setdefault(clave, {})[fila.turno] = (
+            fila.n, int(fila.horas or 0), fila.franja
+        )
+    return conteos
+
+def _conteos_desde_turnos(request: ReporteRequest, start_date: date, end_date: date, db: Session) -> dict:
+    """
+    usuario_id -> {periodo: {código: (días, horas, franja)}} con conteo, horas y franja
+    calculados en la BD. Sin agrupar hay un único periodo None; con agrupar, el periodo
+    sale del mismo GROUP BY.
+    """
+    return _agrupar_conteos(request, db.execute(_select_conteos(request, start_date, end_date, db)).all())
+
+def select_resumen_anual(request: ReporteRequest):
+    """Filas de resumen_mensual del año (como mucho 12 por usuario)"""
+    return select(ResumenMensual).join(
+        models_usuario.Usuario, models_usuario.Usuario.id == ResumenMensual.usuario_id
+    ).where(
+        *filtros_usuarios_reporte(request),
+        ResumenMensual.year == request.year
+    )
+
+def _resumen_por_usuario(filas: list[ResumenMensual]) -> dict[int, list[ResumenMensual]]:
+    por_usuario: dict[int, list[ResumenMensual]] = {}
+    for fila in filas:
+        por_usuario.setdefault(fila.usuario_id, []).append(fila)
+    return por_usuario
+
+def get_resumen_anual(request: ReporteRequest, db: Session) -> dict[int, list[ResumenMensual]]:
+    """Filas de resumen_mensual del año, agrupadas por usuario"""
+    return _resumen_por_usuario(db.execute(select_resumen_anual(request)).scalars().all())
+
+def _agrupar_conteos_resumen(request: ReporteRequest, filas: list[ResumenMensual], codigos) -> dict:
+    conteos: dict[int, dict] = {}
+    for usuario_id, meses in _resumen_por_usuario(filas).items():
+        por_periodo = conteos.setdefault(usuario_id, {})
+        for mes in meses:
+            clave = date(mes.year, mes.month, 1) if request.agrupar == "mes" else None
+            por_codigo = por_periodo.setdefault(clave, {})
+            for t, n in (mes.codigos or {}).items():
+                if t in codigos.contables:
+                    dias, horas, franja = por_codigo.get(t, (0, 0, codigos.franjas[t]))
+                    por_codigo[t] = (dias + n, horas + n * codigos.horas[t], franja)
+    return conteos
+
+def _conteos_desde_resumen(request: ReporteRequest, db: Session) -> dict:
+    """Igual que _conteos_desde_turnos pero para un año completo, leyendo resumen_mensual"""
+    codigos = catalogo(db)
+    return _agrupar_conteos_resumen(request, db.execute(select_resumen_anual(request)).scalars().all(), codigos)
+
+def _totales_turnos(conteos: dict[str, tuple[int, int, str]]) -> dict:
+    """Mañana/tarde/noche, horas y códigos a partir de {código: (días, horas, franja)}"""
+    totales = {"mañana": 0, "tarde": 0, "noche": 0, "horas_trabajadas": 0}
+    for n, horas, franja in conteos.values():
+        totales["horas_trabajadas"] += horas
+        if franja in totales:
+            totales[franja] += n
+    totales["total"] = totales["mañana"] + totales["tarde"] + totales["noche"]
+    return totales
+
+def _reporte_turnos(request: ReporteRequest, start_date: date, end_date: date,
+                    usuarios: list, conteos: dict) -> list[ReporteTurnos]:
     reporte = []
     for usuario in usuarios:
-        turnos = db.query(TurnoModel).filter(
-            TurnoModel.usuario_id == usuario.id,
-            TurnoModel.fecha >= start_date,
-            TurnoModel.fecha < end_date
-        ).all()
-        mañana = tarde = noche = 0
-        horas_trabajadas = 0
-        codigos: dict[str,int] = {}
-        for turno in turnos:
-            t = turno.turno
-            if t in TURNOS_CONTABLES:
-                horas_trabajadas += calcular_horas_turno(t)
-                codigos[t] = codigos.get(t,0)+1
-                if t in ['M','FM1','FM2']:
-                    mañana += 1
-                elif t == 'T':
-                    tarde += 1
-                elif t in ['N','FN1','FN2']:
-                    noche += 1
+        por_periodo = conteos.get(usuario.id, {})
+        # Totales del usuario = suma de sus periodos (un solo recorrido de los datos)
+        codigos_total: dict[str, tuple[int, int, str]] = {}
+        for codigos_periodo in por_periodo.values():
+            for t, (n, horas, franja) in codigos_periodo.items():
+                n_total, horas_total, _ = codigos_total.get(t, (0, 0, franja))
+                codigos_total[t] = (n_total + n, horas_total + horas, franja)
+
+        periodos = None
+        if request.agrupar:
+            periodos = [
+                PeriodoTurnos(periodo=p, **_totales_turnos(por_periodo.get(p, {})))
+                for p in periodos_rango(start_date, end_date, request.agrupar)
+            ]
         reporte.append(ReporteTurnos(
             usuario_id=usuario.id,
             nombres=usuario.nombres,
             apellidos=usuario.apellidos,
-            rol="Jefe de Turno" if usuario.rol_id == 1 else "Operador",
-            mañana=mañana,
-            tarde=tarde,
-            noche=noche,
-            total=mañana + tarde + noche,
-            horas_trabajadas=horas_trabajadas,
-            turnos_codigos=codigos
+            rol=nombre_rol(usuario.rol_id),
+            **_totales_turnos(codigos_total),
+            turnos_codigos={t: n for t, (n, _, _) in codigos_total.items()},
+            periodos=periodos
         ))
-    
+
     return reporte
 
-@router.post("/festivos", response_model=List[ReporteFestivos])
-def reporte_festivos_trabajados(request: ReporteRequest, db: Session = Depends(database.get_db)):
-    if not request.month:
-        raise HTTPException(status_code=400, detail="Este reporte solo está disponible por mes")
-    
-    start_date = date(request.year, request.month, 1)
-    if request.month == 12:
-        end_date = date(request.year + 1, 1, 1)
+@router.post("/turnos", response_model=List[ReporteTurnos])
+def reporte_turnos_por_tipo(request: ReporteRequest, db: Session = Depends(database.get_read_db)):
+    start_date, end_date = rango_reporte(request)
+
+    usuarios = get_usuarios_reporte(request, db)
+    comprobar_usuarios(usuarios)
+
+    if usar_resumen(request, db):
+        conteos = _conteos_desde_resumen(request, db)
+    else:
+        conteos = _conteos_desde_turnos(request, start_date, end_date, db)
+    return _reporte_turnos(request, start_date, end_date, usuarios, conteos)
+
+@implementacion_async(reporte_turnos_por_tipo)
+async def _reporte_turnos_por_tipo_async(request: ReporteRequest, db: AsyncSession):
+    start_date, end_date = rango_reporte(request)
+    usuarios = await get_usuarios_reporte_async(request, db)
+    comprobar_usuarios(usuarios)
+
+    if await db.run_sync(lambda sesion: usar_resumen(request, sesion)):
+        codigos = await db.run_sync(catalogo)
+        filas = (await db.execute(select_resumen_anual(request))).scalars().all()
+        agrupar = lambda: _agrupar_conteos_resumen(request, filas, codigos)
     else:
-        end_date = date(request.year, request.month + 1, 1)
-    
-    festivos_set = get_festivos_mes(request.year, request.month, db)
-    
+        filas = (await db.execute(_select_conteos(request, start_date, end_date, db.sync_session))).all()
+        agrupar = lambda: _agrupar_conteos(request, filas)
+    return await run_in_threadpool(lambda: _reporte_turnos(request, start_date, end_date, usuarios, agrupar()))
+
+def _select_turnos_festivos(request: ReporteRequest, start_date: date, end_date: date, fechas_festivas):
+    """Solo interesan los turnos contables caídos en festivo: una consulta para todos los usuarios"""
+    return select(
+        TurnoModel.usuario_id,
+        TurnoModel.fecha,
+        TurnoModel.turno
+    ).join(
+        models_usuario.Usuario, models_usuario.Usuario.id == TurnoModel.usuario_id
+    ).join(
+        TurnoCodigo, JOIN_CODIGO
+    ).where(
+        *filtros_usuarios_reporte(request),
+        TurnoModel.fecha >= start_date,
+        TurnoModel.fecha < end_date,
+        TurnoModel.fecha.in_(fechas_festivas),
+        ES_CONTABLE
+    ).order_by(
+        TurnoModel.usuario_id, TurnoModel.fecha
+    )
+
+def _comprobar_festivos(request: ReporteRequest, usuarios: list) -> None:
+    if not usuarios and request.usuario_id is not None:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    comprobar_usuarios(usuarios)
+
+def _reporte_festivos(request: ReporteRequest, usuarios: list, turnos_festivos: list) -> list[ReporteFestivos]:
     if request.usuario_id is not None:
         # Vista individual
-        usuarios = db.query(models_usuario.Usuario).filter(
-            models_usuario.Usuario.id == request.usuario_id,
-            models_usuario.Usuario.estado == "activo",
-            models_usuario.Usuario.rol_id.in_([1, 2])
-        ).all()
-        if not usuarios:
-            raise HTTPException(status_code=404, detail="Usuario no encontrado")
-        
         reporte = []
         for usuario in usuarios:
-            turnos_festivos = []
-            turnos = db.query(TurnoModel).filter(
-                TurnoModel.usuario_id == usuario.id,
-                TurnoModel.fecha >= start_date,
-                TurnoModel.fecha < end_date,
-                TurnoModel.turno.in_(TURNOS_CONTABLES)
-            ).all()
-            for turno in turnos:
-                if turno.fecha in festivos_set:
-                    turnos_festivos.append(turno.fecha)
-            
             reporte.append(ReporteFestivos(
                 usuario_id=usuario.id,
                 nombres=usuario.nombres,
                 apellidos=usuario.apellidos,
-                rol="Jefe de Turno" if usuario.rol_id == 1 else "Operador",
-                festivos_trabajados=sorted(turnos_festivos),
+                rol=nombre_rol(usuario.rol_id),
+                festivos_trabajados=sorted(t.fecha for t in turnos_festivos if t.usuario_id == usuario.id),
                 festivos_detalle_dia=None,
                 festivos_fechas=None
             ))
         return reporte
-    
+
     else:
         # Vista global
-        usuarios = db.query(models_usuario.Usuario).filter(
-            models_usuario.Usuario.estado == "activo",
-            models_usuario.Usuario.rol_id.in_([1, 2])
-        ).all()
-        if not usuarios:
-            raise HTTPException(status_code=404, detail="No se encontraron usuarios válidos")
-        
+        usuarios_por_id = {u.id: u for u in usuarios}
+
         # festivos_por_dia: día(int) -> lista de strings "Nombre Apellido (CódigoTurno)"
         festivos_por_dia: dict[int, list[str]] = {}
         todas_fechas_festivas = set()
 
-        for usuario in usuarios:
-            turnos = db.query(TurnoModel).filter(
-                TurnoModel.usuario_id == usuario.id,
-                TurnoModel.fecha >= start_date,
-                TurnoModel.fecha < end_date,
-                TurnoModel.turno.in_(TURNOS_CONTABLES)
-            ).all()
-            for turno in turnos:
-                if turno.fecha in festivos_set:
-                    todas_fechas_festivas.add(turno.fecha)
-                    dia = turno.fecha.day
-                    # Incluir el código de turno trabajado ese día para mostrarlo en el detalle
-                    nombre_usuario = f"{usuario.nombres} {usuario.apellidos} ({turno.turno})"
-                    if dia not in festivos_por_dia:
-                        festivos_por_dia[dia] = []
-                    festivos_por_dia[dia].append(nombre_usuario)
+        for turno in turnos_festivos:
+            usuario = usuarios_por_id[turno.usuario_id]
+            todas_fechas_festivas.add(turno.fecha)
+            # Incluir el código de turno trabajado ese día para mostrarlo en el detalle
+            nombre_usuario = f"{usuario.nombres} {usuario.apellidos} ({turno.turno})"
+            festivos_por_dia.setdefault(turno.fecha.day, []).append(nombre_usuario)
 
         return [ReporteFestivos(
             usuario_id=0,
@@ -284,65 +438,256 @@ def reporte_festivos_trabajados(request: ReporteRequest, db: Session = Depends(d
             festivos_fechas=sorted(list(todas_fechas_festivas))
         )]
 
-@router.post("/vacaciones", response_model=List[ReporteVacaciones])
-def reporte_vacaciones(request: ReporteRequest, db: Session = Depends(database.get_db)):
-    if request.month:
-        start_date = date(request.year, request.month, 1)
-        if request.month == 12:
-            end_date = date(request.year + 1, 1, 1)
-        else:
-            end_date = date(request.year, request.month + 1, 1)
-    else:
-        start_date = date(request.year, 1, 1)
-        end_date = date(request.year + 1, 1, 1)
-    
-    if request.usuario_id is not None:
-        usuarios = db.query(models_usuario.Usuario).filter(
-            models_usuario.Usuario.id == request.usuario_id,
-            models_usuario.Usuario.estado == "activo",
-            models_usuario.Usuario.rol_id.in_([1, 2])
-        ).all()
-    else:
-        usuarios = db.query(models_usuario.Usuario).filter(
-            models_usuario.Usuario.estado == "activo",
-            models_usuario.Usuario.rol_id.in_([1, 2])
-        ).all()
-    
-    if not usuarios:
-        raise HTTPException(status_code=404, detail="No se encontraron usuarios válidos")
-    
+@router.post("/festivos", response_model=List[ReporteFestivos])
+def reporte_festivos_trabajados(request: ReporteRequest, db: Session = Depends(database.get_read_db)):
+    if not request.month:
+        raise HTTPException(status_code=400, detail="Este reporte solo está disponible por mes")
+    start_date, end_date = rango_reporte(request)
+    usuarios = get_usuarios_reporte(request, db)
+    _comprobar_festivos(request, usuarios)
+    fechas = fechas_festivas_query(db, start_date, end_date)
+    turnos_festivos = db.execute(_select_turnos_festivos(request, start_date, end_date, fechas)).all()
+    return _reporte_festivos(request, usuarios, turnos_festivos)
+
+@implementacion_async(reporte_festivos_trabajados)
+async def _reporte_festivos_trabajados_async(request: ReporteRequest, db: AsyncSession):
+    if not request.month:
+        raise HTTPException(status_code=400, detail="Este reporte solo está disponible por mes")
+    start_date, end_date = rango_reporte(request)
+    usuarios = await get_usuarios_reporte_async(request, db)
+    _comprobar_festivos(request, usuarios)
+    fechas = await db.run_sync(fechas_festivas_query, start_date, end_date)
+    turnos_festivos = (await db.execute(_select_turnos_festivos(request, start_date, end_date, fechas))).all()
+    return await run_in_threadpool(_reporte_festivos, request, usuarios, turnos_festivos)
+
+def _select_vacaciones(request: ReporteRequest, start_date: date, end_date: date, db: Session):
+    """Días de vacaciones por usuario (y periodo) en una sola consulta agrupada"""
+    columnas = [TurnoModel.usuario_id]
+    if request.agrupar:
+        columnas.append(periodo_sql(db, request.agrupar, TurnoModel.fecha))
+    return select(
+        *columnas,
+        func.count()
+    ).join(
+        models_usuario.Usuario, models_usuario.Usuario.id == TurnoModel.usuario_id
+    ).join(
+        TurnoCodigo, JOIN_CODIGO
+    ).where(
+        *filtros_usuarios_reporte(request),
+        TurnoModel.fecha >= start_date,
+        TurnoModel.fecha < end_date,
+        TurnoCodigo.ausencia == 'vacaciones'
+    ).group_by(*columnas)
+
+def _select_dias_cumple(request: ReporteRequest, start_date: date, end_date: date):
+    """Días de cumpleaños ('c') del periodo; se cruzan después con la fecha de cumpleaños de cada usuario"""
+    return select(
+        TurnoModel.usuario_id,
+        TurnoModel.fecha
+    ).join(
+        models_usuario.Usuario, models_usuario.Usuario.id == TurnoModel.usuario_id
+    ).join(
+        TurnoCodigo, JOIN_CODIGO
+    ).where(
+        *filtros_usuarios_reporte(request),
+        models_usuario.Usuario.cumple_anios.isnot(None),
+        TurnoModel.fecha >= start_date,
+        TurnoModel.fecha < end_date,
+        TurnoCodigo.ausencia == 'cumpleaños'
+    )
+
+def _agrupar_vacaciones(request: ReporteRequest, filas: list, filas_cumple: list):
+    """(usuario_id -> {periodo: días 'v'}, {(usuario_id, fecha) con 'c'}); periodo None sin agrupar"""
+    vacaciones_por_usuario: dict[int, dict] = {}
+    for fila in filas:
+        periodo = a_fecha(fila[1]) if request.agrupar else None
+        vacaciones_por_usuario.setdefault(fila[0], {})[periodo] = fila[-1]
+    return vacaciones_por_usuario, {tuple(f) for f in filas_cumple}
+
+def _vacaciones_desde_turnos(request: ReporteRequest, start_date: date, end_date: date, db: Session):
+    """_agrupar_vacaciones del rango, leído de turnos_asignados"""
+    return _agrupar_vacaciones(
+        request,
+        db.execute(_select_vacaciones(request, start_date, end_date, db)).all(),
+        db.execute(_select_dias_cumple(request, start_date, end_date)).all()
+    )
+
+def _agrupar_vacaciones_resumen(request: ReporteRequest, usuarios: list, filas: list[ResumenMensual]):
+    vacaciones_por_usuario: dict[int, dict] = {}
+    cumples_tomados = set()
+    cumples = {u.id: u.cumple_anios for u in usuarios if u.cumple_anios}
+    for usuario_id, meses in _resumen_por_usuario(filas).items():
+        por_periodo = vacaciones_por_usuario.setdefault(usuario_id, {})
+        for m in meses:
+            periodo = date(m.year, m.month, 1) if request.agrupar == "mes" else None
+            por_periodo[periodo] = por_periodo.get(periodo, 0) + m.dias_vacaciones
+        if usuario_id in cumples and any(m.cumple_tomado for m in meses):
+            cumple = cumples[usuario_id]
+            cumples_tomados.add((usuario_id, date(request.year, cumple.month, cumple.day)))
+    return vacaciones_por_usuario, cumples_tomados
+
+def _vacaciones_desde_resumen(request: ReporteRequest, usuarios: list, db: Session):
+    """Igual que _vacaciones_desde_turnos pero para un año completo, leyendo resumen_mensual"""
+    return _agrupar_vacaciones_resumen(request, usuarios, db.execute(select_resumen_anual(request)).scalars().all())
+
+def _reporte_vacaciones(request: ReporteRequest, start_date: date, end_date: date, usuarios: list,
+                        vacaciones_por_usuario: dict, cumples_tomados: set) -> list[ReporteVacaciones]:
     reporte = []
     for usuario in usuarios:
-        vacaciones = db.query(TurnoModel).filter(
-            TurnoModel.usuario_id == usuario.id,
-            TurnoModel.fecha >= start_date,
-            TurnoModel.fecha < end_date,
-            TurnoModel.turno == 'v'
-        ).count()
-        
+        por_periodo = vacaciones_por_usuario.get(usuario.id, {})
+        vacaciones = sum(por_periodo.values())
+
         cumple_tomado = False
         if usuario.cumple_anios:
-            cumple_fecha = date(request.year, usuario.cumple_anios.month, usuario.cumple_anios.day)
-            if start_date <= cumple_fecha < end_date:
-                turno_cumple = db.query(TurnoModel).filter(
-                    TurnoModel.usuario_id == usuario.id,
-                    TurnoModel.fecha == cumple_fecha,
-                    TurnoModel.turno == 'c'
-                ).first()
-                cumple_tomado = turno_cumple is not None
-        
+            # Un rango puede abarcar varios años: basta con haber tomado el cumpleaños de uno
+            for year in range(start_date.year, end_date.year + 1):
+                try:
+                    cumple_fecha = date(year, usuario.cumple_anios.month, usuario.cumple_anios.day)
+                except ValueError:  # 29 de febrero en año no bisiesto
+                    continue
+                if start_date <= cumple_fecha < end_date and (usuario.id, cumple_fecha) in cumples_tomados:
+                    cumple_tomado = True
+
         total_dias = 31
         dias_usados = vacaciones + (1 if cumple_tomado else 0)
         dias_restantes = max(0, total_dias - dias_usados)
-        
+
         reporte.append(ReporteVacaciones(
             usuario_id=usuario.id,
             nombres=usuario.nombres,
             apellidos=usuario.apellidos,
-            rol="Jefe de Turno" if usuario.rol_id == 1 else "Operador",
+            rol=nombre_rol(usuario.rol_id),
             vacaciones_tomadas=vacaciones,
             cumpleaños_tomado=cumple_tomado,
-            dias_restantes=dias_restantes
+            dias_restantes=dias_restantes,
+            periodos=[
+                PeriodoVacaciones(periodo=p, vacaciones_tomadas=por_periodo.get(p, 0))
+                for p in periodos_rango(start_date, end_date, request.agrupar)
+            ] if request.agrupar else None
         ))
-    
-    return reporte
\ No newline at end of file
+
+    return reporte
+
+@router.post("/vacaciones", response_model=List[ReporteVacaciones])
+def reporte_vacaciones(request: ReporteRequest, db: Session = Depends(database.get_read_db)):
+    start_date, end_date = rango_reporte(request)
+
+    usuarios = get_usuarios_reporte(request, db)
+    comprobar_usuarios(usuarios)
+
+    if usar_resumen(request, db):
+        vacaciones_por_usuario, cumples_tomados = _vacaciones_desde_resumen(request, usuarios, db)
+    else:
+        vacaciones_por_usuario, cumples_tomados = _vacaciones_desde_turnos(request, start_date, end_date, db)
+    return _reporte_vacaciones(request, start_date, end_date, usuarios, vacaciones_por_usuario, cumples_tomados)
+
+@implementacion_async(reporte_vacaciones)
+async def _reporte_vacaciones_async(request: ReporteRequest, db: AsyncSession):
+    start_date, end_date = rango_reporte(request)
+    usuarios = await get_usuarios_reporte_async(request, db)
+    comprobar_usuarios(usuarios)
+
+    if await db.run_sync(lambda sesion: usar_resumen(request, sesion)):
+        filas = (await db.execute(select_resumen_anual(request))).scalars().all()
+        agrupar = lambda: _agrupar_vacaciones_resumen(request, usuarios, filas)
+    else:
+        filas = (await db.execute(_select_vacaciones(request, start_date, end_date, db.sync_session))).all()
+        filas_cumple = (await db.execute(_select_dias_cumple(request, start_date, end_date))).all()
+        agrupar = lambda: _agrupar_vacaciones(request, filas, filas_cumple)
+    return await run_in_threadpool(lambda: _reporte_vacaciones(request, start_date, end_date, usuarios, *agrupar()))
+
+# Columnas de cada reporte exportado: (título, ancho) y valores numéricos de cada fila
+COLUMNAS_EXPORTACION = {
+    "trabajados": (
+        [("Días trabajados", 16), ("Días festivos", 14), ("Días no festivos", 16), ("Horas", 10)],
+        lambda r: [r.dias_trabajados, r.dias_festivos, r.dias_trabajados_no_festivo, r.horas_trabajadas],
+    ),
+    "turnos": (
+        [("Mañana", 10), ("Tarde", 10), ("Noche", 10), ("Total", 10), ("Horas", 10)],
+        lambda r: [r.mañana, r.tarde, r.noche, r.total, r.horas_trabajadas],
+    ),
+    "festivos": (
+        [("Festivos trabajados", 20), ("Fechas", 40)],
+        lambda r: [len(r.festivos_trabajados), ", ".join(f.isoformat() for f in r.festivos_trabajados)],
+    ),
+    "vacaciones": (
+        [("Vacaciones tomadas", 20), ("Cumpleaños tomado", 18), ("Días restantes", 16)],
+        lambda r: [r.vacaciones_tomadas, "Sí" if r.cumpleaños_tomado else "No", r.dias_restantes],
+    ),
+}
+
+GENERADORES_REPORTE = {
+    "trabajados": reporte_dias_trabajados,
+    "turnos": reporte_turnos_por_tipo,
+    "festivos": reporte_festivos_trabajados,
+    "vacaciones": reporte_vacaciones,
+}
+
+def hoja_reporte(tipo: str, request: ReporteRequest, db: Session) -> tuple[Hoja, str]:
+    """Hoja del reporte exportado (una fila por usuario más totales) y su periodo para el nombre del fichero"""
+    return _hoja(tipo, request, GENERADORES_REPORTE[tipo](request, db))
+
+def _hoja(tipo: str, request: ReporteRequest, reporte: list) -> tuple[Hoja, str]:
+    columnas, valores = COLUMNAS_EXPORTACION[tipo]
+    filas, totales = [], [0] * len(columnas)
+    for r in reporte:
+        numeros = valores(r)
+        filas.append(
+            [(f"{r.nombres} {r.apellidos}", "usuario"), (r.rol, estilo_rol_tabla(r.rol))]
+            + [(v, "celda") for v in numeros]
+        )
+        totales = [t + v if isinstance(v, int) and not isinstance(v, bool) else "" for t, v in zip(totales, numeros)]
+
+    if request.desde is not None:
+        periodo = f"{request.desde.isoformat()}_{request.hasta.isoformat()}"
+        # Nombre de hoja de 31 caracteres como mucho: el rango completo va solo en el fichero
+        titulo = f"{request.desde:%d-%m-%y} a {request.hasta:%d-%m-%y}"
+    else:
+        periodo = f"{MESES[request.month - 1]}_{request.year}" if request.month else str(request.year)
+        titulo = periodo.replace('_', ' ')
+    hoja = hoja_tabla(
+        f"{tipo.capitalize()} {titulo}",
+        [("Usuario", 25), ("Rol", 15)] + columnas,
+        filas,
+        total=["Total", ""] + totales
+    )
+    return hoja, periodo
+
+def _request_exportacion(year: Optional[int], month: Optional[int], desde: Optional[date],
+                         hasta: Optional[date], usuario_id: Optional[int]) -> ReporteRequest:
+    if month is not None and not 1 <= month <= 12:
+        raise HTTPException(status_code=400, detail="Mes no válido")
+    try:
+        return ReporteRequest(year=year, month=month, desde=desde, hasta=hasta, usuario_id=usuario_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _respuesta_exportacion(tipo: str, hoja: Hoja, periodo: str, formato: str) -> StreamingResponse:
+    return StreamingResponse(
+        exportar([hoja], formato),
+        media_type=tipo_medio(formato),
+        headers=cabeceras_descarga(f"Reporte_{tipo}_{periodo}", formato)
+    )
+
+# ✅ Reporte en CSV o XLSX (una fila por usuario más totales), en streaming
+@router.get("/{tipo}/export")
+def exportar_reporte(
+    tipo: Literal["trabajados", "turnos", "festivos", "vacaciones"],
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    usuario_id: Optional[int] = None,
+    formato: Literal["xlsx", "csv"] = "xlsx",
+    db: Session = Depends(database.get_read_db)
+):
+    request = _request_exportacion(year, month, desde, hasta, usuario_id)
+    hoja, periodo = hoja_reporte(tipo, request, db)
+    return _respuesta_exportacion(tipo, hoja, periodo, formato)
+
+@implementacion_async(exportar_reporte)
+async def _exportar_reporte_async(tipo, year, month, desde, hasta, usuario_id, formato, db: AsyncSession):
+    request = _request_exportacion(year, month, desde, hasta, usuario_id)
+    reporte = await GENERADORES_REPORTE[tipo].implementacion_async(request, db)
+    hoja, periodo = await run_in_threadpool(_hoja, tipo, request, reporte)
+    return _respuesta_exportacion(tipo, hoja, periodo, formato)
@@ -0,0 +1,32 @@
+# backend/app/routers/salud.py
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app import arranque
+from app.services.trabajos import ejecutor as ejecutor_trabajos
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+# ✅ VIVO: el proceso responde (no toca la base); para el liveness probe
+@router.get("/live")
+async def vivo():
+    return {"estado": "vivo"}
+
+# ✅ LISTO: arranque terminado (esquema al día, cachés cargadas) y la base responde
+# 503 mientras no lo esté; para el readiness probe y el reinicio escalonado de workers
+@router.get("/ready")
+def listo():
+    estado = arranque.estado
+    cuerpo = {
+        "listo": estado.listo,
+        "revision": estado.revision,
+        "error": estado.error,
+        "intentos": estado.intentos,
+        "tiempos": {"importacion_s": estado.importacion_s, "arranque_s": estado.arranque_s, **estado.pasos_s},
+        "trabajos": ejecutor_trabajos.estado(),
+    }
+    if estado.listo:
+        try:
+            arranque.comprobar_conexion()
+        except Exception as e:
+            cuerpo.update(listo=False, error=f"Sin conexión con la base de datos: {e}")
+    return JSONResponse(cuerpo, status_code=200 if cuerpo["listo"] else 503)
@@ -0,0 +1,166 @@
+# backend/app/routers/trabajos.py
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse, JSONResponse
+from pydantic import ValidationError
+from sqlalchemy.orm import Session, undefer
+from typing import List, Optional
+from app import database
+from app.models.trabajo import Trabajo as TrabajoModel
+from app.schemas.trabajo import (
+    Trabajo, TrabajoCreate, EstadoTrabajo,
+    ParametrosReporte, ParametrosReporteExport, ParametrosExportTurnos, ParametrosCumpleanos, ParametrosAusencias
+)
+from app.services.trabajos import (
+    TIPOS, Avance, ColaLlena, Fichero, registrar_tipo, crear_trabajo, pedir_cancelacion, ruta_fichero
+)
+from app.services.exportacion import MESES, exportar, exportar_mes, exportar_year, tipo_medio
+from app.routers.reportes import GENERADORES_REPORTE, hoja_reporte
+from app.routers.turnos import _asignar_cumpleanos, _aplicar_ausencias, _validar_ausencias
+
+# Siempre en la primaria: el estado cambia cada segundo y una réplica lo daría atrasado
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+# Ausencias que se escriben (y confirman) en cada paso del trabajo `ausencias`
+TAMANO_BLOQUE_AUSENCIAS = 50
+
+# ── Tipos de trabajo: las mismas funciones que los endpoints síncronos ────
+
+@registrar_tipo("reporte", ParametrosReporte)
+def _trabajo_reporte(parametros: ParametrosReporte, avance: Avance):
+    avance(0, 1, f"Calculando reporte {parametros.reporte}")
+    db = database.abrir_sesion_lectura()
+    try:
+        return GENERADORES_REPORTE[parametros.reporte](parametros, db)
+    finally:
+        db.close()
+
+@registrar_tipo("reporte_export", ParametrosReporteExport)
+def _trabajo_reporte_export(parametros: ParametrosReporteExport, avance: Avance):
+    avance(0, 1, f"Calculando reporte {parametros.reporte}")
+    db = database.abrir_sesion_lectura()
+    try:
+        hoja, periodo = hoja_reporte(parametros.reporte, parametros, db)
+    finally:
+        db.close()
+    avance.comprobar()
+    return Fichero(f"Reporte_{parametros.reporte}_{periodo}.{parametros.formato}",
+                   tipo_medio(parametros.formato), exportar([hoja], parametros.formato))
+
+@registrar_tipo("export_turnos", ParametrosExportTurnos)
+def _trabajo_export_turnos(parametros: ParametrosExportTurnos, avance: Avance):
+    year, month, formato = parametros.year, parametros.month, parametros.formato
+    if month is not None:
+        avance(0, 1, f"Exportando {MESES[month - 1]} {year}")
+        return Fichero(f"Turnos_{MESES[month - 1]}_{year}.{formato}", tipo_medio(formato),
+                       exportar_mes(year, month, formato, al_terminar_mes=lambda m: avance(1, 1)))
+    avance(0, 12, f"Exportando {year}")
+    return Fichero(f"Turnos_{year}.{formato}", tipo_medio(formato),
+                   exportar_year(year, formato, al_terminar_mes=lambda m: avance(m, 12, f"{MESES[m - 1]} exportado")))
+
+@registrar_tipo("cumpleanos", ParametrosCumpleanos)
+def _trabajo_cumpleanos(parametros: ParametrosCumpleanos, avance: Avance):
+    """Mes a mes: cada mes se confirma por separado y se puede cancelar entre uno y otro"""
+    meses = sorted(set(parametros.meses))
+    asignados, procesados, omitidos = 0, [], []
+    db = database.SessionLocal()
+    try:
+        for i, month in enumerate(meses):
+            avance(i, len(meses), f"Cumpleaños de {MESES[month - 1]}")
+            resultado = _asignar_cumpleanos(parametros.year, [month], db)
+            asignados += resultado["turnos_asignados"]
+            procesados += resultado["meses_procesados"]
+            omitidos += resultado["meses_omitidos"]
+    finally:
+        db.close()
+    return {"mensaje": f"Cumpleaños asignados: {asignados}", "turnos_asignados": asignados,
+            "meses_procesados": procesados, "meses_omitidos": omitidos}
+
+@registrar_tipo("ausencias", ParametrosAusencias, validar=lambda p: _validar_ausencias(p.ausencias))
+def _trabajo_ausencias(parametros: ParametrosAusencias, avance: Avance):
+    """Por bloques de TAMANO_BLOQUE_AUSENCIAS, cada uno en su transacción (no todo o nada como /turnos/ausencia/rango/lote)"""
+    ausencias = parametros.ausencias
+    actualizados = creados = 0
+    db = database.SessionLocal()
+    try:
+        for inicio in range(0, len(ausencias), TAMANO_BLOQUE_AUSENCIAS):
+            avance(inicio, len(ausencias), f"{inicio} de {len(ausencias)} ausencias")
+            a, c = _aplicar_ausencias(ausencias[inicio:inicio + TAMANO_BLOQUE_AUSENCIAS], db)
+            actualizados, creados = actualizados + a, creados + c
+    finally:
+        db.close()
+    return {"mensaje": f"{len(ausencias)} ausencias asignadas",
+            "turnos_actualizados": actualizados, "turnos_creados": creados}
+
+# ── Endpoints ─────────────────────────────────────────────────────────────
+
+def _respuesta(trabajo: TrabajoModel) -> Trabajo:
+    respuesta = Trabajo.model_validate(trabajo)
+    if trabajo.estado == "completado":
+        respuesta.resultado_url = f"/jobs/{trabajo.id}/resultado"
+    return respuesta
+
+def _trabajo_o_404(db: Session, trabajo_id: int, *opciones) -> TrabajoModel:
+    trabajo = db.query(TrabajoModel).options(*opciones).filter(TrabajoModel.id == trabajo_id).first()
+    if not trabajo:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return trabajo
+
+# ✅ Tipos de trabajo disponibles
+@router.get("/tipos", response_model=List[str])
+def listar_tipos():
+    return sorted(TIPOS)
+
+# ✅ Lanzar un trabajo: 202 con su id; el progreso se consulta en GET /jobs/{id}
+@router.post("", response_model=Trabajo, status_code=202)
+def lanzar_trabajo(datos: TrabajoCreate, db: Session = Depends(database.get_db)):
+    tipo = TIPOS.get(datos.tipo)
+    if tipo is None:
+        raise HTTPException(status_code=400, detail=f"Tipo de trabajo no válido. Use: {', '.join(sorted(TIPOS))}")
+    try:
+        parametros = tipo.parametros.model_validate(datos.parametros)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    if tipo.validar is not None:
+        tipo.validar(parametros)
+    try:
+        trabajo = crear_trabajo(db, datos.tipo, parametros)
+    except ColaLlena:
+        raise HTTPException(status_code=503, detail="Demasiados trabajos en cola, inténtelo más tarde",
+                            headers={"Retry-After": "30"})
+    return _respuesta(trabajo)
+
+# ✅ Trabajos recientes (más nuevos primero)
+@router.get("", response_model=List[Trabajo])
+def listar_trabajos(estado: Optional[EstadoTrabajo] = None, limit: int = 50, db: Session = Depends(database.get_db)):
+    query = db.query(TrabajoModel)
+    if estado is not None:
+        query = query.filter(TrabajoModel.estado == estado)
+    return [_respuesta(t) for t in query.order_by(TrabajoModel.id.desc()).limit(min(limit, 500))]
+
+# ✅ Estado y progreso de un trabajo
+@router.get("/{trabajo_id}", response_model=Trabajo)
+def get_trabajo(trabajo_id: int, db: Session = Depends(database.get_db)):
+    return _respuesta(_trabajo_o_404(db, trabajo_id))
+
+# ✅ Resultado: JSON o el fichero generado
+@router.get("/{trabajo_id}/resultado")
+def get_resultado_trabajo(trabajo_id: int, db: Session = Depends(database.get_db)):
+    trabajo = _trabajo_o_404(db, trabajo_id, undefer(TrabajoModel.resultado))
+    if trabajo.estado != "completado":
+        raise HTTPException(status_code=409, detail=f"El trabajo no tiene resultado (estado: {trabajo.estado})")
+    if trabajo.nombre_fichero is not None:
+        ruta = ruta_fichero(trabajo.ruta_fichero) if trabajo.ruta_fichero else None
+        if ruta is None or not ruta.is_file():
+            raise HTTPException(status_code=404, detail="El fichero del resultado ya no está disponible")
+        return FileResponse(ruta, media_type=trabajo.tipo_medio, filename=trabajo.nombre_fichero)
+    return JSONResponse(trabajo.resultado)
+
+# ✅ Cancelar: uno pendiente se cancela ya; uno en curso para en su siguiente paso
+@router.delete("/{trabajo_id}", response_model=Trabajo)
+def cancelar_trabajo(trabajo_id: int, db: Session = Depends(database.get_db)):
+    trabajo = _trabajo_o_404(db, trabajo_id)
+    if trabajo.estado not in ("pendiente", "en_curso"):
+        raise HTTPException(status_code=409, detail=f"El trabajo ya ha terminado (estado: {trabajo.estado})")
+    pedir_cancelacion(db, trabajo_id)
+    db.refresh(trabajo)
+    return _respuesta(trabajo)
@@ -1,21 +1,180 @@
 # backend/app/routers/turnos.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.exc import IntegrityError
-from app.models.turno import Turno as TurnoModel
+from app.models.turno import Turno as TurnoModel, TurnoVersionMes
+from app.models.cumpleanos import CumpleanosProcesado
 from app.schemas.turno import Turno, TurnoCreate, TurnoUpdate,AusenciaRangoCreate,TurnoDisplay
+from app.schemas.turno import TurnoLoteCreate, TurnoLoteRespuesta, AusenciaRangoLote
+from app.schemas.turno import RotacionRequest, RotacionRespuesta, ValidacionRequest, ValidacionRespuesta
+from app.schemas.turno import CambiosRespuesta, HistorialTurno, RejillaHistorica
+from app.services.turnos import COLUMNAS_RESULTADO, upsert_turnos, registrar_escritura
+from app.services.rotacion import aplicar_rotacion, aplicar_rotacion_async
+from app.services.cambios import CursorCaducado, LIMITE_DEFECTO, LIMITE_MAXIMO, cursor_actual, leer_cambios
+from app.services.difusion import eventos_turnos
+from app.services.historial import COLUMNAS_VALOR, historial_celdas, rejilla_en, rejilla_en_async
+from app.services.resumen import rango_mes
+from app.services.exportacion import MESES, exportar_mes, exportar_year, tipo_medio, cabeceras_descarga
 from app.models import usuario as models
 #from app.models.ausencia import Ausencia as AusenciaModel
-from typing import List
+from typing import List, Literal, Optional
 from app import database
-from datetime import date,timedelta
+from app.routers.asincrono import implementacion_async, serializar
+from datetime import date, datetime, timedelta, timezone
+import base64
+import hashlib
+
+try:
+    import msgpack
+except ImportError:  # opcional: solo para ?formato=matriz con Accept: application/msgpack
+    msgpack = None
 
 router = APIRouter(prefix="/turnos", tags=["turnos"])
 
+def rango_mes_valido(year: int, month: int) -> tuple[date, date]:
+    if not 1 <= month <= 12:
+        raise HTTPException(status_code=400, detail="Mes no válido")
+    return rango_mes(year, month)
+
+def etag_mes(year: int, month: int, db: Session, variante: str = "") -> str:
+    """
+    Versión barata del mes: contador de escrituras + nº de filas + último updated_at.
+    El contador cubre las escrituras de la API; filas y updated_at, las hechas por fuera.
+    `variante` distingue representaciones del mismo mes (lista, matriz JSON, matriz msgpack).
+    """
+    start_date, end_date = rango_mes_valido(year, month)
+    version = select(TurnoVersionMes.version).where(
+        TurnoVersionMes.year == year,
+        TurnoVersionMes.month == month
+    ).scalar_subquery()
+    fila = db.query(
+        version,
+        func.count(TurnoModel.id),
+        func.max(TurnoModel.updated_at)
+    ).filter(
+        TurnoModel.fecha >= start_date,
+        TurnoModel.fecha < end_date
+    ).one()
+    token = f"{year}-{month:02d}.v{fila[0] or 0}.n{fila[1]}.{fila[2] or ''}"
+    if variante:
+        token += f".{variante}"
+    return '"' + hashlib.md5(token.encode()).hexdigest() + '"'
+
+def etag_coincide(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidatos = {e.strip().removeprefix("W/") for e in if_none_match.split(",")}
+    return "*" in candidatos or etag in candidatos
+
+MEDIA_MSGPACK = "application/msgpack"
+
+def empaquetar_bits(valores: list[bool]) -> bytes:
+    """Bit i del resultado = valores[i] (LSB primero dentro de cada byte)"""
+    datos = bytearray((len(valores) + 7) // 8)
+    for i, valor in enumerate(valores):
+        if valor:
+            datos[i >> 3] |= 1 << (i & 7)
+    return bytes(datos)
+
+def _select_matriz(start_date: date, end_date: date):
+    return select(
+        TurnoModel.usuario_id, TurnoModel.fecha, TurnoModel.turno,
+        TurnoModel.es_reten, TurnoModel.modificado_manual
+    ).where(
+        TurnoModel.fecha >= start_date,
+        TurnoModel.fecha < end_date
+    )
+
+def matriz_mes(year: int, month: int, db: Session) -> dict:
+    """
+    Rejilla del mes en formato compacto: `celdas[u * len(dias) + d]` es el índice en
+    `codigos` del turno del usuario `usuarios[u]` el día `dias[d]` (0 = sin turno).
+    es_reten y modificado_manual van empaquetados en bits con el mismo índice.
+    No incluye ids: las celdas se editan por (usuario, fecha) con /turnos/asignar.
+    """
+    start_date, end_date = rango_mes_valido(year, month)
+    return _construir_matriz(year, month, db.execute(_select_matriz(start_date, end_date)).all())
+
+def _construir_matriz(year: int, month: int, filas: list) -> dict:
+    start_date, end_date = rango_mes(year, month)
+    n_dias = (end_date - start_date).days
+    usuarios = sorted({f.usuario_id for f in filas})
+    posicion = {uid: i for i, uid in enumerate(usuarios)}
+    codigos = [""] + sorted({f.turno for f in filas})
+    indice_codigo = {c: i for i, c in enumerate(codigos)}
+
+    celdas = [0] * (len(usuarios) * n_dias)
+    reten = [False] * len(celdas)
+    manual = [False] * len(celdas)
+    for f in filas:
+        i = posicion[f.usuario_id] * n_dias + (f.fecha - start_date).days
+        celdas[i] = indice_codigo[f.turno]
+        reten[i] = bool(f.es_reten)
+        manual[i] = bool(f.modificado_manual)
+
+    return {
+        "year": year,
+        "month": month,
+        "usuarios": usuarios,
+        "dias": [(start_date + timedelta(days=d)).isoformat() for d in range(n_dias)],
+        "codigos": codigos,
+        "celdas": celdas,
+        "es_reten": empaquetar_bits(reten),
+        "modificado_manual": empaquetar_bits(manual),
+    }
+
+def _acepta_msgpack(request: Request) -> bool:
+    return MEDIA_MSGPACK in request.headers.get("accept", "")
+
+def _formato_mes(request: Request, formato: str) -> tuple[bool, str]:
+    """(responder en MessagePack, variante del ETag)"""
+    usar_msgpack = formato == "matriz" and _acepta_msgpack(request)
+    if usar_msgpack and msgpack is None:
+        raise HTTPException(status_code=406, detail="MessagePack no disponible en el servidor (instalar msgpack)")
+    return usar_msgpack, "" if formato == "lista" else "matriz-msgpack" if usar_msgpack else "matriz-json"
+
+def _cabeceras_mes(etag: str, cursor: int) -> dict:
+    return {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept",
+            "X-Cursor-Cambios": str(cursor)}
+
+def _respuesta_matriz(matriz: dict, usar_msgpack: bool, cabeceras: dict) -> Response:
+    """Formato compacto: JSON (flags en base64) o MessagePack (flags en binario)"""
+    if usar_msgpack:
+        return Response(content=msgpack.packb(matriz), media_type=MEDIA_MSGPACK, headers=cabeceras)
+    for campo in ("es_reten", "modificado_manual"):
+        matriz[campo] = base64.b64encode(matriz[campo]).decode("ascii")
+    return JSONResponse(content=matriz, headers=cabeceras)
+
 @router.get("/mes/{year}/{month}", response_model=List[TurnoDisplay])
-def get_turnos_por_mes(year: int, month: int, db: Session = Depends(database.get_db)):
-    start_date = date(year, month, 1)
-    end_date = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+def get_turnos_por_mes(
+    year: int,
+    month: int,
+    request: Request,
+    response: Response,
+    formato: Literal["lista", "matriz"] = "lista",
+    db: Session = Depends(database.get_read_db)
+):
+    start_date, end_date = rango_mes_valido(year, month)
+    usar_msgpack, variante = _formato_mes(request, formato)
+
+    # ✅ Cursor de /turnos/cambios leído antes que el mes: desde él no se pierde ninguna escritura
+    cursor = cursor_actual(db)
+
+    # ✅ Si el cliente ya tiene esta versión del mes, 304 sin leer ni serializar filas
+    etag = etag_mes(year, month, db, variante)
+    cabeceras = _cabeceras_mes(etag, cursor)
+    if etag_coincide(request, etag):
+        return Response(status_code=304, headers=cabeceras)
+
+    if formato == "matriz":
+        return _respuesta_matriz(matriz_mes(year, month, db), usar_msgpack, cabeceras)
+
+    response.headers.update(cabeceras)
     
     # ✅ Solo cargar turnos_asignados
     return db.query(TurnoModel).filter(
@@ -23,168 +182,374 @@ def get_turnos_por_mes(year: int, month: int, db: Session = Depends(database.get
         TurnoModel.fecha < end_date
     ).all()
 
-# ✅ CREAR UN NUEVO TURNO (solo si no existe)
+@implementacion_async(get_turnos_por_mes)
+async def _get_turnos_por_mes_async(year: int, month: int, request: Request, response: Response,
+                                    formato: str, db: AsyncSession):
+    start_date, end_date = rango_mes_valido(year, month)
+    usar_msgpack, variante = _formato_mes(request, formato)
+    cursor = await db.run_sync(cursor_actual)
+    etag = await db.run_sync(lambda sesion: etag_mes(year, month, sesion, variante))
+    cabeceras = _cabeceras_mes(etag, cursor)
+    if etag_coincide(request, etag):
+        return Response(status_code=304, headers=cabeceras)
+
+    if formato == "matriz":
+        filas = (await db.execute(_select_matriz(start_date, end_date))).all()
+        return await run_in_threadpool(
+            lambda: _respuesta_matriz(_construir_matriz(year, month, filas), usar_msgpack, cabeceras)
+        )
+
+    # Filas sin objetos ORM: solo se serializan
+    filas = (await db.execute(select(*COLUMNAS_RESULTADO).where(
+        TurnoModel.fecha >= start_date,
+        TurnoModel.fecha < end_date
+    ))).all()
+    return await run_in_threadpool(serializar, List[TurnoDisplay], filas, headers=cabeceras)
+
+# ✅ CAMBIOS DESDE UN CURSOR: celdas creadas, modificadas o borradas (lápidas) tras `desde`
+# Sin `desde` solo devuelve el cursor actual; 410 si el cursor ya se podó del registro
+@router.get("/cambios", response_model=CambiosRespuesta)
+def get_cambios(
+    desde: Optional[int] = None,
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    limit: int = Query(LIMITE_DEFECTO, ge=1, le=LIMITE_MAXIMO),
+    db: Session = Depends(database.get_db)
+):
+    if month is not None and (year is None or not 1 <= month <= 12):
+        raise HTTPException(status_code=400, detail="Mes no válido")
+    if desde is None:
+        return {"cursor": cursor_actual(db), "hay_mas": False, "cambios": []}
+    try:
+        return leer_cambios(db, desde, limit, year, month)
+    except CursorCaducado:
+        raise HTTPException(status_code=410, detail="Cursor caducado: volver a cargar el mes")
+
+# ✅ HISTORIAL DE UNA PERSONA: cada cambio de sus celdas con el valor anterior y el nuevo
+@router.get("/historial", response_model=List[HistorialTurno])
+def get_historial(usuario_id: int, desde: date, hasta: date, db: Session = Depends(database.get_read_db)):
+    if hasta < desde:
+        raise HTTPException(status_code=400, detail="Rango de fechas no válido")
+    return historial_celdas(db, usuario_id, desde, hasta)
+
+# ✅ MES TAL COMO ESTABA EN UN MOMENTO: ?en=2025-03-05T10:00:00 (sin zona = UTC, como registrado_at)
+def _momento_utc(en: datetime) -> datetime:
+    return en.astimezone(timezone.utc).replace(tzinfo=None) if en.tzinfo is not None else en
+
+@router.get("/mes/{year}/{month}/historial", response_model=RejillaHistorica)
+def get_turnos_mes_en(year: int, month: int, en: datetime, db: Session = Depends(database.get_read_db)):
+    rango_mes_valido(year, month)
+    return rejilla_en(db, year, month, _momento_utc(en))
+
+@implementacion_async(get_turnos_mes_en)
+async def _get_turnos_mes_en_async(year: int, month: int, en: datetime, db: AsyncSession):
+    rango_mes_valido(year, month)
+    return await rejilla_en_async(db, year, month, _momento_utc(en))
+
+# ✅ STREAM EN VIVO (Server-Sent Events): un evento por cada commit que cambia turnos
+# El cliente aplica el lote si su `desde` coincide con su cursor; si no, pide /turnos/cambios
+@router.get("/stream")
+async def stream_turnos(year: int, month: int):
+    rango_mes_valido(year, month)
+    return StreamingResponse(
+        eventos_turnos(year, month),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# ✅ Exportación de la rejilla en streaming: se lee y se envía mes a mes, fila a fila
+@router.get("/mes/{year}/{month}/export")
+def exportar_turnos_mes(year: int, month: int, formato: Literal["xlsx", "csv"] = "xlsx"):
+    rango_mes_valido(year, month)
+    return StreamingResponse(
+        exportar_mes(year, month, formato),
+        media_type=tipo_medio(formato),
+        headers=cabeceras_descarga(f"Turnos_{MESES[month - 1]}_{year}", formato)
+    )
+
+@router.get("/year/{year}/export")
+def exportar_turnos_year(year: int, formato: Literal["xlsx", "csv"] = "xlsx"):
+    """XLSX con una hoja por mes; CSV con todos los meses seguidos y columna Mes"""
+    return StreamingResponse(
+        exportar_year(year, formato),
+        media_type=tipo_medio(formato),
+        headers=cabeceras_descarga(f"Turnos_{year}", formato)
+    )
+
 @router.post("/", response_model=Turno)
 def crear_turno(turno: TurnoCreate, db: Session = Depends(database.get_db)):
     db_turno = TurnoModel(**turno.model_dump())
     db.add(db_turno)
+    db.flush()
+    registrar_escritura(db, [turno.model_dump()])
     db.commit()
     db.refresh(db_turno)
     return db_turno
 
 # ✅ ACTUALIZAR UN TURNO EXISTENTE POR ID
+def _valores_historial(db_turno: TurnoModel) -> dict:
+    """Valor de la celda antes de tocarla, para turnos_historial"""
+    return {columna: getattr(db_turno, columna) for columna in COLUMNAS_VALOR}
+
 @router.patch("/{turno_id}", response_model=Turno)
 def actualizar_turno(turno_id: int, turno: TurnoUpdate, db: Session = Depends(database.get_db)):
-    db_turno = db.query(TurnoModel).filter(TurnoModel.id == turno_id).first()
+    db_turno = db.query(TurnoModel).filter(TurnoModel.id == turno_id).with_for_update().first()
     if db_turno is None:
         raise HTTPException(status_code=404, detail="Turno no encontrado")
     
+    anterior = {"usuario_id": db_turno.usuario_id, "fecha": db_turno.fecha}
+    valores = _valores_historial(db_turno)
     for key, value in turno.model_dump(exclude_unset=True).items():
         if value is not None:
             setattr(db_turno, key, value)
     
+    db.flush()
+    registrar_escritura(
+        db, [anterior, {"usuario_id": db_turno.usuario_id, "fecha": db_turno.fecha}],
+        anteriores={(anterior["usuario_id"], anterior["fecha"]): valores}
+    )
     db.commit()
     db.refresh(db_turno)
     return db_turno
 
+# ✅ ELIMINAR UN TURNO: queda como lápida en /turnos/cambios
+@router.delete("/{turno_id}")
+def eliminar_turno(turno_id: int, db: Session = Depends(database.get_db)):
+    db_turno = db.query(TurnoModel).filter(TurnoModel.id == turno_id).with_for_update().first()
+    if db_turno is None:
+        raise HTTPException(status_code=404, detail="Turno no encontrado")
+
+    celda = {"usuario_id": db_turno.usuario_id, "fecha": db_turno.fecha}
+    valores = _valores_historial(db_turno)
+    db.delete(db_turno)
+    db.flush()
+    registrar_escritura(db, [celda], anteriores={(celda["usuario_id"], celda["fecha"]): valores})
+    db.commit()
+    return {"ok": True}
+
+# Columnas que /asignar sobrescribe cuando la celda ya existe
+COLUMNAS_ASIGNACION = ["turno", "es_reten", "generado_automático", "estado", "modificado_manual"]
+
+def _filas_asignacion(celdas: List[TurnoCreate]) -> list[dict]:
+    return [{**celda.model_dump(), "modificado_manual": True} for celda in celdas]  # Cualquier asignación manual se marca así
+
+def _asignar_celdas(celdas: List[TurnoCreate], db: Session) -> list:
+    """Upsert de asignaciones manuales en una única transacción"""
+    return _asignar_filas(db, _filas_asignacion(celdas))
+
+def _asignar_filas(db: Session, filas: list[dict]) -> list:
+    try:
+        resultados = upsert_turnos(db, filas, COLUMNAS_ASIGNACION)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Error al asignar turnos: usuario inexistente o datos inválidos")
+    return resultados
+
 # ✅ UPSERT: Crea o actualiza un turno basado en usuario_id + fecha
 @router.post("/asignar", response_model=Turno)
 def asignar_turno(turno: TurnoCreate, db: Session = Depends(database.get_db)):
-    # Buscar turno existente para este usuario en esta fecha
-    db_turno = db.query(TurnoModel).filter(
-        TurnoModel.usuario_id == turno.usuario_id,
-        TurnoModel.fecha == turno.fecha
-    ).first()
-    
-    if db_turno:
-        # Actualizar el turno existente
-        update_data = turno.model_dump()
-        for key, value in update_data.items():
-            if value is not None:
-                setattr(db_turno, key, value)
-        # Marcar como modificado manualmente
-        db_turno.modificado_manual = True
-        db.commit()
-        db.refresh(db_turno)
-        return db_turno
-    else:
-        # Crear nuevo turno
-        nuevo_turno = TurnoModel(
-            **turno.model_dump(),
-            modificado_manual=True  # Cualquier asignación manual se marca así
-        )
-        db.add(nuevo_turno)
-        try:
+    return _asignar_celdas([turno], db)[0]
+
+# ✅ UPSERT EN LOTE: todas las celdas en una sola transacción (INSERT ... ON CONFLICT)
+def _respuesta_lote(resultados: list) -> dict:
+    creados = sum(1 for r in resultados if r["creado"])
+    return {
+        "turnos_creados": creados,
+        "turnos_actualizados": len(resultados) - creados,
+        "resultados": resultados
+    }
+
+@router.post("/asignar/lote", response_model=TurnoLoteRespuesta)
+def asignar_turnos_lote(lote: TurnoLoteCreate, db: Session = Depends(database.get_db)):
+    return _respuesta_lote(_asignar_celdas(lote.celdas, db))
+
+@implementacion_async(asignar_turnos_lote)
+async def _asignar_turnos_lote_async(lote: TurnoLoteCreate, db: AsyncSession):
+    # El upsert y lo que cuelga de él (resumen, cambios, histórico) es E/S: va por run_sync
+    filas = await run_in_threadpool(_filas_asignacion, lote.celdas)
+    return _respuesta_lote(await db.run_sync(_asignar_filas, filas))
+
+# ✅ GENERAR ROTACIÓN: ciclo por grupo con desfase por usuario (ver services/rotacion.py)
+# Respeta celdas modificadas a mano y ausencias; con dry_run solo devuelve los cambios previstos
+@router.post("/rotacion", response_model=RotacionRespuesta)
+def generar_rotacion(request: RotacionRequest, db: Session = Depends(database.get_db)):
+    try:
+        resultado = aplicar_rotacion(db, request)
+        if not request.dry_run:
             db.commit()
-            db.refresh(nuevo_turno)
-            return nuevo_turno
-        except IntegrityError:
-            # En caso muy raro de carrera, reintentar
-            db.rollback()
-            db_turno = db.query(TurnoModel).filter(
-                TurnoModel.usuario_id == turno.usuario_id,
-                TurnoModel.fecha == turno.fecha
-            ).first()
-            if db_turno:
-                update_data = turno.model_dump()
-                for key, value in update_data.items():
-                    if value is not None:
-                        setattr(db_turno, key, value)
-                db_turno.modificado_manual = True
-                db.commit()
-                db.refresh(db_turno)
-                return db_turno
-            raise HTTPException(status_code=400, detail="Error al asignar turno: conflicto inesperado")
-
-# ✅ Asignar cumpleaños (sin cambios, pero corregido el mes)
-@router.post("/cumpleanos/mes/{year}/{month}")
-def asignar_cumpleanos_mes(year: int, month: int, db: Session = Depends(database.get_db)):
-    usuarios = db.query(models.Usuario).filter(
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    return resultado
+
+@implementacion_async(generar_rotacion)
+async def _generar_rotacion_async(request: RotacionRequest, db: AsyncSession):
+    try:
+        resultado = await aplicar_rotacion_async(db, request)
+        if not request.dry_run:
+            await db.commit()
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    return resultado
+
+# ✅ VALIDAR CUADRANTE: cobertura mínima por rol y franja, noche seguida de mañana,
+# días seguidos y horas de descanso (ver services/validacion.py)
+def _rango_validacion(request: ValidacionRequest) -> tuple[date, date]:
+    if request.desde is not None:
+        return request.desde, request.hasta
+    if request.month:
+        desde, fin = rango_mes(request.year, request.month)
+        return desde, fin - timedelta(days=1)
+    return date(request.year, 1, 1), date(request.year, 12, 31)
+
+def _opciones_validacion(request: ValidacionRequest) -> dict:
+    return {"rol_ids": request.rol_ids, "cobertura": request.cobertura,
+            "max_dias_consecutivos": request.max_dias_consecutivos,
+            "descanso_minimo_horas": request.descanso_minimo_horas}
+
+@router.post("/validacion", response_model=ValidacionRespuesta)
+def validar_cuadrante(request: ValidacionRequest, db: Session = Depends(database.get_read_db)):
+    # Importación diferida: NumPy (~0,1 s) solo hace falta aquí, no en cada arranque de worker
+    from app.services.validacion import validar_turnos
+    return validar_turnos(db, *_rango_validacion(request), **_opciones_validacion(request))
+
+@implementacion_async(validar_cuadrante)
+async def _validar_cuadrante_async(request: ValidacionRequest, db: AsyncSession):
+    from app.services.validacion import validar_turnos_async
+    return await validar_turnos_async(db, *_rango_validacion(request), **_opciones_validacion(request))
+
+def _firma_usuarios(db: Session) -> str:
+    """Resumen barato de la tabla de usuarios: cambia al crear, editar o borrar alguno"""
+    total, max_id, max_updated = db.query(
+        func.count(models.Usuario.id),
+        func.max(models.Usuario.id),
+        func.max(models.Usuario.updated_at)
+    ).one()
+    return f"{total}:{max_id}:{max_updated}"
+
+def _asignar_cumpleanos(year: int, meses: List[int], db: Session) -> dict:
+    """
+    Asigna 'c' en el cumpleaños de los usuarios activos de los meses indicados con un
+    único upsert, sin tocar celdas que ya tengan otro código. Los meses ya procesados
+    con la misma firma de usuarios se omiten sin escribir nada.
+    """
+    firma = _firma_usuarios(db)
+    procesados = {
+        p.month for p in db.query(CumpleanosProcesado).filter(
+            CumpleanosProcesado.year == year,
+            CumpleanosProcesado.month.in_(meses)
+        ).all() if p.firma == firma
+    }
+    pendientes = [m for m in meses if m not in procesados]
+    if not pendientes:
+        return {"mensaje": "Cumpleaños asignados: 0", "turnos_asignados": 0,
+                "meses_procesados": [], "meses_omitidos": sorted(procesados)}
+
+    usuarios = db.query(models.Usuario.id, models.Usuario.cumple_anios).filter(
         models.Usuario.estado == "activo",
-        models.Usuario.cumple_anios.isnot(None)
+        models.Usuario.cumple_anios.isnot(None),
+        func.extract('month', models.Usuario.cumple_anios).in_(pendientes)
     ).all()
-    
-    turnos_creados = 0
-    for usuario in usuarios:
-        if usuario.cumple_anios.month == month:
-            fecha_cumple = date(year, month, usuario.cumple_anios.day)
-            
-            # Verificar si YA EXISTE un turno (y no es 'c')
-            turno_existente = db.query(TurnoModel).filter(
-                TurnoModel.usuario_id == usuario.id,
-                TurnoModel.fecha == fecha_cumple
-            ).first()
-            
-            # Solo asignar 'c' si NO hay turno o si ya es 'c'
-            if not turno_existente or turno_existente.turno == 'c':
-                if turno_existente:
-                    # Actualizar a 'c'
-                    turno_existente.turno = 'c'
-                    turno_existente.generado_automático = True
-                    turno_existente.modificado_manual = False
-                else:
-                    # Crear nuevo
-                    nuevo_turno = TurnoModel(
-                        usuario_id=usuario.id,
-                        fecha=fecha_cumple,
-                        turno='c',
-                        es_reten=False,
-                        generado_automático=True,
-                        modificado_manual=False,
-                        estado="activo"
-                    )
-                    db.add(nuevo_turno)
-                turnos_creados += 1
-    
+
+    filas = []
+    for usuario_id, cumple in usuarios:
+        try:
+            fecha_cumple = date(year, cumple.month, cumple.day)
+        except ValueError:
+            continue  # 29/02 en año no bisiesto
+        filas.append({
+            "usuario_id": usuario_id,
+            "fecha": fecha_cumple,
+            "turno": 'c',
+            "es_reten": False,
+            "generado_automático": True,
+            "modificado_manual": False,
+            "estado": "activo"
+        })
+
+    # Solo asignar 'c' si NO hay turno o si ya es 'c'
+    resultados = upsert_turnos(
+        db, filas, ["turno", "generado_automático", "modificado_manual"],
+        donde=TurnoModel.turno == 'c'
+    )
+    for month in pendientes:
+        db.merge(CumpleanosProcesado(year=year, month=month, firma=firma))
     db.commit()
-    return {"mensaje": f"Cumpleaños asignados: {turnos_creados}"}
+
+    return {"mensaje": f"Cumpleaños asignados: {len(resultados)}", "turnos_asignados": len(resultados),
+            "meses_procesados": pendientes, "meses_omitidos": sorted(procesados)}
+
+# ✅ Asignar cumpleaños de un mes (idempotente: si nada cambió no escribe)
+@router.post("/cumpleanos/mes/{year}/{month}")
+def asignar_cumpleanos_mes(year: int, month: int, db: Session = Depends(database.get_db)):
+    if not 1 <= month <= 12:
+        raise HTTPException(status_code=400, detail="Mes no válido")
+    return _asignar_cumpleanos(year, [month], db)
+
+# ✅ Asignar cumpleaños de todo un año
+@router.post("/cumpleanos/{year}")
+def asignar_cumpleanos_year(year: int, db: Session = Depends(database.get_db)):
+    return _asignar_cumpleanos(year, list(range(1, 13)), db)
+
+TIPOS_AUSENCIA = ['v', 'b', 'c']
+
+def _validar_ausencias(ausencias: List[AusenciaRangoCreate]) -> None:
+    for ausencia in ausencias:
+        if ausencia.fecha_inicio > ausencia.fecha_fin:
+            raise HTTPException(status_code=400, detail="Fecha inicio no puede ser mayor que fecha fin")
+        if ausencia.tipo not in TIPOS_AUSENCIA:
+            raise HTTPException(status_code=400, detail="Tipo de ausencia no válido. Use: 'v', 'b', 'c'")
+
+def _aplicar_ausencias(ausencias: List[AusenciaRangoCreate], db: Session) -> tuple[int, int]:
+    """Escribe todos los días de los rangos con un único upsert; devuelve (actualizados, creados)"""
+    _validar_ausencias(ausencias)
+    filas = []
+    for ausencia in ausencias:
+        dias = (ausencia.fecha_fin - ausencia.fecha_inicio).days + 1
+        filas.extend({
+            "usuario_id": ausencia.usuario_id,
+            "fecha": ausencia.fecha_inicio + timedelta(days=i),
+            "turno": ausencia.tipo,
+            "es_reten": False,
+            "generado_automático": False,  # ← No es automático
+            "modificado_manual": True,     # ← Es una modificación manual explícita
+            "estado": "activo"
+        } for i in range(dias))
+
+    try:
+        # ✅ SIEMPRE actualizar con ausencia (incluso si es manual)
+        resultados = upsert_turnos(db, filas, ["turno", "generado_automático", "modificado_manual"])
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Error al asignar ausencia: usuario inexistente")
+
+    turnos_creados = sum(1 for r in resultados if r["creado"])
+    return len(resultados) - turnos_creados, turnos_creados
 
 @router.post("/ausencia/rango")
 def asignar_ausencia_rango(
     ausencia: AusenciaRangoCreate,
     db: Session = Depends(database.get_db)
 ):
-    if ausencia.fecha_inicio > ausencia.fecha_fin:
-        raise HTTPException(status_code=400, detail="Fecha inicio no puede ser mayor que fecha fin")
-    
-    if ausencia.tipo not in ['v', 'b', 'c']:
-        raise HTTPException(status_code=400, detail="Tipo de ausencia no válido. Use: 'v', 'b', 'c'")
-    
-    current = ausencia.fecha_inicio
-    turnos_actualizados = 0
-    turnos_creados = 0
-    
-    while current <= ausencia.fecha_fin:
-        turno_existente = db.query(TurnoModel).filter(
-            TurnoModel.usuario_id == ausencia.usuario_id,
-            TurnoModel.fecha == current
-        ).first()
-        
-        if turno_existente:
-            # ✅ SIEMPRE actualizar con ausencia (incluso si es manual)
-            turno_existente.turno = ausencia.tipo
-            turno_existente.generado_automático = False  # ← No es automático
-            turno_existente.modificado_manual = True     # ← Es una modificación manual explícita
-            turnos_actualizados += 1
-        else:
-            # Crear nuevo turno de ausencia
-            nuevo_turno = TurnoModel(
-                usuario_id=ausencia.usuario_id,
-                fecha=current,
-                turno=ausencia.tipo,
-                es_reten=False,
-                generado_automático=False,
-                modificado_manual=True,  # ← Es manual
-                estado="activo"
-            )
-            db.add(nuevo_turno)
-            turnos_creados += 1
-        
-        current += timedelta(days=1)
-    
-    db.commit()
+    turnos_actualizados, turnos_creados = _aplicar_ausencias([ausencia], db)
     return {
         "mensaje": f"Ausencia '{ausencia.tipo}' asignada del {ausencia.fecha_inicio} al {ausencia.fecha_fin}",
         "turnos_actualizados": turnos_actualizados,
         "turnos_creados": turnos_creados
-    }
\ No newline at end of file
+    }
+
+# ✅ Varias ausencias (usuarios y rangos distintos) en una sola transacción
+@router.post("/ausencia/rango/lote")
+def asignar_ausencias_rango_lote(
+    lote: AusenciaRangoLote,
+    db: Session = Depends(database.get_db)
+):
+    turnos_actualizados, turnos_creados = _aplicar_ausencias(lote.ausencias, db)
+    return {
+        "mensaje": f"{len(lote.ausencias)} ausencias asignadas",
+        "turnos_actualizados": turnos_actualizados,
+        "turnos_creados": turnos_creados
+    }
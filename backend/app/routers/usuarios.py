@@ -1,11 +1,15 @@
 # backend/app/routers/usuarios.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import asc
-from typing import List
+from sqlalchemy import func, or_
+from datetime import date
+from typing import Optional
 from app.schemas import usuario as schemas
+from app.schemas.paginacion import Pagina
 from app.models import usuario as models
 from app import database
+from app.services.paginacion import paginar, LIMITE_DEFECTO, LIMITE_MAXIMO
+from app.services.resumen import recalcular_usuario_meses
 
 router = APIRouter(prefix="/usuarios", tags=["usuarios"])
 
@@ -17,26 +21,76 @@ def crear_usuario(usuario: schemas.UsuarioCreate, db: Session = Depends(database
     db.refresh(db_usuario)
     return db_usuario
 
-@router.get("/", response_model=List[schemas.Usuario])
-def listar_usuarios(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
-    return db.query(models.Usuario).order_by(asc(models.Usuario.id)).offset(skip).limit(limit).all()
+# ✅ Paginado por cursor (ver services/paginacion.py) y filtrado en el servidor
+@router.get("/", response_model=Pagina[schemas.Usuario])
+def listar_usuarios(
+    cursor: Optional[str] = None,
+    limit: int = Query(LIMITE_DEFECTO, ge=1, le=LIMITE_MAXIMO),
+    estado: Optional[str] = None,
+    rol_id: Optional[int] = None,
+    ingreso_desde: Optional[date] = None,
+    ingreso_hasta: Optional[date] = None,
+    salida_desde: Optional[date] = None,
+    salida_hasta: Optional[date] = None,
+    nombre: Optional[str] = Query(None, min_length=1, description="Prefijo de nombres, apellidos o usuario"),
+    db: Session = Depends(database.get_read_db)
+):
+    Usuario = models.Usuario
+    query = db.query(Usuario)
+    if estado is not None:
+        query = query.filter(Usuario.estado == estado)
+    if rol_id is not None:
+        query = query.filter(Usuario.rol_id == rol_id)
+    # Ventanas de fechas con extremos incluidos
+    if ingreso_desde is not None:
+        query = query.filter(Usuario.fecha_ingreso >= ingreso_desde)
+    if ingreso_hasta is not None:
+        query = query.filter(Usuario.fecha_ingreso <= ingreso_hasta)
+    if salida_desde is not None:
+        query = query.filter(Usuario.fecha_salida >= salida_desde)
+    if salida_hasta is not None:
+        query = query.filter(Usuario.fecha_salida <= salida_hasta)
+    if nombre:
+        prefijo = nombre.lower()
+        query = query.filter(or_(*[
+            func.lower(columna).startswith(prefijo, autoescape=True)
+            for columna in (Usuario.nombres, Usuario.apellidos, Usuario.usuario)
+        ]))
+
+    try:
+        filtros = {"estado": estado, "rol_id": rol_id, "ingreso_desde": ingreso_desde,
+                   "ingreso_hasta": ingreso_hasta, "salida_desde": salida_desde,
+                   "salida_hasta": salida_hasta, "nombre": nombre}
+        return paginar(query, Usuario.id, cursor, limit, filtros)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{usuario_id}", response_model=schemas.Usuario)
-def obtener_usuario(usuario_id: int, db: Session = Depends(database.get_db)):
+def obtener_usuario(usuario_id: int, db: Session = Depends(database.get_read_db)):
     usuario = db.query(models.Usuario).filter(models.Usuario.id == usuario_id).first()
     if usuario is None:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     return usuario
 
+def _actualizar_resumen_cumple(db: Session, db_usuario: models.Usuario, cumple_anterior):
+    """Si cambia el cumpleaños, el 'cumple_tomado' del resumen mensual de esos meses cambia también"""
+    if db_usuario.cumple_anios == cumple_anterior:
+        return
+    db.flush()
+    meses = {c.month for c in (cumple_anterior, db_usuario.cumple_anios) if c is not None}
+    recalcular_usuario_meses(db, db_usuario.id, meses)
+
 @router.put("/{usuario_id}", response_model=schemas.Usuario)
 def actualizar_usuario(usuario_id: int, usuario: schemas.UsuarioCreate, db: Session = Depends(database.get_db)):
     db_usuario = db.query(models.Usuario).filter(models.Usuario.id == usuario_id).first()
     if db_usuario is None:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     
+    cumple_anterior = db_usuario.cumple_anios
     for key, value in usuario.model_dump().items():
         setattr(db_usuario, key, value)
     
+    _actualizar_resumen_cumple(db, db_usuario, cumple_anterior)
     db.commit()
     db.refresh(db_usuario)
     return db_usuario
@@ -47,10 +101,12 @@ def actualizar_usuario_parcial(usuario_id: int, usuario: schemas.UsuarioUpdate,
     if db_usuario is None:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     
+    cumple_anterior = db_usuario.cumple_anios
     for key, value in usuario.model_dump(exclude_unset=True).items():
         if value is not None:
             setattr(db_usuario, key, value)
     
+    _actualizar_resumen_cumple(db, db_usuario, cumple_anterior)
     db.commit()
     db.refresh(db_usuario)
     return db_usuario
@@ -0,0 +1,49 @@
+# backend/app/schemas/codigo.py
+from pydantic import BaseModel, model_validator
+from typing import Optional, Literal
+
+Franja = Literal["mañana", "tarde", "noche"]
+TipoAusencia = Literal["vacaciones", "baja", "cumpleaños", "descanso"]
+
+class TurnoCodigoBase(BaseModel):
+    descripcion: str
+    horas: int = 0
+    franja: Optional[Franja] = None
+    contable: bool = False
+    ausencia: Optional[TipoAusencia] = None
+    color: Optional[str] = None  # ARGB, p. ej. "FFFFA500"
+    hora_inicio: Optional[int] = None  # hora de entrada, 0-23
+
+class TurnoCodigoCreate(TurnoCodigoBase):
+    codigo: str
+
+    @model_validator(mode="after")
+    def validar(self):
+        if not 1 <= len(self.codigo) <= 10:
+            raise ValueError("El código debe tener entre 1 y 10 caracteres")
+        validar_codigo(self.contable, self.franja, self.ausencia, self.hora_inicio)
+        return self
+
+class TurnoCodigoUpdate(BaseModel):
+    descripcion: Optional[str] = None
+    horas: Optional[int] = None
+    franja: Optional[Franja] = None
+    contable: Optional[bool] = None
+    ausencia: Optional[TipoAusencia] = None
+    color: Optional[str] = None
+    hora_inicio: Optional[int] = None
+
+class TurnoCodigo(TurnoCodigoBase):
+    codigo: str
+
+    class Config:
+        from_attributes = True
+
+def validar_codigo(contable: bool, franja: Optional[str], ausencia: Optional[str], hora_inicio: Optional[int] = None):
+    """Un código contable necesita franja y no puede ser ausencia; la hora de entrada va de 0 a 23"""
+    if contable and franja is None:
+        raise ValueError("Un código contable necesita franja")
+    if contable and ausencia is not None:
+        raise ValueError("Un código contable no puede ser una ausencia")
+    if hora_inicio is not None and not 0 <= hora_inicio <= 23:
+        raise ValueError("La hora de inicio debe estar entre 0 y 23")
@@ -1,23 +1,44 @@
-# backend/app/schemas/festivo.py
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, field_validator, model_validator
+from datetime import date
 from typing import Optional
 
+REGLAS_FESTIVO = ("fijo", "pascua", "unico")
+
+def validar_regla(regla: str, dia_mes: Optional[str], desplazamiento_pascua: Optional[int], fecha: Optional[date]):
+    """Cada regla necesita su dato: dia_mes (fijo), desplazamiento_pascua (pascua) o fecha (unico)"""
+    if regla not in REGLAS_FESTIVO:
+        raise ValueError('Regla debe ser "fijo", "pascua" o "unico"')
+    if regla == "fijo" and not dia_mes:
+        raise ValueError('Un festivo fijo necesita dia_mes (DD/MM)')
+    if regla == "pascua" and desplazamiento_pascua is None:
+        raise ValueError('Un festivo de Pascua necesita desplazamiento_pascua')
+    if regla == "unico" and fecha is None:
+        raise ValueError('Un festivo único necesita fecha')
+
+def validar_dia_mes(v):
+    if v is None:
+        return v
+    if len(v) != 5 or v[2] != '/':
+        raise ValueError('Formato de fecha debe ser DD/MM')
+    dia, mes = v.split('/')
+    if not (dia.isdigit() and mes.isdigit()):
+        raise ValueError('Día y mes deben ser números')
+    if not (1 <= int(dia) <= 31 and 1 <= int(mes) <= 12):
+        raise ValueError('Día o mes fuera de rango válido')
+    return v
+
 class FestivoBase(BaseModel):
-    dia_mes: str  # Formato: "DD/MM"
+    regla: str = "fijo"  # "fijo", "pascua" o "unico"
+    dia_mes: Optional[str] = None  # Formato: "DD/MM" (regla "fijo")
+    desplazamiento_pascua: Optional[int] = None  # Días respecto al Domingo de Pascua (regla "pascua")
+    fecha: Optional[date] = None  # Regla "unico"
     descripcion: str
     tipo: str  # "Nacional" o "Madrid"
     estado: Optional[str] = "activo"
     
     @field_validator('dia_mes')
     def validate_dia_mes(cls, v):
-        if not v or len(v) != 5 or v[2] != '/':
-            raise ValueError('Formato de fecha debe ser DD/MM')
-        dia, mes = v.split('/')
-        if not (dia.isdigit() and mes.isdigit()):
-            raise ValueError('Día y mes deben ser números')
-        if not (1 <= int(dia) <= 31 and 1 <= int(mes) <= 12):
-            raise ValueError('Día o mes fuera de rango válido')
-        return v
+        return validar_dia_mes(v)
     
     @field_validator('tipo')
     def validate_tipo(cls, v):
@@ -25,17 +46,35 @@ class FestivoBase(BaseModel):
             raise ValueError('Tipo debe ser "Nacional" o "Madrid"')
         return v
 
+    @model_validator(mode='after')
+    def validate_regla(self):
+        validar_regla(self.regla, self.dia_mes, self.desplazamiento_pascua, self.fecha)
+        return self
+
 class FestivoCreate(FestivoBase):
     pass
 
 class FestivoUpdate(BaseModel):
+    regla: Optional[str] = None
     dia_mes: Optional[str] = None
+    desplazamiento_pascua: Optional[int] = None
+    fecha: Optional[date] = None
     descripcion: Optional[str] = None
     tipo: Optional[str] = None
     estado: Optional[str] = None
 
+    @field_validator('dia_mes')
+    def validate_dia_mes(cls, v):
+        return validar_dia_mes(v)
+
 class Festivo(FestivoBase):
     id: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class FestivoFechaDisplay(BaseModel):
+    fecha: date
+    festivo_id: int
+    descripcion: str
+    tipo: str
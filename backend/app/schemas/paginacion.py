@@ -0,0 +1,10 @@
+# backend/app/schemas/paginacion.py
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+class Pagina(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None  # None en la última página
+    total: Optional[int] = None  # aproximado: se cuenta en la primera página y viaja en el cursor
@@ -1,7 +1,25 @@
-from pydantic import BaseModel
-from typing import List, Optional, Dict
+from pydantic import BaseModel, model_validator
+from typing import List, Optional, Dict, Literal
 from datetime import date
 
+class PeriodoTrabajado(BaseModel):
+    periodo: date  # primer día del mes o lunes de la semana
+    dias_trabajados: int
+    dias_festivos: int
+    horas_trabajadas: int
+
+class PeriodoTurnos(BaseModel):
+    periodo: date
+    mañana: int
+    tarde: int
+    noche: int
+    total: int
+    horas_trabajadas: int
+
+class PeriodoVacaciones(BaseModel):
+    periodo: date
+    vacaciones_tomadas: int
+
 class ReporteTrabajado(BaseModel):
     usuario_id: int
     nombres: str
@@ -14,6 +32,7 @@ class ReporteTrabajado(BaseModel):
     horas_trabajadas_raw: Optional[int] = None  # Suma directa de cada registro (para depurar diferencias)
     turnos_codigos: Optional[Dict[str, int]] = None
     dias_detalle: Optional[Dict[str, List[str]]] = None  # fecha ISO -> lista de códigos asignados
+    periodos: Optional[List[PeriodoTrabajado]] = None  # solo con agrupar
 
 class ReporteTurnos(BaseModel):
     usuario_id: int
@@ -26,6 +45,7 @@ class ReporteTurnos(BaseModel):
     total: int
     horas_trabajadas: int
     turnos_codigos: Optional[Dict[str, int]] = None
+    periodos: Optional[List[PeriodoTurnos]] = None  # solo con agrupar
 
 class ReporteFestivos(BaseModel):
     usuario_id: int
@@ -44,8 +64,25 @@ class ReporteVacaciones(BaseModel):
     vacaciones_tomadas: int
     cumpleaños_tomado: bool
     dias_restantes: int
+    periodos: Optional[List[PeriodoVacaciones]] = None  # solo con agrupar
 
 class ReporteRequest(BaseModel):
-    year: int
+    year: Optional[int] = None
     month: Optional[int] = None
-    usuario_id: Optional[int] = None
\ No newline at end of file
+    usuario_id: Optional[int] = None
+    desde: Optional[date] = None  # rango libre (ambas fechas incluidas) en lugar de year/month
+    hasta: Optional[date] = None
+    agrupar: Optional[Literal["mes", "semana"]] = None  # desglose por periodo dentro del rango
+
+    @model_validator(mode='after')
+    def validar_periodo(self):
+        if (self.desde is None) != (self.hasta is None):
+            raise ValueError("desde y hasta deben indicarse juntos")
+        if self.desde is not None:
+            if self.hasta < self.desde:
+                raise ValueError("hasta no puede ser anterior a desde")
+            if self.year is not None or self.month is not None:
+                raise ValueError("desde/hasta no se combinan con year/month")
+        elif self.year is None:
+            raise ValueError("Indicar year (y opcionalmente month) o desde/hasta")
+        return self
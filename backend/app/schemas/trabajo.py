@@ -0,0 +1,50 @@
+# backend/app/schemas/trabajo.py
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Annotated, Optional, List, Literal, Any
+from app.schemas.reporte import ReporteRequest
+from app.schemas.turno import AusenciaRangoLote
+
+EstadoTrabajo = Literal["pendiente", "en_curso", "completado", "error", "cancelado"]
+
+class TrabajoCreate(BaseModel):
+    tipo: str  # uno de GET /jobs/tipos
+    parametros: dict[str, Any] = {}
+
+class Trabajo(BaseModel):
+    id: int
+    tipo: str
+    parametros: dict[str, Any]
+    estado: EstadoTrabajo
+    progreso: float
+    mensaje: Optional[str] = None
+    cancelar: bool
+    error: Optional[str] = None
+    creado_at: datetime
+    iniciado_at: Optional[datetime] = None
+    actualizado_at: datetime
+    terminado_at: Optional[datetime] = None
+    resultado_url: Optional[str] = None  # solo completado
+    class Config:
+        from_attributes = True
+
+# ── Parámetros de cada tipo ───────────────────────────────────────────────
+
+class ParametrosReporte(ReporteRequest):
+    reporte: Literal["trabajados", "turnos", "festivos", "vacaciones"]
+    month: Optional[int] = Field(None, ge=1, le=12)
+
+class ParametrosReporteExport(ParametrosReporte):
+    formato: Literal["xlsx", "csv"] = "xlsx"
+
+class ParametrosExportTurnos(BaseModel):
+    year: int
+    month: Optional[int] = Field(None, ge=1, le=12)  # sin mes, el año entero
+    formato: Literal["xlsx", "csv"] = "xlsx"
+
+class ParametrosCumpleanos(BaseModel):
+    year: int
+    meses: List[Annotated[int, Field(ge=1, le=12)]] = Field(default_factory=lambda: list(range(1, 13)))
+
+class ParametrosAusencias(AusenciaRangoLote):
+    pass
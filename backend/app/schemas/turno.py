@@ -1,7 +1,7 @@
 # backend/app/schemas/turno.py
-from pydantic import BaseModel
-from datetime import date
-from typing import Optional
+from pydantic import BaseModel, model_validator
+from datetime import date, datetime
+from typing import Optional, List, Dict, Literal
 
 class TurnoBase(BaseModel):
     usuario_id: int
@@ -45,4 +45,160 @@ class AusenciaRangoCreate(BaseModel):
     usuario_id: int
     fecha_inicio: date
     fecha_fin: date
-    tipo: str  
\ No newline at end of file
+    tipo: str  
+class TurnoLoteCreate(BaseModel):
+    celdas: List[TurnoCreate]
+
+class TurnoLoteResultado(Turno):
+    creado: bool
+
+class TurnoLoteRespuesta(BaseModel):
+    turnos_creados: int
+    turnos_actualizados: int
+    resultados: List[TurnoLoteResultado]
+
+class AusenciaRangoLote(BaseModel):
+    ausencias: List[AusenciaRangoCreate]
+
+class PatronRotacion(BaseModel):
+    rol_id: int
+    ciclo: List[str]  # p. ej. ["M","M","T","T","N","N","d","d","d"]
+    usuario_ids: Optional[List[int]] = None  # por defecto, los usuarios activos del rol
+    desfases: Dict[int, int] = {}  # usuario_id -> días de desfase en el ciclo; sin él, escalonado por orden
+    sustitucion_festivo: Dict[str, str] = {}  # código -> código en festivos, p. ej. {"M": "FM1"}
+    sustituir_fines_de_semana: bool = False  # aplica también la sustitución en sábado y domingo
+
+class RotacionRequest(BaseModel):
+    desde: date
+    hasta: date  # incluido
+    grupos: List[PatronRotacion]
+    fecha_referencia: Optional[date] = None  # día 0 del ciclo; por defecto `desde`
+    dry_run: bool = False
+
+    @model_validator(mode="after")
+    def validar(self):
+        if self.desde > self.hasta:
+            raise ValueError("desde no puede ser posterior a hasta")
+        if any(not g.ciclo for g in self.grupos):
+            raise ValueError("El ciclo de cada grupo no puede estar vacío")
+        return self
+
+class CambioRotacion(BaseModel):
+    usuario_id: int
+    fecha: date
+    turno: str
+    anterior: Optional[str] = None  # None si la celda no existía
+
+class RotacionRespuesta(BaseModel):
+    dry_run: bool
+    usuarios: int
+    celdas_generadas: int
+    turnos_creados: int
+    turnos_actualizados: int
+    sin_cambios: int
+    respetadas: int  # modificadas a mano o con ausencia
+    cambios: Optional[List[CambioRotacion]] = None  # solo en dry_run
+
+class CoberturaMinima(BaseModel):
+    rol_id: int
+    franja: Literal["mañana", "tarde", "noche"]
+    minimo: int = 1  # personas del rol en la franja
+    dias: Literal["todos", "laborables", "no_laborables"] = "todos"  # no laborables: fin de semana y festivos
+
+class ValidacionRequest(BaseModel):
+    year: Optional[int] = None
+    month: Optional[int] = None
+    desde: Optional[date] = None  # rango libre (ambas fechas incluidas) en lugar de year/month
+    hasta: Optional[date] = None
+    rol_ids: Optional[List[int]] = None  # por defecto, todos los roles
+    cobertura: Optional[List[CoberturaMinima]] = None  # por defecto, COBERTURA_POR_DEFECTO (services/validacion.py)
+    max_dias_consecutivos: int = 6
+    descanso_minimo_horas: int = 12
+
+    @model_validator(mode="after")
+    def validar(self):
+        if (self.desde is None) != (self.hasta is None):
+            raise ValueError("desde y hasta deben indicarse juntos")
+        if self.desde is not None:
+            if self.hasta < self.desde:
+                raise ValueError("hasta no puede ser anterior a desde")
+            if self.year is not None or self.month is not None:
+                raise ValueError("desde/hasta no se combinan con year/month")
+        elif self.year is None:
+            raise ValueError("Indicar year (y opcionalmente month) o desde/hasta")
+        if self.max_dias_consecutivos < 1 or self.descanso_minimo_horas < 0:
+            raise ValueError("Límites de descanso no válidos")
+        return self
+
+class Infraccion(BaseModel):
+    regla: Literal["cobertura", "noche_mañana", "dias_consecutivos", "descanso"]
+    fecha: date
+    usuario_id: Optional[int] = None  # None en las de cobertura, que son del día
+    rol_id: Optional[int] = None
+    franja: Optional[str] = None
+    detalle: str
+
+class DotacionRol(BaseModel):
+    rol_id: int
+    franjas: Dict[str, List[int]]  # franja -> personas por día, alineado con `dias`
+
+class ValidacionRespuesta(BaseModel):
+    desde: date
+    hasta: date
+    usuarios: int
+    dias: List[date]
+    dotacion: Dict[str, List[int]]  # franja -> personas por día, todos los roles
+    dotacion_roles: List[DotacionRol]
+    infracciones: List[Infraccion]
+    total_infracciones: Dict[str, int]  # regla -> número de infracciones
+
+class CambioTurno(BaseModel):
+    seq: int
+    usuario_id: int
+    fecha: date
+    eliminado: bool  # lápida: la celda ya no existe
+    turno_id: Optional[int] = None
+    turno: Optional[str] = None
+    es_reten: Optional[bool] = None
+    generado_automático: Optional[bool] = None
+    modificado_manual: Optional[bool] = None
+    estado: Optional[str] = None
+    registrado_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class CambiosRespuesta(BaseModel):
+    cursor: int  # siguiente ?desde=
+    hay_mas: bool
+    cambios: List[CambioTurno]
+
+class HistorialTurno(BaseModel):
+    seq: int
+    usuario_id: int
+    fecha: date
+    turno: Optional[str] = None  # None: la celda se borró
+    es_reten: Optional[bool] = None
+    modificado_manual: Optional[bool] = None
+    turno_anterior: Optional[str] = None  # None: la celda no existía
+    es_reten_anterior: Optional[bool] = None
+    modificado_manual_anterior: Optional[bool] = None
+    registrado_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class CeldaHistorica(BaseModel):
+    usuario_id: int
+    fecha: date
+    turno: str
+    es_reten: bool
+    modificado_manual: bool
+
+class RejillaHistorica(BaseModel):
+    year: int
+    month: int
+    momento: datetime
+    instantanea: Optional[datetime] = None  # instantánea de partida, si la hubo
+    cambios_aplicados: int
+    turnos: List[CeldaHistorica]
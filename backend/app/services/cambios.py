@@ -0,0 +1,154 @@
+# backend/app/services/cambios.py
+"""
+Registro de cambios de turnos (turnos_cambios) para la sincronización incremental.
+
+Cada escritura de la API (ver registrar_escritura) añade una fila por celda
+(usuario, fecha) tocada con su estado final, o una lápida si la celda ya no
+existe. El seq sale de la fila única de turnos_cambios_contador, que queda
+bloqueada hasta el commit: dos transacciones no pueden repartirse seq a la vez,
+así que los seq se confirman en orden y sin huecos y un cliente que lee
+"seq > cursor" nunca se salta una escritura que se confirme más tarde. Por eso
+registrar_cambios va al final de registrar_escritura, justo antes del commit.
+
+Las filas antiguas se borran con:
+
+    python -m app.services.cambios              # más de RETENCION_DIAS días
+    python -m app.services.cambios --dias 7
+
+Un cursor anterior a lo que queda en la tabla ya no sirve (410 en /turnos/cambios)
+y el cliente tiene que volver a cargar el mes.
+"""
+import argparse
+from datetime import date, timedelta
+from typing import Iterable, Optional
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import Session
+from app.models.turno import Turno as TurnoModel, TurnoCambio, TurnoCambioContador
+
+RETENCION_DIAS = 30
+LIMITE_DEFECTO = 1000
+LIMITE_MAXIMO = 10000
+
+COLUMNAS_ESTADO = ("turno", "es_reten", "generado_automático", "modificado_manual", "estado")
+
+class CursorCaducado(Exception):
+    """El cursor es anterior al primer cambio que se conserva"""
+
+def _reservar_seq(db: Session, n: int) -> int:
+    """Reserva n seq consecutivos y devuelve el último; bloquea el contador hasta el commit"""
+    ultimo = db.execute(
+        update(TurnoCambioContador)
+        .where(TurnoCambioContador.id == 1)
+        .values(seq=TurnoCambioContador.seq + n)
+        .returning(TurnoCambioContador.seq)
+    ).scalar()
+    if ultimo is None:
+        # La migración crea la fila; falta si las tablas se crearon con create_all
+        db.execute(insert(TurnoCambioContador).values(id=1, seq=n))
+        ultimo = n
+    return ultimo
+
+def _estado_actual(db: Session, claves: set[tuple[int, date]]) -> dict[tuple[int, date], dict]:
+    fechas = [fecha for _, fecha in claves]
+    filas = db.query(
+        TurnoModel.id, TurnoModel.usuario_id, TurnoModel.fecha,
+        *(getattr(TurnoModel, columna) for columna in COLUMNAS_ESTADO)
+    ).filter(
+        TurnoModel.usuario_id.in_({usuario_id for usuario_id, _ in claves}),
+        TurnoModel.fecha >= min(fechas),
+        TurnoModel.fecha <= max(fechas)
+    ).all()
+    return {(f.usuario_id, f.fecha): f._asdict() for f in filas if (f.usuario_id, f.fecha) in claves}
+
+def registrar_cambios(db: Session, filas: Iterable[dict]) -> list[dict]:
+    """
+    Añade a turnos_cambios las celdas escritas, sin commit. Las filas con id (resultado
+    de upsert_turnos) ya traen el estado final; del resto solo se usan usuario_id y
+    fecha y el estado se lee de turnos_asignados (sin fila = lápida). Devuelve los cambios.
+    """
+    estados: dict[tuple[int, date], Optional[dict]] = {}
+    pendientes = set()
+    for fila in filas:
+        clave = (fila["usuario_id"], fila["fecha"])
+        if "id" in fila and all(columna in fila for columna in COLUMNAS_ESTADO):
+            estados[clave] = fila
+            pendientes.discard(clave)
+        elif clave not in estados:
+            pendientes.add(clave)
+    if pendientes:
+        actuales = _estado_actual(db, pendientes)
+        for clave in pendientes:
+            estados[clave] = actuales.get(clave)
+    if not estados:
+        return []
+
+    ultimo = _reservar_seq(db, len(estados))
+    cambios = []
+    for seq, (clave, estado) in enumerate(sorted(estados.items()), start=ultimo - len(estados) + 1):
+        cambio = {"seq": seq, "usuario_id": clave[0], "fecha": clave[1], "turno_id": None,
+                  "eliminado": estado is None, **{columna: None for columna in COLUMNAS_ESTADO}}
+        if estado is not None:
+            cambio["turno_id"] = estado["id"]
+            cambio.update({columna: estado[columna] for columna in COLUMNAS_ESTADO})
+        cambios.append(cambio)
+    db.execute(insert(TurnoCambio), cambios)
+    return cambios
+
+def cursor_actual(db: Session) -> int:
+    """Último seq confirmado; punto de partida para quien acaba de cargar un mes"""
+    return db.query(TurnoCambioContador.seq).filter(TurnoCambioContador.id == 1).scalar() or 0
+
+def leer_cambios(db: Session, desde: int, limit: int = LIMITE_DEFECTO,
+                 year: Optional[int] = None, month: Optional[int] = None) -> dict:
+    """
+    Cambios con seq > desde, en orden. Dentro de la página cada celda sale una sola vez,
+    con su último estado. CursorCaducado si ya se borraron cambios posteriores a `desde`.
+    """
+    primero = db.query(func.min(TurnoCambio.seq)).scalar()
+    actual = cursor_actual(db)
+    # Posterior al actual: cursor de otra base (o de antes de restaurarla)
+    if desde > actual or desde < (primero if primero is not None else actual + 1) - 1:
+        raise CursorCaducado()
+
+    query = db.query(TurnoCambio).filter(TurnoCambio.seq > desde)
+    if year is not None:
+        inicio = date(year, month or 1, 1)
+        fin = date(year + 1, 1, 1) if (month or 12) == 12 else date(year, month + 1, 1)
+        query = query.filter(TurnoCambio.fecha >= inicio, TurnoCambio.fecha < fin)
+    filas = query.order_by(TurnoCambio.seq).limit(limit + 1).all()
+    hay_mas = len(filas) > limit
+    filas = filas[:limit]
+
+    # Sin más páginas el cursor llega al actual aunque el filtro de fechas no devuelva nada;
+    # lo confirmado entre leer `actual` y la consulta puede repetirse en la siguiente llamada
+    cursor = filas[-1].seq if hay_mas else max([actual, *(f.seq for f in filas[-1:])])
+    ultimos = {(f.usuario_id, f.fecha): f for f in filas}
+    return {
+        "cursor": cursor,
+        "hay_mas": hay_mas,
+        "cambios": sorted(ultimos.values(), key=lambda f: f.seq),
+    }
+
+def podar_cambios(db: Session, dias: int = RETENCION_DIAS) -> int:
+    """Borra los cambios de hace más de `dias` días, sin commit; devuelve cuántos"""
+    # Hora de la base, la misma que pone registrado_at (now() / CURRENT_TIMESTAMP)
+    limite = db.query(func.now()).scalar() - timedelta(days=dias)
+    return db.query(TurnoCambio).filter(TurnoCambio.registrado_at < limite).delete(synchronize_session=False)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Borra los cambios antiguos de turnos_cambios")
+    parser.add_argument("--dias", type=int, default=RETENCION_DIAS,
+                        help=f"días que se conservan (por defecto {RETENCION_DIAS})")
+    args = parser.parse_args(argv)
+
+    from app.database import SessionLocal
+    db = SessionLocal()
+    try:
+        borrados = podar_cambios(db, args.dias)
+        db.commit()
+        print(f"Borrados {borrados} cambios de hace más de {args.dias} días")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
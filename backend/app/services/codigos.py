@@ -0,0 +1,145 @@
+# backend/app/services/codigos.py
+"""
+Catálogo de códigos de turno (tabla turnos_codigos).
+
+Se carga en memoria al arrancar (app/arranque.py) como una instantánea inmutable
+y se sustituye entera cada vez que el catálogo cambia a través de la API (routers/codigos.py);
+quien haya tomado la instantánea anterior sigue viendo un catálogo coherente.
+Los reportes en SQL no usan la instantánea: hacen join con turnos_codigos.
+
+Cada cambio sube la versión de turnos_codigos_version en la misma transacción.
+catalogo(db) la lee una vez por transacción y, si otro worker ha cambiado el
+catálogo, lo recarga antes de usarlo.
+"""
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Iterable, Mapping, Optional
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+from app.models.codigo import TurnoCodigo, TurnoCodigoVersion
+
+@dataclass(frozen=True)
+class CodigoTurno:
+    codigo: str
+    descripcion: str
+    horas: int = 0
+    franja: Optional[str] = None
+    contable: bool = False
+    ausencia: Optional[str] = None
+    color: Optional[str] = None
+    hora_inicio: Optional[int] = None
+
+# Semilla de las migraciones 0004 y 0005; es también el catálogo en memoria hasta que se carga la tabla
+CODIGOS_POR_DEFECTO = (
+    CodigoTurno("M", "Mañana", 8, "mañana", True, color="FFFFFFFF", hora_inicio=7),
+    CodigoTurno("T", "Tarde", 8, "tarde", True, color="FFFFFFFF", hora_inicio=15),
+    CodigoTurno("N", "Noche", 8, "noche", True, color="FFFFFFFF", hora_inicio=23),
+    CodigoTurno("FM1", "Mañana Casa", 12, "mañana", True, color="FFFFA500", hora_inicio=7),
+    CodigoTurno("FM2", "Mañana Oficina", 12, "mañana", True, color="FFFFA500", hora_inicio=7),
+    CodigoTurno("FN1", "Noche Casa", 12, "noche", True, color="FFDA70D6", hora_inicio=19),
+    CodigoTurno("FN2", "Noche Oficina", 12, "noche", True, color="FFDA70D6", hora_inicio=19),
+    CodigoTurno("v", "Vacaciones", ausencia="vacaciones", color="FFFFFF00"),
+    CodigoTurno("b", "Baja", ausencia="baja", color="FFFF0000"),
+    CodigoTurno("c", "Cumpleaños", ausencia="cumpleaños", color="FFFFFF00"),
+    CodigoTurno("d", "Descanso", ausencia="descanso", color="FFA9A9A9"),
+)
+
+@dataclass(frozen=True)
+class Catalogo:
+    codigos: Mapping[str, CodigoTurno]
+    horas: Mapping[str, int]  # solo códigos contables
+    franjas: Mapping[str, str]  # solo códigos contables
+    contables: frozenset
+    ausencias: Mapping[str, frozenset]  # tipo de ausencia -> códigos
+    version: int = 0  # turnos_codigos_version al leerlo
+
+    @classmethod
+    def desde(cls, codigos: Iterable[CodigoTurno], version: int = 0) -> "Catalogo":
+        codigos = {c.codigo: c for c in codigos}
+        contables = {k: c for k, c in codigos.items() if c.contable}
+        ausencias: dict[str, set] = {}
+        for c in codigos.values():
+            if c.ausencia:
+                ausencias.setdefault(c.ausencia, set()).add(c.codigo)
+        return cls(
+            codigos=MappingProxyType(codigos),
+            horas=MappingProxyType({k: c.horas for k, c in contables.items()}),
+            franjas=MappingProxyType({k: c.franja for k, c in contables.items()}),
+            contables=frozenset(contables),
+            ausencias=MappingProxyType({t: frozenset(cs) for t, cs in ausencias.items()}),
+            version=version,
+        )
+
+    def de_ausencia(self, tipo: str) -> frozenset:
+        return self.ausencias.get(tipo, frozenset())
+
+_catalogo = Catalogo.desde(CODIGOS_POR_DEFECTO)
+_lock = threading.Lock()
+
+# Clave de session.info con el catálogo que está guardando esa sesión (routers/codigos.py)
+CLAVE_CATALOGO = "catalogo"
+# Clave de session.info con (transacción, catálogo) de la última comprobación de versión
+CLAVE_CATALOGO_COMPROBADO = "catalogo_comprobado"
+
+def catalogo(db: Optional[Session] = None) -> Catalogo:
+    """
+    Instantánea del catálogo. Con `db`, la vigente en su transacción: la primera vez
+    compara la versión (una consulta) y recarga si otro worker lo ha cambiado
+    """
+    if db is None:
+        return _catalogo
+    if CLAVE_CATALOGO in db.info:
+        return db.info[CLAVE_CATALOGO]
+    comprobado = db.info.get(CLAVE_CATALOGO_COMPROBADO)
+    if comprobado is not None and comprobado[0] is db.get_transaction():
+        return comprobado[1]
+    actual = _catalogo
+    if version_catalogo(db) != actual.version:
+        actual = leer_catalogo(db)
+        if actual.version > _catalogo.version:
+            publicar_catalogo(actual)
+    db.info[CLAVE_CATALOGO_COMPROBADO] = (db.get_transaction(), actual)
+    return actual
+
+def version_catalogo(db: Session) -> int:
+    return db.query(TurnoCodigoVersion.version).filter(TurnoCodigoVersion.id == 1).scalar() or 0
+
+def subir_version_catalogo(db: Session) -> int:
+    """Nueva versión del catálogo; bloquea la fila hasta el commit (un cambio de catálogo a la vez)"""
+    version = db.execute(
+        update(TurnoCodigoVersion)
+        .where(TurnoCodigoVersion.id == 1)
+        .values(version=TurnoCodigoVersion.version + 1)
+        .returning(TurnoCodigoVersion.version)
+    ).scalar()
+    if version is None:
+        # La migración crea la fila; falta si las tablas se crearon con create_all
+        db.execute(insert(TurnoCodigoVersion).values(id=1, version=1))
+        version = 1
+    return version
+
+def leer_catalogo(db: Session) -> Catalogo:
+    return Catalogo.desde(
+        (
+            CodigoTurno(f.codigo, f.descripcion, f.horas or 0, f.franja, bool(f.contable), f.ausencia, f.color, f.hora_inicio)
+            for f in db.query(TurnoCodigo).all()
+        ),
+        version_catalogo(db)
+    )
+
+def publicar_catalogo(nuevo: Catalogo) -> Catalogo:
+    """Sustituye la instantánea en memoria (solo con datos ya confirmados); nunca por una más antigua"""
+    global _catalogo
+    with _lock:
+        if nuevo.version >= _catalogo.version:
+            _catalogo = nuevo
+    return _catalogo
+
+def cargar_catalogo(db: Session) -> Catalogo:
+    """Lee turnos_codigos (en la transacción de `db`) y sustituye la instantánea en memoria"""
+    return publicar_catalogo(leer_catalogo(db))
+
+def calcular_horas_turno(turno_codigo: str) -> int:
+    """Horas del código (0 si no es contable)"""
+    return _catalogo.horas.get(turno_codigo, 0)
@@ -0,0 +1,191 @@
+# backend/app/services/difusion.py
+"""
+Difusión en vivo de los cambios de turnos (GET /turnos/stream, Server-Sent Events).
+
+registrar_escritura deja en la sesión los cambios que registra en turnos_cambios
+(anotar_cambios) y, cuando la transacción se confirma, el evento after_commit
+de la sesión los publica en el bus como un lote:
+
+    {"desde": 41, "cursor": 44, "celdas": [[usuario_id, "2025-03-05", "M", turno_id, es_reten, manual], ...]}
+
+`desde` es el cursor anterior al lote y `cursor` el último seq (los de
+services/cambios.py); una celda con turno null es una lápida. Si se hace rollback
+los cambios anotados se descartan.
+
+El bus por defecto (BusLocal) entrega los lotes en el mismo proceso. Con varios
+workers cada uno solo ve sus escrituras: el cliente lo nota porque el `desde` del
+siguiente lote no coincide con su cursor y se pone al día con /turnos/cambios.
+Un bus externo (LISTEN/NOTIFY, Redis...) solo tiene que implementar suscribir y
+publicar con los mismos dicts.
+
+El Difusor reparte cada lote a las suscripciones abiertas, que son colas de
+asyncio atendidas por el bucle de eventos: una conexión inactiva no ocupa ningún
+hilo. El JSON de cada mes se genera una vez por lote, no una vez por cliente. Si
+la cola de un cliente lento se llena, se le pide que recargue y se le da de baja.
+"""
+import asyncio
+import json
+import logging
+import threading
+from typing import Callable, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+# Lotes que puede acumular un cliente antes de darlo por perdido
+CAPACIDAD_COLA = 100
+# Clave de session.info con los lotes pendientes de publicar tras el commit
+CLAVE_PENDIENTES = "difusion_pendientes"
+# Comentario SSE periódico: mantiene viva la conexión a través de proxies
+INTERVALO_PING = 15
+# Reintento que se indica al EventSource del navegador (ms)
+REINTENTO_MS = 3000
+
+class BusLocal:
+    """Bus en proceso: entrega cada mensaje a los oyentes en el hilo que publica"""
+
+    def __init__(self):
+        self._oyentes: list[Callable[[dict], None]] = []
+
+    def suscribir(self, oyente: Callable[[dict], None]) -> None:
+        self._oyentes.append(oyente)
+
+    def publicar(self, mensaje: dict) -> None:
+        for oyente in list(self._oyentes):
+            try:
+                oyente(mensaje)
+            except Exception:
+                logger.exception("Error entregando un lote de cambios")
+
+class Suscripcion:
+    """Un cliente de /turnos/stream: mes que sigue y cola de mensajes ya serializados"""
+
+    def __init__(self, year: int, month: int, capacidad: int = CAPACIDAD_COLA):
+        self.year = year
+        self.month = month
+        self.loop = asyncio.get_running_loop()
+        self.cola: asyncio.Queue = asyncio.Queue(maxsize=capacidad)
+        self.desbordada = False
+
+    def entregar(self, mensaje: Optional[str]) -> None:
+        """Solo desde el bucle de la suscripción; None = desbordada, hay que recargar"""
+        if self.desbordada:
+            return
+        try:
+            self.cola.put_nowait(mensaje)
+        except asyncio.QueueFull:
+            self.desbordada = True
+            # Deja sitio para el aviso final
+            self.cola.get_nowait()
+            self.cola.put_nowait(None)
+
+class Difusor:
+    def __init__(self):
+        self._suscripciones: set[Suscripcion] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def conexiones(self) -> int:
+        return len(self._suscripciones)
+
+    def alta(self, year: int, month: int) -> Suscripcion:
+        """Dentro del bucle de eventos que atenderá la conexión"""
+        suscripcion = Suscripcion(year, month)
+        with self._lock:
+            self._suscripciones.add(suscripcion)
+        return suscripcion
+
+    def baja(self, suscripcion: Suscripcion) -> None:
+        with self._lock:
+            self._suscripciones.discard(suscripcion)
+
+    def publicar(self, lote: dict) -> None:
+        """Desde cualquier hilo: serializa el lote por mes y lo encola en cada suscripción"""
+        with self._lock:
+            suscripciones = list(self._suscripciones)
+        if not suscripciones:
+            return
+
+        por_mes: dict[tuple[int, int], list] = {}
+        for celda in lote["celdas"]:
+            year, month = int(celda[1][:4]), int(celda[1][5:7])
+            por_mes.setdefault((year, month), []).append(celda)
+        cabecera = {"desde": lote["desde"], "cursor": lote["cursor"]}
+        mensajes = {mes: json.dumps({**cabecera, "celdas": celdas}) for mes, celdas in por_mes.items()}
+        # Los clientes de otros meses reciben el lote vacío para que su cursor siga siendo continuo
+        vacio = json.dumps({**cabecera, "celdas": []})
+
+        # Una sola llamada por bucle de eventos, no una por cliente
+        por_loop: dict[asyncio.AbstractEventLoop, list] = {}
+        for s in suscripciones:
+            por_loop.setdefault(s.loop, []).append((s, mensajes.get((s.year, s.month), vacio)))
+        for loop, entregas in por_loop.items():
+            try:
+                loop.call_soon_threadsafe(_entregar_todas, entregas)
+            except RuntimeError:  # bucle cerrado
+                pass
+
+def _entregar_todas(entregas: list) -> None:
+    for suscripcion, mensaje in entregas:
+        suscripcion.entregar(mensaje)
+
+bus = BusLocal()
+difusor = Difusor()
+bus.suscribir(difusor.publicar)
+
+def anotar_cambios(db: Session, cambios: list[dict]) -> None:
+    """Guarda en la sesión el lote de los cambios registrados; se publica tras el commit"""
+    if not cambios:
+        return
+    db.info.setdefault(CLAVE_PENDIENTES, []).append({
+        "desde": cambios[0]["seq"] - 1,
+        "cursor": cambios[-1]["seq"],
+        "celdas": [
+            [c["usuario_id"], c["fecha"].isoformat(), c["turno"], c["turno_id"],
+             bool(c["es_reten"]), bool(c["modificado_manual"])]
+            for c in cambios
+        ],
+    })
+
+@event.listens_for(Session, "after_commit")
+def _publicar_tras_commit(session: Session) -> None:
+    for lote in session.info.pop(CLAVE_PENDIENTES, []):
+        bus.publicar(lote)
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_tras_rollback(session: Session) -> None:
+    session.info.pop(CLAVE_PENDIENTES, None)
+
+def _cursor_actual() -> int:
+    from app.database import SessionLocal
+    from app.services.cambios import cursor_actual
+    db = SessionLocal()
+    try:
+        return cursor_actual(db)
+    finally:
+        db.close()
+
+async def eventos_turnos(year: int, month: int):
+    """
+    Flujo SSE de un mes. Primero `abierto` con el cursor actual (leído después de darse
+    de alta, para no perder nada entre medias), después un `cambios` por lote y
+    `recargar` si el cliente se ha quedado atrás.
+    """
+    suscripcion = difusor.alta(year, month)
+    try:
+        cursor = await run_in_threadpool(_cursor_actual)
+        yield f"retry: {REINTENTO_MS}\nevent: abierto\ndata: {json.dumps({'cursor': cursor})}\n\n"
+        while True:
+            try:
+                mensaje = await asyncio.wait_for(suscripcion.cola.get(), timeout=INTERVALO_PING)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if mensaje is None:
+                yield "event: recargar\ndata: {}\n\n"
+                return
+            yield f"event: cambios\ndata: {mensaje}\n\n"
+    finally:
+        difusor.baja(suscripcion)
@@ -0,0 +1,452 @@
+# backend/app/services/exportacion.py
+"""
+Exportación en streaming a CSV y XLSX.
+
+El XLSX se escribe a mano (SpreadsheetML mínimo con cadenas en línea) sobre un
+zipfile que escribe en un sumidero no posicionable: cada fila comprimida se entrega
+al cliente en cuanto se genera, así que la memoria no crece con el tamaño del libro.
+Colores y disposición iguales a frontend/src/utils/exportToExcel.ts.
+"""
+import csv
+import io
+import re
+import zipfile
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from itertools import groupby
+from typing import Callable, Iterable, Iterator, Optional
+from xml.sax.saxutils import escape
+from sqlalchemy.orm import Session
+from app import database
+from app.models.turno import Turno as TurnoModel
+from app.models.usuario import Usuario
+from app.services.codigos import catalogo
+from app.services.festivos import get_festivos_rango
+from app.services.resumen import rango_mes
+
+MEDIA_CSV = "text/csv; charset=utf-8"
+MEDIA_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+MESES = ("Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio", "Julio",
+         "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre")
+
+# Bloques de la rejilla, en el orden del frontend: (rol_id, etiqueta, estilo)
+ROLES_REJILLA = ((1, "Jefe de Turno", "rol_jefe"), (2, "Operador", "rol_operador"), (3, "EMC", "rol_emc"))
+
+TAMANO_LECTURA = 2000
+
+# --- Estilos (índices de cellXfs en styles.xml) ---
+
+_RELLENOS = {  # nombre -> ARGB
+    "titulo": "FF666666", "cabecera": "FF444444", "finde": "FFF86363", "festivo": "FF90EE90",
+    "blanco": "FFFFFFFF", "reten": "FFADD8E6", "amarillo": "FFFFFF00", "rojo": "FFFF0000",
+    "naranja": "FFFFA500", "morado": "FFDA70D6", "gris": "FFA9A9A9",
+    "rol_jefe": "FFE7F8FE", "rol_operador": "FFE7FEEC", "rol_emc": "FFF9E7FE", "total": "FFDDDDDD",
+}
+_FUENTES = ("normal", "negrita", "negrita_blanca", "titulo")
+
+# nombre -> (fuente, relleno o None, borde, rotación 90)
+_ESTILOS = {
+    "normal": ("normal", None, False, False),
+    "titulo": ("titulo", "titulo", False, False),
+    "cabecera": ("negrita_blanca", "cabecera", True, False),
+    "cabecera_finde": ("negrita_blanca", "finde", True, False),
+    "cabecera_festivo": ("negrita_blanca", "festivo", True, False),
+    "usuario": ("negrita", None, True, False),
+    "celda": ("normal", None, True, False),
+    "turno": ("negrita", "blanco", True, False),
+    "turno_reten": ("negrita", "reten", True, False),
+    "turno_amarillo": ("negrita", "amarillo", True, False),
+    "turno_rojo": ("negrita", "rojo", True, False),
+    "turno_naranja": ("negrita", "naranja", True, False),
+    "turno_morado": ("negrita", "morado", True, False),
+    "turno_libre": ("negrita_blanca", "gris", True, False),
+    "turno_festivo": ("negrita", "festivo", True, False),
+    "rol_jefe": ("negrita", "rol_jefe", True, True),
+    "rol_operador": ("negrita", "rol_operador", True, True),
+    "rol_emc": ("negrita", "rol_emc", True, True),
+    "rol_jefe_h": ("negrita", "rol_jefe", True, False),
+    "rol_operador_h": ("negrita", "rol_operador", True, False),
+    "rol_emc_h": ("negrita", "rol_emc", True, False),
+    "total": ("negrita", "total", True, False),
+}
+_INDICE_ESTILO = {nombre: i for i, nombre in enumerate(_ESTILOS)}
+
+def estilo_turno(turno: str, es_reten: bool) -> str:
+    """Mismo criterio que getFillColor de exportToExcel.ts"""
+    if turno == "d":
+        return "turno_libre"
+    if es_reten:
+        return "turno_reten"
+    if turno in ("v", "c"):
+        return "turno_amarillo"
+    if turno == "b":
+        return "turno_rojo"
+    if turno in ("FM1", "FM2"):
+        return "turno_naranja"
+    if turno in ("FN1", "FN2"):
+        return "turno_morado"
+    return "turno"
+
+# --- Modelo de hoja ---
+
+@dataclass
+class Hoja:
+    """Hoja a exportar. `filas` produce (tipo, celdas); tipo "titulo" no se escribe en CSV.
+    Cada celda es (valor, estilo). Las combinaciones se pueden añadir mientras se generan filas."""
+    nombre: str
+    filas: Iterable[tuple[str, list[tuple]]]
+    anchos: list[float] = field(default_factory=list)
+    combinadas: list[str] = field(default_factory=list)
+
+def letra_columna(n: int) -> str:
+    """1 -> A, 27 -> AA"""
+    letras = ""
+    while n:
+        n, resto = divmod(n - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+# --- CSV ---
+
+def csv_stream(hojas: Iterable[Hoja]) -> Iterator[bytes]:
+    yield "\ufeff".encode("utf-8")  # BOM: Excel abre el CSV como UTF-8
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    for hoja in hojas:
+        for tipo, celdas in hoja.filas:
+            if tipo == "titulo":
+                continue
+            escritor.writerow(["" if valor is None else valor for valor, _ in celdas])
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+# --- XLSX ---
+
+class _Sumidero:
+    """Fichero de solo escritura y sin seek: zipfile escribe con descriptores de datos"""
+    def __init__(self):
+        self._trozos: list[bytes] = []
+
+    def write(self, datos: bytes) -> int:
+        self._trozos.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def vaciar(self) -> bytes:
+        datos = b"".join(self._trozos)
+        self._trozos.clear()
+        return datos
+
+def _styles_xml() -> str:
+    nombres_relleno = list(_RELLENOS)
+    fuentes = {
+        "normal": '<font><sz val="11"/><name val="Calibri"/></font>',
+        "negrita": '<font><b/><sz val="11"/><color rgb="FF000000"/><name val="Calibri"/></font>',
+        "negrita_blanca": '<font><b/><sz val="11"/><color rgb="FFFFFFFF"/><name val="Calibri"/></font>',
+        "titulo": '<font><b/><sz val="14"/><color rgb="FFFFFFFF"/><name val="Calibri"/></font>',
+    }
+    rellenos = ['<fill><patternFill patternType="none"/></fill>', '<fill><patternFill patternType="gray125"/></fill>']
+    rellenos += [f'<fill><patternFill patternType="solid"><fgColor rgb="{_RELLENOS[n]}"/></patternFill></fill>'
+                 for n in nombres_relleno]
+    lado = '<{0} style="thin"><color rgb="FF000000"/></{0}>'
+    bordes = ['<border><left/><right/><top/><bottom/><diagonal/></border>',
+              '<border>' + "".join(lado.format(l) for l in ("left", "right", "top", "bottom")) + '<diagonal/></border>']
+    xfs = []
+    for nombre, (fuente, relleno, borde, rotado) in _ESTILOS.items():
+        id_relleno = nombres_relleno.index(relleno) + 2 if relleno else 0
+        alineacion = '<alignment horizontal="center" vertical="center"%s/>' % (' textRotation="90"' if rotado else "")
+        if nombre == "normal":
+            xfs.append('<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>')
+            continue
+        xfs.append(
+            f'<xf numFmtId="0" fontId="{_FUENTES.index(fuente)}" fillId="{id_relleno}" borderId="{1 if borde else 0}" '
+            f'xfId="0" applyFont="1" applyFill="1" applyBorder="1" applyAlignment="1">{alineacion}</xf>'
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        f'<fonts count="{len(_FUENTES)}">' + "".join(fuentes[f] for f in _FUENTES) + '</fonts>'
+        f'<fills count="{len(rellenos)}">' + "".join(rellenos) + '</fills>'
+        f'<borders count="{len(bordes)}">' + "".join(bordes) + '</borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        f'<cellXfs count="{len(xfs)}">' + "".join(xfs) + '</cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    )
+
+# Excel rechaza (y "repara" el fichero) nombres de hoja largos, con estos caracteres o repetidos
+MAX_NOMBRE_HOJA = 31
+_RE_NOMBRE_HOJA = re.compile(r"[\\/?*\[\]:]")
+
+def _nombres_hoja(nombres: list[str]) -> list[str]:
+    """Nombres válidos para Excel: sin caracteres prohibidos, 31 como mucho y sin repetir"""
+    validos: list[str] = []
+    for nombre in nombres:
+        base = _RE_NOMBRE_HOJA.sub("-", nombre).strip("'")[:MAX_NOMBRE_HOJA] or "Hoja"
+        candidato, n = base, 1
+        while candidato.lower() in (v.lower() for v in validos):
+            n += 1
+            sufijo = f" ({n})"
+            candidato = base[:MAX_NOMBRE_HOJA - len(sufijo)] + sufijo
+        validos.append(candidato)
+    return validos
+
+def _estaticos(nombres: list[str]) -> dict[str, str]:
+    nombres = _nombres_hoja(nombres)
+    hojas = "".join(
+        f'<sheet name="{escape(n, {chr(34): "&quot;"})}" sheetId="{i}" r:id="rId{i}"/>' for i, n in enumerate(nombres, 1)
+    )
+    rels_hojas = "".join(
+        f'<Relationship Id="rId{i}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        f'Target="worksheets/sheet{i}.xml"/>' for i in range(1, len(nombres) + 1)
+    )
+    tipos_hojas = "".join(
+        f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        for i in range(1, len(nombres) + 1)
+    )
+    n = len(nombres) + 1
+    return {
+        "[Content_Types].xml": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            + tipos_hojas + '</Types>'
+        ),
+        "_rels/.rels": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="xl/workbook.xml"/></Relationships>'
+        ),
+        "xl/workbook.xml": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets>{hojas}</sheets></workbook>'
+        ),
+        "xl/_rels/workbook.xml.rels": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + rels_hojas +
+            f'<Relationship Id="rId{n}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+            'Target="styles.xml"/></Relationships>'
+        ),
+        "xl/styles.xml": _styles_xml(),
+    }
+
+def _celda_xml(ref: str, valor, estilo: Optional[str]) -> str:
+    s = f' s="{_INDICE_ESTILO[estilo]}"' if estilo and estilo != "normal" else ""
+    if valor is None or valor == "":
+        return f'<c r="{ref}"{s}/>'
+    if isinstance(valor, bool):
+        valor = "Sí" if valor else "No"
+    if isinstance(valor, (int, float)):
+        return f'<c r="{ref}"{s}><v>{valor}</v></c>'
+    return f'<c r="{ref}"{s} t="inlineStr"><is><t xml:space="preserve">{escape(str(valor))}</t></is></c>'
+
+def xlsx_stream(hojas: list[Hoja]) -> Iterator[bytes]:
+    """Libro XLSX en trozos; las filas de cada hoja se leen y se comprimen según se generan"""
+    sumidero = _Sumidero()
+    with zipfile.ZipFile(sumidero, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as libro:
+        for nombre, contenido in _estaticos([h.nombre for h in hojas]).items():
+            libro.writestr(nombre, contenido)
+        yield sumidero.vaciar()
+
+        for i, hoja in enumerate(hojas, 1):
+            with libro.open(f"xl/worksheets/sheet{i}.xml", "w", force_zip64=True) as parte:
+                cols = "".join(
+                    f'<col min="{n}" max="{n}" width="{ancho}" customWidth="1"/>'
+                    for n, ancho in enumerate(hoja.anchos, 1)
+                )
+                parte.write((
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                    + (f"<cols>{cols}</cols>" if cols else "") + "<sheetData>"
+                ).encode("utf-8"))
+                for n_fila, (_, celdas) in enumerate(hoja.filas, 1):
+                    xml = "".join(
+                        _celda_xml(f"{letra_columna(n_col)}{n_fila}", valor, estilo)
+                        for n_col, (valor, estilo) in enumerate(celdas, 1)
+                    )
+                    parte.write(f'<row r="{n_fila}">{xml}</row>'.encode("utf-8"))
+                    yield sumidero.vaciar()
+                parte.write(b"</sheetData>")
+                if hoja.combinadas:
+                    parte.write((
+                        f'<mergeCells count="{len(hoja.combinadas)}">'
+                        + "".join(f'<mergeCell ref="{ref}"/>' for ref in hoja.combinadas)
+                        + "</mergeCells>"
+                    ).encode("utf-8"))
+                parte.write(b"</worksheet>")
+            yield sumidero.vaciar()
+    yield sumidero.vaciar()
+
+def exportar(hojas: list[Hoja], formato: str) -> Iterator[bytes]:
+    return xlsx_stream(hojas) if formato == "xlsx" else csv_stream(hojas)
+
+# --- Rejilla mensual de turnos ---
+
+def _usuarios_rejilla(db: Session) -> list:
+    return db.query(Usuario.id, Usuario.nombres, Usuario.apellidos, Usuario.rol_id).filter(
+        Usuario.estado == "activo",
+        Usuario.rol_id.in_([r for r, _, _ in ROLES_REJILLA])
+    ).order_by(Usuario.rol_id, Usuario.id).all()
+
+def filas_rejilla(db: Session, year: int, month: int, hoja: Hoja,
+                  columna_mes: bool = False) -> Iterator[tuple[str, list[tuple]]]:
+    """
+    Filas de la rejilla del mes: título, cabecera de días, un usuario por fila
+    (agrupados por rol), columnas de días y horas, y una fila final de totales por día.
+    Con columna_mes (CSV anual) cada fila lleva el mes delante y siempre hay 31 días.
+    """
+    inicio, fin = rango_mes(year, month)
+    dias = [inicio + timedelta(days=d) for d in range((fin - inicio).days)]
+    festivos = get_festivos_rango(db, inicio, fin)
+    horas_codigo = catalogo(db).horas  # solo códigos contables
+    n_dias_columna = 31 if columna_mes else len(dias)
+    prefijo = [(f"{year}-{month:02d}", "celda")] if columna_mes else []
+    desplazamiento = len(prefijo)
+    relleno = [("", "celda")] * (n_dias_columna - len(dias))
+
+    hoja.anchos = [10] * desplazamiento + [15, 25] + [4] * n_dias_columna + [7, 7]
+    ultima_col = letra_columna(desplazamiento + 2 + n_dias_columna + 2)
+    yield "titulo", prefijo + [(f" {MESES[month - 1]} {year}", "titulo")]
+    hoja.combinadas.append(f"{letra_columna(desplazamiento + 1)}1:{ultima_col}1")
+
+    cabecera = [("Rol", "cabecera"), ("Usuario / Día", "cabecera")]
+    for dia in dias:
+        estilo = "cabecera_festivo" if dia in festivos else "cabecera_finde" if dia.weekday() >= 5 else "cabecera"
+        cabecera.append((dia.day, estilo))
+    cabecera += [(None, "cabecera")] * (n_dias_columna - len(dias)) + [("Días", "cabecera"), ("Horas", "cabecera")]
+    yield "cabecera", ([("Mes", "cabecera")] if columna_mes else []) + cabecera
+
+    usuarios = _usuarios_rejilla(db)
+    posicion = {u.id: i for i, u in enumerate(usuarios)}
+    turnos = (
+        db.query(TurnoModel.usuario_id, TurnoModel.fecha, TurnoModel.turno, TurnoModel.es_reten)
+        .join(Usuario, Usuario.id == TurnoModel.usuario_id)
+        .filter(
+            Usuario.estado == "activo",
+            Usuario.rol_id.in_([r for r, _, _ in ROLES_REJILLA]),
+            TurnoModel.fecha >= inicio,
+            TurnoModel.fecha < fin,
+        )
+        .order_by(Usuario.rol_id, Usuario.id, TurnoModel.fecha)
+        .yield_per(TAMANO_LECTURA)
+    )
+    por_usuario = groupby(turnos, key=lambda t: t.usuario_id)
+    siguiente = next(por_usuario, None)
+
+    trabajando_por_dia = [0] * len(dias)
+    n_fila = 2
+    etiquetas = {r: (etiqueta, estilo) for r, etiqueta, estilo in ROLES_REJILLA}
+    for rol_id, grupo in groupby(usuarios, key=lambda u: u.rol_id):
+        etiqueta, estilo_rol = etiquetas[rol_id]
+        primera = n_fila + 1
+        for usuario in grupo:
+            n_fila += 1
+            del_usuario = {}
+            # Los turnos vienen en el mismo orden que los usuarios; avanzar hasta el actual
+            while siguiente is not None and posicion[siguiente[0]] < posicion[usuario.id]:
+                siguiente = next(por_usuario, None)
+            if siguiente is not None and siguiente[0] == usuario.id:
+                del_usuario = {t.fecha: t for t in siguiente[1]}
+                siguiente = next(por_usuario, None)
+
+            celdas = [(etiqueta, estilo_rol), (f"{usuario.nombres} {usuario.apellidos}", "usuario")]
+            dias_trabajados = horas = 0
+            for i, dia in enumerate(dias):
+                t = del_usuario.get(dia)
+                if t is None:
+                    celdas.append(("", "turno_festivo" if dia in festivos else "celda"))
+                    continue
+                celdas.append((t.turno, "turno_festivo" if dia in festivos else estilo_turno(t.turno, t.es_reten)))
+                if t.turno in horas_codigo:
+                    dias_trabajados += 1
+                    horas += horas_codigo[t.turno]
+                    trabajando_por_dia[i] += 1
+            yield "datos", prefijo + celdas + relleno + [(dias_trabajados, "total"), (horas, "total")]
+        columna_rol = letra_columna(desplazamiento + 1)
+        hoja.combinadas.append(f"{columna_rol}{primera}:{columna_rol}{n_fila}")
+
+    yield "total", prefijo + [("Total", "total"), ("Trabajando", "total")] + [
+        (n, "total") for n in trabajando_por_dia
+    ] + relleno + [(None, "total"), (None, "total")]
+
+def _hoja_mes(year: int, month: int, columna_mes: bool = False,
+              al_terminar_mes: Optional[Callable[[int], None]] = None) -> Hoja:
+    hoja = Hoja(nombre=f"{MESES[month - 1]} {year}", filas=())
+    al_terminar = (lambda: al_terminar_mes(month)) if al_terminar_mes else None
+    hoja.filas = _filas_con_sesion(lambda db: filas_rejilla(db, year, month, hoja, columna_mes), al_terminar)
+    return hoja
+
+def _filas_con_sesion(producir, al_terminar: Optional[Callable[[], None]] = None) -> Iterator:
+    """Ejecuta un productor de filas con su propia sesión: la respuesta se sigue
+    generando después de que el endpoint (y su sesión) haya terminado. Solo lee: va a una réplica si la hay"""
+    db = database.abrir_sesion_lectura()
+    try:
+        yield from producir(db)
+    finally:
+        db.close()
+    if al_terminar is not None:
+        al_terminar()
+
+def exportar_mes(year: int, month: int, formato: str,
+                 al_terminar_mes: Optional[Callable[[int], None]] = None) -> Iterator[bytes]:
+    return exportar([_hoja_mes(year, month, al_terminar_mes=al_terminar_mes)], formato)
+
+def exportar_year(year: int, formato: str,
+                  al_terminar_mes: Optional[Callable[[int], None]] = None) -> Iterator[bytes]:
+    """
+    Un libro con una hoja por mes (XLSX) o todos los meses seguidos con columna Mes (CSV).
+    al_terminar_mes(month) se llama al acabar de leer cada mes (progreso de los trabajos)
+    """
+    if formato == "xlsx":
+        return xlsx_stream([_hoja_mes(year, m, al_terminar_mes=al_terminar_mes) for m in range(1, 13)])
+    hojas = [_hoja_mes(year, m, columna_mes=True, al_terminar_mes=al_terminar_mes) for m in range(1, 13)]
+    return csv_stream([Hoja(nombre=str(year), filas=_sin_cabeceras_repetidas(hojas))])
+
+def _sin_cabeceras_repetidas(hojas: list[Hoja]) -> Iterator:
+    """Concatena las filas de varias hojas dejando solo la primera cabecera"""
+    primera = True
+    for hoja in hojas:
+        for tipo, celdas in hoja.filas:
+            if tipo == "cabecera":
+                if not primera:
+                    continue
+                primera = False
+            yield tipo, celdas
+
+def cabeceras_descarga(base: str, formato: str) -> dict:
+    return {"Content-Disposition": f'attachment; filename="{base}.{formato}"'}
+
+def tipo_medio(formato: str) -> str:
+    return MEDIA_XLSX if formato == "xlsx" else MEDIA_CSV
+
+def estilo_rol_tabla(rol: str) -> str:
+    """Estilo (sin rotar) de la columna Rol en las tablas de reportes"""
+    for _, etiqueta, estilo in ROLES_REJILLA:
+        if etiqueta == rol:
+            return estilo + "_h"
+    return "celda"
+
+def hoja_tabla(nombre: str, columnas: list[tuple[str, float]], filas: list[list[tuple]],
+               total: Optional[list] = None) -> Hoja:
+    """Hoja simple (reportes): cabecera, filas ya con estilo y fila opcional de totales"""
+    def producir():
+        yield "cabecera", [(titulo, "cabecera") for titulo, _ in columnas]
+        yield from (("datos", fila) for fila in filas)
+        if total is not None:
+            yield "total", [(v, "total") for v in total]
+    return Hoja(nombre=nombre, filas=producir(), anchos=[ancho for _, ancho in columnas])
@@ -0,0 +1,136 @@
+# backend/app/services/festivos.py
+"""
+Calendario de festivos.
+
+Los festivos se guardan como reglas (día fijo, desplazamiento sobre Pascua o fecha
+única) y se expanden por año en festivos_fecha. Al crear o editar un festivo se
+regeneran los años ya expandidos más VENTANA_YEARS alrededor del actual; un año
+fuera de esa ventana se expande la primera vez que se consulta. En las rutas que
+escriben se hace dentro de su transacción y se guarda con su commit; en las de
+solo lectura (database.get_read_db, que nunca hacen commit) se expande y se
+confirma en una sesión aparte de la primaria. Si la sesión es de una réplica, esa
+consulta lee las fechas de la primaria: la réplica aún no las tiene.
+"""
+from datetime import date, timedelta
+from typing import Iterable
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app import database
+from app.models.festivo import FestivoMadrid as FestivoModel, FestivoFecha, FestivoYear
+
+REGLAS = ("fijo", "pascua", "unico")
+
+# Años (respecto al actual) que se mantienen siempre expandidos
+VENTANA_YEARS = range(-1, 3)
+
+def calcular_pascua(year: int) -> date:
+    """Domingo de Pascua (calendario gregoriano, algoritmo de Meeus/Jones/Butcher)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return date(year, mes, dia + 1)
+
+def fecha_festivo(festivo: FestivoModel, year: int):
+    """Fecha en la que cae el festivo ese año, o None si no aplica"""
+    if festivo.regla == "pascua":
+        return calcular_pascua(year) + timedelta(days=festivo.desplazamiento_pascua or 0)
+    if festivo.regla == "unico":
+        return festivo.fecha if festivo.fecha and festivo.fecha.year == year else None
+    dia, mes = map(int, festivo.dia_mes.split('/'))
+    try:
+        return date(year, mes, dia)
+    except ValueError:
+        return None
+
+def expandir_years(db: Session, years: Iterable[int]):
+    """Regenera festivos_fecha para esos años (sin commit)"""
+    years = sorted(set(years))
+    if not years:
+        return
+    db.query(FestivoFecha).filter(FestivoFecha.year.in_(years)).delete(synchronize_session=False)
+    festivos = db.query(FestivoModel).filter(FestivoModel.estado == "activo").all()
+    filas = []
+    for year in years:
+        for festivo in festivos:
+            fecha = fecha_festivo(festivo, year)
+            if fecha is not None and fecha.year == year:
+                filas.append({"festivo_id": festivo.id, "fecha": fecha, "year": year})
+    # ON CONFLICT DO NOTHING: dos peticiones pueden expandir a la vez el mismo año
+    insert = database.insert_dialecto(db)
+    if filas:
+        db.execute(insert(FestivoFecha).on_conflict_do_nothing(
+            index_elements=[FestivoFecha.festivo_id, FestivoFecha.fecha]
+        ), filas)
+    db.execute(insert(FestivoYear).values([{"year": y} for y in years]).on_conflict_do_nothing(
+        index_elements=[FestivoYear.year]
+    ))
+
+def asegurar_years(db: Session, years: Iterable[int]) -> set[int]:
+    """
+    Expande los años que todavía no estén en festivos_fecha; devuelve los que ha expandido.
+    En una sesión de lectura (database.abrir_sesion_lectura) se hace y se confirma en su
+    propia sesión de la primaria: la de lectura se cierra sin commit y no escribe nunca.
+    """
+    years = set(years)
+    existentes = {y for (y,) in db.query(FestivoYear.year).filter(FestivoYear.year.in_(years)).all()}
+    pendientes = years - existentes
+    if pendientes and database.es_sesion_lectura(db):
+        primaria = database.SessionLocal()
+        try:
+            asegurar_years(primaria, pendientes)
+            primaria.commit()
+        finally:
+            primaria.close()
+    elif pendientes:
+        expandir_years(db, pendientes)
+        db.flush()
+    return pendientes
+
+def regenerar_festivos(db: Session) -> set[date]:
+    """
+    Regenera todos los años ya expandidos tras crear o editar un festivo (sin commit).
+    Devuelve las fechas que han dejado de ser o han pasado a ser festivas.
+    """
+    antes = {f for (f,) in db.query(FestivoFecha.fecha).distinct().all()}
+    years = {y for (y,) in db.query(FestivoYear.year).all()}
+    years.update(date.today().year + d for d in VENTANA_YEARS)
+    expandir_years(db, years)
+    db.flush()
+    despues = {f for (f,) in db.query(FestivoFecha.fecha).distinct().all()}
+    return antes ^ despues
+
+def _select_fechas(inicio: date, fin: date):
+    return select(FestivoFecha.fecha).where(
+        FestivoFecha.fecha >= inicio,
+        FestivoFecha.fecha < fin
+    ).distinct()
+
+def fechas_festivas_query(db: Session, inicio: date, fin: date):
+    """Fechas festivas en [inicio, fin) para usar en joins/IN: subconsulta, o lista si la réplica aún no las tiene"""
+    if asegurar_years(db, range(inicio.year, (fin - timedelta(days=1)).year + 1)) and database.es_sesion_replica(db):
+        return sorted(_festivos_en_primaria(inicio, fin))
+    return _select_fechas(inicio, fin)
+
+def get_festivos_rango(db: Session, inicio: date, fin: date) -> set[date]:
+    fechas = fechas_festivas_query(db, inicio, fin)
+    return set(fechas) if isinstance(fechas, list) else set(db.execute(fechas).scalars())
+
+def _festivos_en_primaria(inicio: date, fin: date) -> set[date]:
+    primaria = database.SessionLocal()
+    try:
+        return set(primaria.execute(_select_fechas(inicio, fin)).scalars())
+    finally:
+        primaria.close()
+
+def get_festivos_mes(year: int, month: int, db: Session):
+    """Obtiene festivos activos para un mes/año específico"""
+    inicio = date(year, month, 1)
+    fin = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return get_festivos_rango(db, inicio, fin)
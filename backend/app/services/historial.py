@@ -0,0 +1,232 @@
+# backend/app/services/historial.py
+"""
+Histórico de turnos (turnos_historial) y reconstrucción de un mes en el pasado.
+
+Cada escritura de la API añade, en su misma transacción, una fila por celda con
+el valor anterior y el nuevo: los caminos de escritura leen el estado anterior
+antes de escribir (leer_anteriores, en bloque para upsert_turnos) y
+registrar_escritura lo guarda con el seq de turnos_cambios.
+
+Para reconstruir un mes tal como estaba en un momento dado no se recorre todo el
+histórico: se parte de la última instantánea del mes tomada antes de ese momento
+(turnos_instantaneas) y se aplican solo los cambios posteriores a ella. Sin
+instantánea previa se parte de la rejilla actual y se deshacen, con los valores
+anteriores, los cambios posteriores al momento pedido. Las instantáneas se toman
+periódicamente (p. ej. cada noche desde cron) para los meses con cambios nuevos:
+
+    python -m app.services.historial
+
+Las cargas hechas fuera de la API (benchmarks/generador.py, SQL directo) no dejan
+histórico: para el pasado cuentan como si siempre hubieran estado así.
+"""
+import argparse
+from datetime import date, datetime
+from typing import Iterable
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.models.turno import Turno as TurnoModel
+from app.models.historial import TurnoHistorial, TurnoInstantanea
+from app.services.cambios import cursor_actual
+from app.services.resumen import rango_mes
+
+COLUMNAS_VALOR = ("turno", "es_reten", "modificado_manual")
+
+def leer_anteriores(db: Session, claves: Iterable[tuple[int, date]]) -> dict[tuple[int, date], dict]:
+    """
+    Estado actual (COLUMNAS_VALOR) de las celdas (usuario_id, fecha) que existen, con una
+    consulta por usuarios y rango de fechas; se llama antes de escribirlas. En PostgreSQL
+    bloquea las filas leídas hasta el commit, para que nadie las cambie entre medias.
+    """
+    claves = set(claves)
+    if not claves:
+        return {}
+    fechas = [fecha for _, fecha in claves]
+    filas = db.query(
+        TurnoModel.usuario_id, TurnoModel.fecha, *(getattr(TurnoModel, c) for c in COLUMNAS_VALOR)
+    ).filter(
+        TurnoModel.usuario_id.in_({usuario_id for usuario_id, _ in claves}),
+        TurnoModel.fecha >= min(fechas),
+        TurnoModel.fecha <= max(fechas)
+    ).with_for_update().all()
+    return {
+        (usuario_id, fecha): dict(zip(COLUMNAS_VALOR, valores))
+        for usuario_id, fecha, *valores in filas if (usuario_id, fecha) in claves
+    }
+
+def registrar_historial(db: Session, cambios: list[dict], anteriores: dict) -> None:
+    """Una fila por cambio registrado (services/cambios.py), con su valor anterior; sin commit"""
+    if not cambios:
+        return
+    vacio = dict.fromkeys(COLUMNAS_VALOR)
+    filas = []
+    for cambio in cambios:
+        anterior = anteriores.get((cambio["usuario_id"], cambio["fecha"]), vacio)
+        filas.append({
+            "seq": cambio["seq"],
+            "usuario_id": cambio["usuario_id"],
+            "fecha": cambio["fecha"],
+            "turno": cambio["turno"],
+            "es_reten": cambio["es_reten"],
+            "modificado_manual": cambio["modificado_manual"],
+            "turno_anterior": anterior["turno"],
+            "es_reten_anterior": anterior["es_reten"],
+            "modificado_manual_anterior": anterior["modificado_manual"],
+        })
+    # Insert de Core sobre la tabla: sin el paso por el ORM, que en lotes grandes pesa más que el propio INSERT
+    db.execute(insert(TurnoHistorial.__table__), filas)
+
+def historial_celdas(db: Session, usuario_id: int, desde: date, hasta: date) -> list[TurnoHistorial]:
+    return db.query(TurnoHistorial).filter(
+        TurnoHistorial.usuario_id == usuario_id,
+        TurnoHistorial.fecha >= desde,
+        TurnoHistorial.fecha <= hasta
+    ).order_by(TurnoHistorial.seq).all()
+
+# ── Instantáneas ──────────────────────────────────────────────────────────
+
+def tomar_instantanea(db: Session, year: int, month: int) -> TurnoInstantanea:
+    """Guarda la rejilla actual del mes (sin commit). El seq se lee antes que las celdas"""
+    seq = cursor_actual(db)
+    inicio, fin = rango_mes(year, month)
+    filas = db.query(
+        TurnoModel.usuario_id, TurnoModel.fecha, *(getattr(TurnoModel, c) for c in COLUMNAS_VALOR)
+    ).filter(
+        TurnoModel.fecha >= inicio,
+        TurnoModel.fecha < fin
+    ).order_by(TurnoModel.usuario_id, TurnoModel.fecha).all()
+    instantanea = TurnoInstantanea(
+        year=year, month=month, seq=seq,
+        celdas=[[f.usuario_id, f.fecha.day, f.turno, bool(f.es_reten), bool(f.modificado_manual)] for f in filas]
+    )
+    db.add(instantanea)
+    return instantanea
+
+def meses_sin_instantanea_al_dia(db: Session) -> list[tuple[int, int]]:
+    """Meses con turnos y sin instantánea, o con cambios posteriores a su última instantánea"""
+    ultima = dict(
+        ((y, m), s) for y, m, s in db.query(
+            TurnoInstantanea.year, TurnoInstantanea.month, func.max(TurnoInstantanea.seq)
+        ).group_by(TurnoInstantanea.year, TurnoInstantanea.month)
+    )
+    con_turnos = {
+        (int(y), int(m)) for y, m in db.query(
+            func.extract('year', TurnoModel.fecha), func.extract('month', TurnoModel.fecha)
+        ).distinct()
+    }
+    con_cambios = {
+        (int(y), int(m)): s for y, m, s in db.query(
+            func.extract('year', TurnoHistorial.fecha), func.extract('month', TurnoHistorial.fecha),
+            func.max(TurnoHistorial.seq)
+        ).group_by(func.extract('year', TurnoHistorial.fecha), func.extract('month', TurnoHistorial.fecha))
+    }
+    pendientes = {mes for mes in con_turnos if mes not in ultima}
+    pendientes |= {mes for mes, seq in con_cambios.items() if seq > ultima.get(mes, -1)}
+    return sorted(pendientes)
+
+# ── Reconstrucción ────────────────────────────────────────────────────────
+
+def _select_rejilla_actual(inicio: date, fin: date):
+    return select(
+        TurnoModel.usuario_id, TurnoModel.fecha, *(getattr(TurnoModel, c) for c in COLUMNAS_VALOR)
+    ).where(
+        TurnoModel.fecha >= inicio,
+        TurnoModel.fecha < fin
+    )
+
+def _select_instantanea(year: int, month: int, momento: datetime):
+    """Última instantánea del mes tomada antes de `momento`"""
+    return select(TurnoInstantanea).where(
+        TurnoInstantanea.year == year,
+        TurnoInstantanea.month == month,
+        TurnoInstantanea.tomada_at <= momento
+    ).order_by(TurnoInstantanea.tomada_at.desc()).limit(1)
+
+def _select_cambios(inicio: date, fin: date, momento: datetime, instantanea):
+    """Tras la instantánea hasta `momento` en orden; sin ella, los posteriores a `momento` del último al primero"""
+    en_mes = (TurnoHistorial.fecha >= inicio, TurnoHistorial.fecha < fin)
+    if instantanea is not None:
+        return select(TurnoHistorial).where(
+            *en_mes, TurnoHistorial.seq > instantanea.seq, TurnoHistorial.registrado_at <= momento
+        ).order_by(TurnoHistorial.seq)
+    return select(TurnoHistorial).where(
+        *en_mes, TurnoHistorial.registrado_at > momento
+    ).order_by(TurnoHistorial.seq.desc())
+
+def _reconstruir(year: int, month: int, momento: datetime, instantanea, actuales: list, cambios: list) -> dict:
+    """Aplica `cambios` a la instantánea (o deshace los de la rejilla actual); no toca la base"""
+    if instantanea is not None:
+        celdas = {
+            (usuario_id, date(year, month, dia)): {"turno": turno, "es_reten": es_reten, "modificado_manual": manual}
+            for usuario_id, dia, turno, es_reten, manual in instantanea.celdas
+        }
+        # Los nuevos valores son absolutos: repetir uno que ya estuviera en la instantánea no cambia nada
+        valor = lambda h: {c: getattr(h, c) for c in COLUMNAS_VALOR}
+    else:
+        celdas = {(f.usuario_id, f.fecha): {c: getattr(f, c) for c in COLUMNAS_VALOR} for f in actuales}
+        valor = lambda h: {c: getattr(h, f"{c}_anterior") for c in COLUMNAS_VALOR}
+
+    for cambio in cambios:
+        clave = (cambio.usuario_id, cambio.fecha)
+        nuevo = valor(cambio)
+        if nuevo["turno"] is None:
+            celdas.pop(clave, None)
+        else:
+            celdas[clave] = nuevo
+
+    return {
+        "year": year,
+        "month": month,
+        "momento": momento,
+        "instantanea": instantanea.tomada_at if instantanea is not None else None,
+        "cambios_aplicados": len(cambios),
+        "turnos": [
+            {"usuario_id": usuario_id, "fecha": fecha, "turno": v["turno"],
+             "es_reten": bool(v["es_reten"]), "modificado_manual": bool(v["modificado_manual"])}
+            for (usuario_id, fecha), v in sorted(celdas.items())
+        ],
+    }
+
+def rejilla_en(db: Session, year: int, month: int, momento: datetime) -> dict:
+    """
+    Celdas del mes tal como estaban en `momento`: última instantánea anterior + cambios
+    posteriores hasta `momento`; sin instantánea, rejilla actual menos los cambios
+    posteriores a `momento` deshechos en orden inverso.
+    """
+    inicio, fin = rango_mes(year, month)
+    instantanea = db.execute(_select_instantanea(year, month, momento)).scalars().first()
+    actuales = db.execute(_select_rejilla_actual(inicio, fin)).all() if instantanea is None else []
+    cambios = db.execute(_select_cambios(inicio, fin, momento, instantanea)).scalars().all()
+    return _reconstruir(year, month, momento, instantanea, actuales, cambios)
+
+async def rejilla_en_async(db: AsyncSession, year: int, month: int, momento: datetime) -> dict:
+    """rejilla_en sobre AsyncSession: las consultas se esperan y la reconstrucción va al threadpool"""
+    inicio, fin = rango_mes(year, month)
+    instantanea = (await db.execute(_select_instantanea(year, month, momento))).scalars().first()
+    actuales = (await db.execute(_select_rejilla_actual(inicio, fin))).all() if instantanea is None else []
+    cambios = (await db.execute(_select_cambios(inicio, fin, momento, instantanea))).scalars().all()
+    return await run_in_threadpool(_reconstruir, year, month, momento, instantanea, actuales, cambios)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Toma las instantáneas mensuales de turnos_instantaneas")
+    parser.add_argument("--year", type=int, help="solo este año (por defecto, todos los meses pendientes)")
+    parser.add_argument("--month", type=int, help="solo este mes (con --year)")
+    args = parser.parse_args(argv)
+
+    from app.database import SessionLocal
+    db = SessionLocal()
+    try:
+        if args.year and args.month:
+            meses = [(args.year, args.month)]
+        else:
+            meses = [m for m in meses_sin_instantanea_al_dia(db) if args.year is None or m[0] == args.year]
+        for year, month in meses:
+            tomar_instantanea(db, year, month)
+            db.commit()
+        print(f"Instantáneas tomadas: {len(meses)}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
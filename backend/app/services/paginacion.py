@@ -0,0 +1,58 @@
+# backend/app/services/paginacion.py
+"""
+Paginación por clave (keyset) ordenada por id.
+
+El cursor es opaco para el cliente: codifica el último id servido y el total
+contado en la primera página, así las páginas siguientes no repiten el COUNT.
+También lleva una huella de los filtros con que se contó: un cursor reutilizado
+con otros filtros daría un total falso y saltaría filas, así que se rechaza.
+Cada página es un `WHERE id > :ultimo ORDER BY id LIMIT n`, que cuesta lo mismo
+sea cual sea la página (OFFSET recorre y descarta todas las filas anteriores).
+"""
+import base64
+import hashlib
+import json
+from typing import Any, Optional
+from sqlalchemy.orm import Query
+
+LIMITE_DEFECTO = 100
+LIMITE_MAXIMO = 500
+
+def huella_filtros(filtros: Optional[dict[str, Any]]) -> str:
+    """Hash corto y estable de los valores de los filtros (fechas como ISO)"""
+    datos = json.dumps(filtros or {}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(datos.encode()).hexdigest()[:16]
+
+def codificar_cursor(ultimo_id: int, total: Optional[int], huella: str = "") -> str:
+    datos = json.dumps({"id": ultimo_id, "total": total, "f": huella}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(datos.encode()).decode().rstrip("=")
+
+def decodificar_cursor(cursor: str) -> tuple[int, Optional[int], str]:
+    """(último id, total, huella de filtros) de un cursor; ValueError si no es válido"""
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        ultimo_id, total, huella = int(datos["id"]), datos.get("total"), str(datos.get("f", ""))
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Cursor no válido") from e
+    return ultimo_id, int(total) if total is not None else None, huella
+
+def paginar(query: Query, columna_id, cursor: Optional[str], limit: int,
+            filtros: Optional[dict[str, Any]] = None) -> dict:
+    """Página de `query` (ya filtrada con `filtros`) a partir del cursor; devuelve los campos de Pagina"""
+    huella = huella_filtros(filtros)
+    if cursor:
+        ultimo_id, total, huella_cursor = decodificar_cursor(cursor)
+        if huella_cursor != huella:
+            raise ValueError("El cursor no corresponde a estos filtros")
+        query = query.filter(columna_id > ultimo_id)
+    else:
+        total = query.order_by(None).count()
+
+    # Una fila de más para saber si hay página siguiente sin otra consulta
+    filas = query.order_by(columna_id).limit(limit + 1).all()
+    siguiente = None
+    if len(filas) > limit:
+        filas = filas[:limit]
+        siguiente = codificar_cursor(getattr(filas[-1], columna_id.key), total, huella)
+    return {"items": filas, "next_cursor": siguiente, "total": total}
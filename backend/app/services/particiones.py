@@ -0,0 +1,84 @@
+# backend/app/services/particiones.py
+"""
+Mantenimiento de las particiones anuales de turnos_asignados (solo PostgreSQL).
+
+La migración 0002 crea una partición por año hasta el siguiente al actual y una
+partición DEFAULT que recoge cualquier fecha fuera de ellas. Antes de empezar
+cada año conviene crear la partición del siguiente (p. ej. desde cron):
+
+    python -m app.services.particiones            # año actual + 1
+    python -m app.services.particiones --year 2030
+
+Si la DEFAULT ya tiene filas de ese año se mueven a la nueva partición en la
+misma transacción. En SQLite no hay particiones y el comando no hace nada.
+"""
+import argparse
+from datetime import date
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+TABLA = "turnos_asignados"
+DEFAULT = f"{TABLA}_default"
+
+def nombre_particion(year: int) -> str:
+    return f"{TABLA}_y{year}"
+
+def tabla_particionada(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return conn.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:tabla))"
+    ), {"tabla": TABLA}).scalar()
+
+def particiones_existentes(conn: Connection) -> list[str]:
+    return list(conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:tabla) ORDER BY c.relname"
+    ), {"tabla": TABLA}).scalars())
+
+def crear_particion(conn: Connection, year: int) -> bool:
+    """
+    Crea la partición del año si no existe. Devuelve False si ya existía.
+    La tabla se crea suelta, se le pasan las filas de ese año que hubiera en la
+    DEFAULT y después se adjunta (ATTACH fallaría con esas filas en la DEFAULT).
+    """
+    particion = nombre_particion(year)
+    if particion in particiones_existentes(conn):
+        return False
+    desde, hasta = f"{year}-01-01", f"{year + 1}-01-01"
+    conn.execute(text(f"CREATE TABLE {particion} (LIKE {TABLA} INCLUDING DEFAULTS)"))
+    conn.execute(text(f"""
+        WITH movidas AS (
+            DELETE FROM {DEFAULT} WHERE fecha >= :desde AND fecha < :hasta RETURNING *
+        )
+        INSERT INTO {particion} SELECT * FROM movidas
+    """), {"desde": date.fromisoformat(desde), "hasta": date.fromisoformat(hasta)})
+    # La restricción evita que ATTACH tenga que recorrer la tabla para validarla
+    conn.execute(text(
+        f"ALTER TABLE {particion} ADD CONSTRAINT {particion}_rango "
+        f"CHECK (fecha >= DATE '{desde}' AND fecha < DATE '{hasta}')"
+    ))
+    conn.execute(text(
+        f"ALTER TABLE {TABLA} ATTACH PARTITION {particion} FOR VALUES FROM ('{desde}') TO ('{hasta}')"
+    ))
+    conn.execute(text(f"ALTER TABLE {particion} DROP CONSTRAINT {particion}_rango"))
+    return True
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crea la partición anual de turnos_asignados")
+    parser.add_argument("--year", type=int, default=date.today().year + 1,
+                        help="año de la partición (por defecto, el siguiente al actual)")
+    args = parser.parse_args(argv)
+
+    from app.database import engine
+    with engine.begin() as conn:
+        if not tabla_particionada(conn):
+            print(f"{TABLA} no está particionada (motor {conn.dialect.name}): nada que hacer")
+            return
+        if crear_particion(conn, args.year):
+            print(f"Creada {nombre_particion(args.year)}")
+        else:
+            print(f"{nombre_particion(args.year)} ya existe")
+
+if __name__ == "__main__":
+    main()
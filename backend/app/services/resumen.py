@@ -0,0 +1,163 @@
+# backend/app/services/resumen.py
+"""
+Mantenimiento de resumen_mensual: totales por (usuario, año, mes).
+
+Cada escritura de turnos recalcula solo los meses de los usuarios afectados.
+Para cargar el histórico (o reparar la tabla y el catálogo turnos_years) usar:
+
+    python -m app.services.resumen [--year 2025]
+
+Los años con turnos que la tabla no recoge (resumen_pendiente, los marca la
+migración 0009) se leen de turnos_asignados en los reportes hasta regenerarlos.
+"""
+import argparse
+from datetime import date
+from typing import Iterable, Optional
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+from app.models.turno import Turno as TurnoModel, TurnosYear
+from app.models.usuario import Usuario
+from app.models.resumen import ResumenMensual, ResumenPendiente
+from app.services.codigos import catalogo
+from app.services.festivos import get_festivos_mes
+
+def rango_mes(year: int, month: int) -> tuple[date, date]:
+    inicio = date(year, month, 1)
+    fin = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return inicio, fin
+
+def _calcular_mes(db: Session, year: int, month: int, usuario_ids: Optional[set[int]] = None) -> list[dict]:
+    """Totales del mes a partir de turnos_asignados, para los usuarios dados o para todos"""
+    inicio, fin = rango_mes(year, month)
+    query = db.query(TurnoModel.usuario_id, TurnoModel.fecha, TurnoModel.turno).filter(
+        TurnoModel.fecha >= inicio,
+        TurnoModel.fecha < fin
+    )
+    query_cumples = db.query(Usuario.id, Usuario.cumple_anios).filter(
+        Usuario.cumple_anios.isnot(None),
+        func.extract('month', Usuario.cumple_anios) == month
+    )
+    if usuario_ids is not None:
+        query = query.filter(TurnoModel.usuario_id.in_(usuario_ids))
+        query_cumples = query_cumples.filter(Usuario.id.in_(usuario_ids))
+
+    festivos = get_festivos_mes(year, month, db)
+    cumples = {}
+    for usuario_id, cumple in query_cumples.all():
+        try:
+            cumples[usuario_id] = date(year, month, cumple.day)
+        except ValueError:
+            continue
+
+    totales: dict[int, dict] = {
+        uid: _resumen_vacio(uid, year, month) for uid in (usuario_ids or ())
+    }
+    codigos = catalogo(db)
+    vacaciones, cumpleanos = codigos.de_ausencia("vacaciones"), codigos.de_ausencia("cumpleaños")
+    horas_por_dia: dict[tuple[int, date], int] = {}
+    for usuario_id, fecha, turno in query.all():
+        r = totales.setdefault(usuario_id, _resumen_vacio(usuario_id, year, month))
+        r["codigos"][turno] = r["codigos"].get(turno, 0) + 1
+        if turno in codigos.contables:
+            horas = codigos.horas[turno]
+            r["horas_trabajadas_raw"] += horas
+            clave = (usuario_id, fecha)
+            if clave not in horas_por_dia:
+                r["dias_trabajados"] += 1
+                if fecha in festivos:
+                    r["dias_festivos"] += 1
+            horas_por_dia[clave] = max(horas_por_dia.get(clave, 0), horas)
+        elif turno in vacaciones:
+            r["dias_vacaciones"] += 1
+        elif turno in cumpleanos and cumples.get(usuario_id) == fecha:
+            r["cumple_tomado"] = True
+
+    for (usuario_id, _), horas in horas_por_dia.items():
+        totales[usuario_id]["horas_trabajadas"] += horas
+    return list(totales.values())
+
+def _resumen_vacio(usuario_id: int, year: int, month: int) -> dict:
+    return {
+        "usuario_id": usuario_id, "year": year, "month": month, "codigos": {},
+        "horas_trabajadas": 0, "horas_trabajadas_raw": 0, "dias_trabajados": 0,
+        "dias_festivos": 0, "dias_vacaciones": 0, "cumple_tomado": False
+    }
+
+def _guardar_mes(db: Session, year: int, month: int, filas: list[dict], usuario_ids: Optional[set[int]] = None):
+    borrar = db.query(ResumenMensual).filter(
+        ResumenMensual.year == year,
+        ResumenMensual.month == month
+    )
+    if usuario_ids is not None:
+        borrar = borrar.filter(ResumenMensual.usuario_id.in_(usuario_ids))
+    borrar.delete(synchronize_session=False)
+    if filas:
+        db.execute(insert(ResumenMensual), filas)
+
+def recalcular_resumen(db: Session, claves: Iterable[tuple[int, int, int]]):
+    """Recalcula los meses (usuario_id, year, month) indicados, sin hacer commit"""
+    por_mes: dict[tuple[int, int], set[int]] = {}
+    for usuario_id, year, month in claves:
+        por_mes.setdefault((year, month), set()).add(usuario_id)
+    for (year, month), usuario_ids in por_mes.items():
+        _guardar_mes(db, year, month, _calcular_mes(db, year, month, usuario_ids), usuario_ids)
+
+def recalcular_meses(db: Session, meses: Iterable[tuple[int, int]]):
+    """Recalcula meses completos (todos los usuarios), sin hacer commit"""
+    for year, month in meses:
+        _guardar_mes(db, year, month, _calcular_mes(db, year, month))
+
+def recalcular_usuario_meses(db: Session, usuario_id: int, months: Iterable[int]):
+    """Recalcula los meses ya resumidos de un usuario (p. ej. al cambiar su cumpleaños), sin commit"""
+    months = set(months)
+    years = db.query(ResumenMensual.year).filter(
+        ResumenMensual.usuario_id == usuario_id
+    ).distinct().all()
+    recalcular_resumen(db, [(usuario_id, y, m) for (y,) in years for m in months])
+
+def years_con_turnos(db: Session) -> list[int]:
+    """Años del catálogo turnos_years (sin recorrer turnos_asignados)"""
+    return [y for (y,) in db.query(TurnosYear.year).order_by(TurnosYear.year).all()]
+
+def reconstruir_years(db: Session) -> list[int]:
+    """Rehace turnos_years recorriendo turnos_asignados (tras cargas hechas fuera de la API)"""
+    filas = db.query(func.extract('year', TurnoModel.fecha).label('y')).distinct().all()
+    years = sorted({int(f.y) for f in filas if f.y is not None})
+    db.query(TurnosYear).delete(synchronize_session=False)
+    if years:
+        db.execute(insert(TurnosYear), [{"year": y} for y in years])
+    return years
+
+def resumen_al_dia(db: Session, year: int) -> bool:
+    """False si el año está en resumen_pendiente (resumen_mensual no recoge todos sus turnos)"""
+    return db.get(ResumenPendiente, year) is None
+
+def reconstruir_resumen(db: Session, year: Optional[int] = None):
+    """
+    Regenera resumen_mensual desde turnos_asignados para un año o para todo el
+    histórico; en este último caso rehace también el catálogo turnos_years.
+    Los años regenerados dejan de estar pendientes.
+    """
+    years = [year] if year is not None else reconstruir_years(db)
+    recalcular_meses(db, [(y, m) for y in years for m in range(1, 13)])
+    pendientes = db.query(ResumenPendiente)
+    if year is not None:
+        pendientes = pendientes.filter(ResumenPendiente.year == year)
+    pendientes.delete(synchronize_session=False)
+    db.commit()
+    return years
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+    from app.models import rol  # noqa: F401  (registra el mapper de Rol usado por Usuario)
+
+    parser = argparse.ArgumentParser(description="Reconstruye la tabla resumen_mensual")
+    parser.add_argument("--year", type=int, default=None, help="Año a regenerar (por defecto todos)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        years = reconstruir_resumen(db, args.year)
+        print(f"resumen_mensual regenerado para: {', '.join(map(str, years)) or 'ningún año'}")
+    finally:
+        db.close()
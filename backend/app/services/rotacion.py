@@ -0,0 +1,193 @@
+# backend/app/services/rotacion.py
+"""
+Generador de rotaciones 24/7.
+
+Cada grupo (rol) tiene un ciclo de códigos que se repite; cada usuario entra en
+el ciclo con su desfase. El cuadrante completo se calcula en memoria, se compara
+con lo que ya hay en la base y solo se escriben las celdas que cambian, con un
+único upsert (ver upsert_turnos) cuyo ON CONFLICT ... WHERE no toca
+las celdas modificadas a mano ni las ausencias (vacaciones, baja, cumpleaños),
+aunque alguien las haya cambiado mientras se generaba.
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.models.turno import Turno as TurnoModel
+from app.models.usuario import Usuario
+from app.schemas.turno import PatronRotacion, RotacionRequest
+from app.services.codigos import catalogo
+from app.services.festivos import get_festivos_rango
+from app.services.turnos import upsert_turnos
+
+# Tipos de ausencia que el generador nunca sobrescribe ("descanso" sí se regenera)
+AUSENCIAS_PROTEGIDAS = ("vacaciones", "baja", "cumpleaños")
+
+COLUMNAS_ROTACION = ["turno", "es_reten", "generado_automático", "modificado_manual", "estado"]
+
+def codigos_protegidos(db: Session) -> frozenset:
+    codigos = catalogo(db)
+    return frozenset().union(*(codigos.de_ausencia(tipo) for tipo in AUSENCIAS_PROTEGIDAS))
+
+def _validar_codigos(db: Session, grupos: list[PatronRotacion]):
+    conocidos = catalogo(db).codigos
+    for grupo in grupos:
+        for codigo in [*grupo.ciclo, *grupo.sustitucion_festivo.keys(), *grupo.sustitucion_festivo.values()]:
+            if codigo not in conocidos:
+                raise ValueError(f"Código de turno desconocido: {codigo}")
+
+def _select_usuarios_grupo(grupo: PatronRotacion):
+    consulta = select(Usuario.id, Usuario.fecha_ingreso, Usuario.fecha_salida)
+    if grupo.usuario_ids is None:
+        consulta = consulta.where(Usuario.rol_id == grupo.rol_id, Usuario.estado == "activo")
+    else:
+        consulta = consulta.where(Usuario.id.in_(grupo.usuario_ids))
+    return consulta.order_by(Usuario.id)
+
+def _comprobar_grupo(grupo: PatronRotacion, usuarios: list) -> list:
+    if grupo.usuario_ids is not None and len(usuarios) != len(set(grupo.usuario_ids)):
+        raise ValueError("Algún usuario del grupo no existe")
+    return usuarios
+
+def generar_celdas(grupo: PatronRotacion, usuarios: list, desde: date, hasta: date,
+                   referencia: date, festivos: set[date]) -> dict[tuple[int, date], str]:
+    """(usuario_id, fecha) -> código para todos los días de [desde, hasta] en que el usuario está de alta"""
+    ciclo, largo = grupo.ciclo, len(grupo.ciclo)
+    dias = [desde + timedelta(days=d) for d in range((hasta - desde).days + 1)]
+    sustituir = [
+        bool(grupo.sustitucion_festivo) and (dia in festivos or (grupo.sustituir_fines_de_semana and dia.weekday() >= 5))
+        for dia in dias
+    ]
+    base = (desde - referencia).days
+    celdas = {}
+    for i, usuario in enumerate(usuarios):
+        desfase = grupo.desfases.get(usuario.id, i)
+        for d, dia in enumerate(dias):
+            if dia < usuario.fecha_ingreso or (usuario.fecha_salida is not None and dia > usuario.fecha_salida):
+                continue
+            codigo = ciclo[(base + d + desfase) % largo]
+            if sustituir[d]:
+                codigo = grupo.sustitucion_festivo.get(codigo, codigo)
+            celdas[(usuario.id, dia)] = codigo
+    return celdas
+
+def _generar(request: RotacionRequest, usuarios_grupos: list[list], festivos: set[date]):
+    """(celdas de todos los grupos, sus usuario_ids)"""
+    referencia = request.fecha_referencia or request.desde
+    celdas: dict[tuple[int, date], str] = {}
+    for grupo, usuarios in zip(request.grupos, usuarios_grupos):
+        celdas.update(generar_celdas(grupo, usuarios, request.desde, request.hasta, referencia, festivos))
+    return celdas, {uid for uid, _ in celdas}
+
+def _select_existentes(request: RotacionRequest, usuario_ids: set[int]):
+    """Estado actual del rango en una sola consulta"""
+    return select(
+        TurnoModel.usuario_id, TurnoModel.fecha, TurnoModel.turno,
+        TurnoModel.modificado_manual, TurnoModel.es_reten
+    ).where(
+        TurnoModel.usuario_id.in_(usuario_ids),
+        TurnoModel.fecha >= request.desde,
+        TurnoModel.fecha <= request.hasta
+    )
+
+@dataclass
+class _Plan:
+    """Filas que hay que escribir y recuentos para la respuesta"""
+    filas: list
+    cambios: list
+    sin_cambios: int
+    respetadas: int
+    creados: int
+    actualizados: int = 0
+
+def _planificar(request: RotacionRequest, celdas: dict, existentes: list, protegidos: frozenset) -> _Plan:
+    """Compara el cuadrante con lo que hay; no toca la base"""
+    actuales = {(f.usuario_id, f.fecha): f for f in existentes}
+    filas, cambios = [], []
+    sin_cambios = respetadas = creados = 0
+    for (usuario_id, fecha), codigo in celdas.items():
+        actual = actuales.get((usuario_id, fecha))
+        if actual is not None:
+            if actual.modificado_manual or actual.turno in protegidos:
+                respetadas += 1
+                continue
+            if actual.turno == codigo and not actual.es_reten:
+                sin_cambios += 1
+                continue
+        else:
+            creados += 1
+        filas.append({
+            "usuario_id": usuario_id,
+            "fecha": fecha,
+            "turno": codigo,
+            "es_reten": False,
+            "generado_automático": True,
+            "modificado_manual": False,
+            "estado": "activo"
+        })
+        if request.dry_run:
+            cambios.append({"usuario_id": usuario_id, "fecha": fecha, "turno": codigo,
+                            "anterior": actual.turno if actual is not None else None})
+    return _Plan(filas, cambios, sin_cambios, respetadas, creados, actualizados=len(filas) - creados)
+
+def _escribir(db: Session, plan: _Plan, protegidos: frozenset) -> None:
+    """Upsert de plan.filas (sin commit); ajusta los recuentos a lo que de verdad se ha escrito"""
+    # El WHERE repite la protección en la base: vale aunque la celda haya cambiado desde la lectura.
+    # Comparaciones sueltas en vez de NOT IN: un IN con lista no se puede usar en executemany
+    donde = and_(
+        func.coalesce(TurnoModel.modificado_manual, False).is_(False),
+        *(TurnoModel.turno != codigo for codigo in sorted(protegidos))
+    )
+    resultados = upsert_turnos(db, plan.filas, COLUMNAS_ROTACION, donde=donde)
+    plan.creados = sum(1 for r in resultados if r["creado"])
+    plan.respetadas += len(plan.filas) - len(resultados)
+    plan.actualizados = len(resultados) - plan.creados
+
+def _resultado(request: RotacionRequest, celdas: dict, usuario_ids: set[int], plan: _Plan) -> dict:
+    return {
+        "dry_run": request.dry_run,
+        "usuarios": len(usuario_ids),
+        "celdas_generadas": len(celdas),
+        "turnos_creados": plan.creados,
+        "turnos_actualizados": plan.actualizados,
+        "sin_cambios": plan.sin_cambios,
+        "respetadas": plan.respetadas,
+        "cambios": plan.cambios if request.dry_run else None,
+    }
+
+def aplicar_rotacion(db: Session, request: RotacionRequest) -> dict:
+    """
+    Genera el cuadrante pedido y, salvo en dry_run, escribe los cambios (sin commit).
+    ValueError si algún código o usuario no es válido.
+    """
+    _validar_codigos(db, request.grupos)
+    festivos = get_festivos_rango(db, request.desde, request.hasta + timedelta(days=1))
+    usuarios_grupos = [
+        _comprobar_grupo(grupo, db.execute(_select_usuarios_grupo(grupo)).all()) for grupo in request.grupos
+    ]
+    celdas, usuario_ids = _generar(request, usuarios_grupos, festivos)
+
+    protegidos = codigos_protegidos(db)
+    existentes = db.execute(_select_existentes(request, usuario_ids)).all() if usuario_ids else []
+    plan = _planificar(request, celdas, existentes, protegidos)
+    if not request.dry_run and plan.filas:
+        _escribir(db, plan, protegidos)
+    return _resultado(request, celdas, usuario_ids, plan)
+
+async def aplicar_rotacion_async(db: AsyncSession, request: RotacionRequest) -> dict:
+    """aplicar_rotacion sobre AsyncSession: el cuadrante y la comparación se calculan en el threadpool"""
+    await db.run_sync(_validar_codigos, request.grupos)
+    festivos = await db.run_sync(get_festivos_rango, request.desde, request.hasta + timedelta(days=1))
+    usuarios_grupos = [
+        _comprobar_grupo(grupo, (await db.execute(_select_usuarios_grupo(grupo))).all()) for grupo in request.grupos
+    ]
+    celdas, usuario_ids = await run_in_threadpool(_generar, request, usuarios_grupos, festivos)
+
+    protegidos = await db.run_sync(codigos_protegidos)
+    existentes = (await db.execute(_select_existentes(request, usuario_ids))).all() if usuario_ids else []
+    plan = await run_in_threadpool(_planificar, request, celdas, existentes, protegidos)
+    if not request.dry_run and plan.filas:
+        await db.run_sync(_escribir, plan, protegidos)
+    return _resultado(request, celdas, usuario_ids, plan)
@@ -0,0 +1,429 @@
+# backend/app/services/trabajos.py
+"""
+Trabajos en segundo plano (POST /jobs, GET /jobs/{id}; ver routers/trabajos.py).
+
+Las operaciones pesadas (reportes y exportaciones de un año, cumpleaños de todo el
+año, ausencias en bloque) se pueden lanzar como trabajo: la petición solo inserta
+una fila en `trabajos` y devuelve su id, un pool de TRABAJOS_HILOS hilos de este
+worker la ejecuta y el cliente consulta GET /jobs/{id} hasta que termina. Son hilos
+y no procesos: casi todo el tiempo es espera de la base, y cada proceso
+necesitaría su propio pool de conexiones.
+
+- Cada tipo (registrar_tipo) declara el modelo de sus parámetros y una función
+  ejecutar(parametros, avance) que abre sus propias sesiones. Devuelve algo
+  serializable a JSON (se guarda en `resultado`) o un Fichero, que se escribe
+  por partes en TRABAJOS_DIR (la fila solo guarda su nombre, `ruta_fichero`) y se
+  descarga en GET /jobs/{id}/resultado. Con varios servidores TRABAJOS_DIR tiene
+  que ser un directorio compartido.
+- avance(hecho, total, mensaje) guarda el progreso como mucho cada
+  INTERVALO_AVANCE_S y, como avance.comprobar(), lanza TrabajoCancelado si se ha
+  pedido cancelar (DELETE /jobs/{id}). La cancelación es cooperativa: el trabajo
+  para en su siguiente paso y lo ya confirmado se queda.
+- Como mucho TRABAJOS_MAX_PENDIENTES trabajos en cola o en curso por worker;
+  después POST /jobs responde 503.
+- Un trabajo pasa a en_curso con un UPDATE condicionado a estado='pendiente': si
+  dos workers lo tienen en cola solo uno lo ejecuta. Mientras corre se renueva
+  actualizado_at cada LATIDO_S.
+- Al apagar el worker los trabajos en curso paran en su siguiente paso y vuelven a
+  pendiente. Al arrancar (app/arranque.py) se encolan los pendientes que caben en
+  MAX_PENDIENTES, y los en_curso sin latido desde hace TRABAJOS_CADUCIDAD_S
+  (worker caído) pasan a error. Los pendientes que no cupieron los recoge el
+  latido cada LATIDO_S, o antes si se libera una plaza.
+
+Los trabajos terminados y sus ficheros se borran pasados unos días (p. ej. cada
+noche desde cron):
+
+    python -m app.services.trabajos --dias 7
+"""
+import argparse
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from app import database
+from app.models.trabajo import Trabajo
+
+logger = logging.getLogger(__name__)
+
+HILOS = int(os.getenv("TRABAJOS_HILOS", "2"))
+MAX_PENDIENTES = int(os.getenv("TRABAJOS_MAX_PENDIENTES", "20"))
+CADUCIDAD_S = int(os.getenv("TRABAJOS_CADUCIDAD_S", "300"))
+DIRECTORIO = Path(os.getenv("TRABAJOS_DIR") or Path(tempfile.gettempdir()) / "turnos_trabajos")
+RETENCION_DIAS = 7
+INTERVALO_AVANCE_S = 1.0
+LATIDO_S = 30
+
+ESTADOS_ACTIVOS = ("pendiente", "en_curso")
+
+class TrabajoCancelado(Exception):
+    """Se pidió cancelar el trabajo"""
+
+class TrabajoInterrumpido(Exception):
+    """El worker se está apagando: el trabajo vuelve a pendiente"""
+
+class ColaLlena(Exception):
+    """Este worker ya tiene MAX_PENDIENTES trabajos en cola o en curso"""
+
+@dataclass
+class Fichero:
+    """Resultado descargable; `partes` se consume comprobando la cancelación entre una y otra"""
+    nombre: str
+    tipo_medio: str
+    partes: Iterable[bytes]
+
+@dataclass(frozen=True)
+class TipoTrabajo:
+    nombre: str
+    parametros: type[BaseModel]
+    ejecutar: Callable[[Any, "Avance"], Any]
+    validar: Optional[Callable[[Any], None]] = None  # comprobaciones al crear, además del modelo
+
+TIPOS: dict[str, TipoTrabajo] = {}
+
+def registrar_tipo(nombre: str, parametros: type[BaseModel], validar: Optional[Callable[[Any], None]] = None):
+    """Decorador de la función que ejecuta un tipo de trabajo"""
+    def decorador(ejecutar):
+        TIPOS[nombre] = TipoTrabajo(nombre, parametros, ejecutar, validar)
+        return ejecutar
+    return decorador
+
+def _actualizar(trabajo_id: int, condicion=None, **valores) -> Optional[bool]:
+    """UPDATE de la fila en su propia transacción; devuelve `cancelar`, o None si no se actualizó nada"""
+    db = database.SessionLocal()
+    try:
+        sentencia = update(Trabajo).where(Trabajo.id == trabajo_id)
+        if condicion is not None:
+            sentencia = sentencia.where(condicion)
+        fila = db.execute(
+            sentencia.values(actualizado_at=func.now(), **valores).returning(Trabajo.cancelar),
+            execution_options={"synchronize_session": False}
+        ).first()
+        db.commit()
+        return None if fila is None else bool(fila[0])
+    finally:
+        db.close()
+
+class Avance:
+    """Progreso y cancelación de un trabajo en curso"""
+
+    def __init__(self, trabajo_id: int, cerrando: threading.Event):
+        self.trabajo_id = trabajo_id
+        self._cerrando = cerrando
+        self._ultimo = 0.0
+
+    def __call__(self, hecho: float, total: float, mensaje: Optional[str] = None) -> None:
+        self._guardar(progreso=min(hecho / total, 1.0) if total else 0.0, mensaje=mensaje)
+
+    def comprobar(self) -> None:
+        """TrabajoCancelado / TrabajoInterrumpido si hay que parar (consulta la base como mucho cada INTERVALO_AVANCE_S)"""
+        self._guardar()
+
+    def _guardar(self, **valores) -> None:
+        if self._cerrando.is_set():
+            raise TrabajoInterrumpido()
+        ahora = time.monotonic()
+        if ahora - self._ultimo < INTERVALO_AVANCE_S:
+            return
+        self._ultimo = ahora
+        if _actualizar(self.trabajo_id, **valores):
+            raise TrabajoCancelado()
+
+class Ejecutor:
+    """Pool de hilos de este worker; se crea con el primer trabajo"""
+
+    def __init__(self, hilos: int = HILOS, max_pendientes: int = MAX_PENDIENTES):
+        self.hilos = hilos
+        self.max_pendientes = max_pendientes
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._en_cola: set[int] = set()  # en cola o en curso
+        self._reservas = 0  # plazas de trabajos que se están insertando
+        self._en_curso: set[int] = set()
+        self._cerrando = threading.Event()
+        self._latido: Optional[threading.Thread] = None
+        self._rezagados = False  # la última recogida llenó las plazas: puede haber más pendientes
+
+    def reservar(self) -> bool:
+        """Aparta una plaza para un trabajo nuevo; False si ya hay max_pendientes entre cola, curso y reservas"""
+        with self._lock:
+            if len(self._en_cola) + self._reservas >= self.max_pendientes:
+                return False
+            self._reservas += 1
+            return True
+
+    def liberar(self) -> None:
+        with self._lock:
+            self._reservas -= 1
+
+    def encolar(self, trabajo_id: int, reservado: bool = False) -> None:
+        """`reservado`: ocupa la plaza apartada con reservar()"""
+        with self._lock:
+            if reservado:
+                self._reservas -= 1
+            if trabajo_id in self._en_cola:
+                return
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self.hilos, thread_name_prefix="trabajo")
+            self._arrancar_latido()
+            self._en_cola.add(trabajo_id)
+            self._pool.submit(self._ejecutar, trabajo_id)
+
+    def recoger(self) -> int:
+        """Encola pendientes de la tabla (los más antiguos) en las plazas libres; devuelve cuántos"""
+        with self._lock:
+            self._arrancar_latido()
+            libres = self.max_pendientes - len(self._en_cola) - self._reservas
+            if libres <= 0:
+                self._rezagados = True
+                return 0
+            self._reservas += libres
+            excluidos = set(self._en_cola)
+        encolados = 0
+        try:
+            db = database.SessionLocal()
+            try:
+                ids = [i for (i,) in db.query(Trabajo.id).filter(
+                    Trabajo.estado == "pendiente", Trabajo.id.notin_(excluidos)
+                ).order_by(Trabajo.id).limit(libres)]
+            finally:
+                db.close()
+            self._rezagados = len(ids) == libres
+            for trabajo_id in ids:
+                self.encolar(trabajo_id, reservado=True)
+                encolados += 1
+        finally:
+            with self._lock:
+                self._reservas -= libres - encolados
+        return encolados
+
+    def _arrancar_latido(self) -> None:
+        """Con el lock tomado"""
+        if self._latido is None:
+            self._latido = threading.Thread(target=self._latir, name="trabajos-latido", daemon=True)
+            self._latido.start()
+
+    def _ejecutar(self, trabajo_id: int) -> None:
+        try:
+            if not self._cerrando.is_set():
+                ejecutar_trabajo(trabajo_id, self._cerrando, self._en_curso.add)
+        except Exception:
+            logger.exception("Error inesperado en el trabajo %s", trabajo_id)
+        finally:
+            with self._lock:
+                self._en_cola.discard(trabajo_id)
+                self._en_curso.discard(trabajo_id)
+        if self._rezagados and not self._cerrando.is_set():
+            self._recoger_sin_error()
+
+    def _recoger_sin_error(self) -> None:
+        try:
+            self.recoger()
+        except Exception as e:
+            logger.warning("No se pudieron recoger trabajos pendientes: %s", e)
+
+    def _latir(self) -> None:
+        while True:
+            time.sleep(LATIDO_S)
+            if self._pool is not None and not self._cerrando.is_set():
+                self._recoger_sin_error()
+            ids = list(self._en_curso)
+            if not ids:
+                continue
+            db = database.SessionLocal()
+            try:
+                db.execute(update(Trabajo).where(Trabajo.id.in_(ids)).values(actualizado_at=func.now()),
+                           execution_options={"synchronize_session": False})
+                db.commit()
+            except Exception as e:
+                logger.warning("No se pudo renovar el latido de los trabajos %s: %s", ids, e)
+            finally:
+                db.close()
+
+    def detener(self) -> None:
+        """Apagado del worker: los que no han empezado siguen pendientes, los en curso paran en su siguiente paso"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        self._cerrando.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            self._en_cola.clear()
+        self._cerrando.clear()
+
+    def estado(self) -> dict:
+        return {"hilos": self.hilos, "max_pendientes": self.max_pendientes,
+                "en_cola": len(self._en_cola) - len(self._en_curso), "en_curso": len(self._en_curso)}
+
+ejecutor = Ejecutor()
+
+def ruta_fichero(nombre: str) -> Path:
+    return DIRECTORIO / nombre
+
+def _borrar_fichero(nombre: Optional[str]) -> None:
+    if nombre:
+        ruta_fichero(nombre).unlink(missing_ok=True)
+
+def _guardar_fichero(trabajo_id: int, fichero: Fichero, avance: Avance) -> str:
+    """Escribe las partes según llegan (a .parcial, renombrado al terminar); devuelve el nombre en DIRECTORIO"""
+    DIRECTORIO.mkdir(parents=True, exist_ok=True)
+    nombre = f"{trabajo_id}-{uuid.uuid4().hex}"
+    parcial = ruta_fichero(nombre + ".parcial")
+    try:
+        with open(parcial, "wb") as f:
+            for parte in fichero.partes:
+                f.write(parte)
+                avance.comprobar()
+        os.replace(parcial, ruta_fichero(nombre))
+    finally:
+        parcial.unlink(missing_ok=True)
+    return nombre
+
+def _valores_resultado(trabajo_id: int, resultado: Any, avance: Avance) -> dict:
+    if isinstance(resultado, Fichero):
+        return {"ruta_fichero": _guardar_fichero(trabajo_id, resultado, avance),
+                "nombre_fichero": resultado.nombre, "tipo_medio": resultado.tipo_medio}
+    return {"resultado": to_jsonable_python(resultado)}
+
+def ejecutar_trabajo(trabajo_id: int, cerrando: threading.Event,
+                     al_empezar: Callable[[int], None] = lambda _: None) -> None:
+    """Reclama el trabajo (si sigue pendiente), lo ejecuta y guarda el resultado o el error"""
+    if _actualizar(trabajo_id, Trabajo.estado == "pendiente",
+                   estado="en_curso", iniciado_at=func.now(), progreso=0, mensaje=None) is None:
+        return  # cancelado o ya en otro worker
+    al_empezar(trabajo_id)
+
+    db = database.SessionLocal()
+    try:
+        tipo_nombre, datos = db.query(Trabajo.tipo, Trabajo.parametros).filter(Trabajo.id == trabajo_id).one()
+    finally:
+        db.close()
+
+    error = None
+    try:
+        tipo = TIPOS.get(tipo_nombre)
+        if tipo is None:
+            raise ValueError(f"Tipo de trabajo desconocido: {tipo_nombre}")
+        avance = Avance(trabajo_id, cerrando)
+        valores = _valores_resultado(trabajo_id, tipo.ejecutar(tipo.parametros.model_validate(datos), avance), avance)
+    except TrabajoCancelado:
+        _actualizar(trabajo_id, estado="cancelado", mensaje="Cancelado", terminado_at=func.now())
+        return
+    except TrabajoInterrumpido:
+        _actualizar(trabajo_id, estado="pendiente", progreso=0, mensaje="Interrumpido al apagar el worker; se reanudará")
+        return
+    except Exception as e:
+        # HTTPException de las funciones de los routers: su detail es el mensaje para el usuario
+        error = getattr(e, "detail", None) or str(e) or type(e).__name__
+        logger.warning("Trabajo %s (%s) terminado con error: %s", trabajo_id, tipo_nombre, error)
+    if error is None:
+        try:
+            _actualizar(trabajo_id, estado="completado", progreso=1, terminado_at=func.now(), **valores)
+        except Exception:
+            _borrar_fichero(valores.get("ruta_fichero"))
+            raise
+    else:
+        _actualizar(trabajo_id, estado="error", error=str(error), terminado_at=func.now())
+
+# ── API ───────────────────────────────────────────────────────────────────
+
+def crear_trabajo(db: Session, tipo: str, parametros: BaseModel) -> Trabajo:
+    """
+    Inserta el trabajo (commit) y lo encola; ColaLlena si este worker no admite más.
+    La plaza se reserva antes del INSERT: peticiones simultáneas no pasan de MAX_PENDIENTES
+    """
+    if not ejecutor.reservar():
+        raise ColaLlena()
+    try:
+        trabajo = Trabajo(tipo=tipo, parametros=parametros.model_dump(mode="json"),
+                          estado="pendiente", progreso=0, cancelar=False)
+        db.add(trabajo)
+        db.commit()
+        db.refresh(trabajo)
+    except Exception:
+        ejecutor.liberar()
+        raise
+    ejecutor.encolar(trabajo.id, reservado=True)
+    return trabajo
+
+def pedir_cancelacion(db: Session, trabajo_id: int) -> None:
+    """Un pendiente se cancela ya; uno en curso se marca y para en su siguiente paso. Con commit"""
+    db.query(Trabajo).filter(Trabajo.id == trabajo_id, Trabajo.estado == "pendiente").update(
+        {"estado": "cancelado", "cancelar": True, "mensaje": "Cancelado",
+         "terminado_at": func.now(), "actualizado_at": func.now()},
+        synchronize_session=False
+    )
+    db.query(Trabajo).filter(Trabajo.id == trabajo_id, Trabajo.estado == "en_curso").update(
+        {"cancelar": True}, synchronize_session=False
+    )
+    db.commit()
+
+def recuperar_trabajos() -> dict:
+    """Al arrancar: en_curso sin latido -> error; pendientes -> a la cola de este worker hasta llenarla"""
+    db = database.SessionLocal()
+    try:
+        limite = db.query(func.now()).scalar() - timedelta(seconds=CADUCIDAD_S)
+        caidos = db.query(Trabajo).filter(Trabajo.estado == "en_curso", Trabajo.actualizado_at < limite).update(
+            {"estado": "error", "error": "Interrumpido: el worker que lo ejecutaba dejó de responder",
+             "terminado_at": func.now(), "actualizado_at": func.now()},
+            synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+    encolados = ejecutor.recoger()
+    if caidos or encolados:
+        logger.info("Trabajos recuperados: %s encolados%s, %s marcados con error", encolados,
+                    " (quedan pendientes para el latido)" if ejecutor._rezagados else "", caidos)
+    return {"encolados": encolados, "caidos": caidos}
+
+def podar_trabajos(db: Session, dias: int = RETENCION_DIAS) -> int:
+    """
+    Borra los trabajos terminados hace más de `dias` días y, tras el commit, sus
+    ficheros; también los de DIRECTORIO de esa edad que ya no son de ninguna fila
+    (worker caído a mitad de escribir)
+    """
+    limite = db.query(func.now()).scalar() - timedelta(days=dias)
+    antiguos = db.query(Trabajo.id, Trabajo.ruta_fichero).filter(
+        Trabajo.estado.notin_(ESTADOS_ACTIVOS),
+        Trabajo.terminado_at < limite
+    ).all()
+    db.query(Trabajo).filter(Trabajo.id.in_([i for i, _ in antiguos])).delete(synchronize_session=False)
+    db.commit()
+    for _, nombre in antiguos:
+        _borrar_fichero(nombre)
+
+    if DIRECTORIO.is_dir():
+        en_uso = {nombre for (nombre,) in db.query(Trabajo.ruta_fichero).filter(Trabajo.ruta_fichero.isnot(None))}
+        caducidad = time.time() - dias * 86400
+        for ruta in DIRECTORIO.iterdir():
+            if ruta.name not in en_uso and ruta.is_file() and ruta.stat().st_mtime < caducidad:
+                ruta.unlink(missing_ok=True)
+    return len(antiguos)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Borra los trabajos terminados antiguos de la tabla trabajos y sus ficheros")
+    parser.add_argument("--dias", type=int, default=RETENCION_DIAS,
+                        help=f"días que se conservan (por defecto {RETENCION_DIAS})")
+    args = parser.parse_args(argv)
+
+    db = database.SessionLocal()
+    try:
+        borrados = podar_trabajos(db, args.dias)
+        print(f"Trabajos borrados: {borrados}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# backend/app/services/turnos.py
+from datetime import date
+from typing import Optional
+from sqlalchemy import func, literal_column
+from sqlalchemy.orm import Session
+from app.database import insert_dialecto
+from app.models.turno import Turno as TurnoModel, TurnoVersionMes, TurnosYear
+from app.services.resumen import recalcular_resumen
+from app.services.cambios import registrar_cambios
+from app.services.difusion import anotar_cambios
+from app.services.historial import leer_anteriores, registrar_historial
+
+COLUMNAS_RESULTADO = (
+    TurnoModel.id,
+    TurnoModel.usuario_id,
+    TurnoModel.fecha,
+    TurnoModel.turno,
+    TurnoModel.es_reten,
+    TurnoModel.generado_automático,
+    TurnoModel.modificado_manual,
+    TurnoModel.estado,
+)
+
+def registrar_escritura(db: Session, filas, anteriores: Optional[dict] = None) -> None:
+    """
+    Mantiene al día lo que depende de turnos_asignados tras escribir filas
+    (dicts con usuario_id y fecha). Se ejecuta en la misma transacción, sin commit.
+    `anteriores`: estado de las celdas antes de escribir (leer_anteriores) para
+    turnos_historial; una celda que no está ahí no existía.
+    """
+    filas = list(filas)
+    recalcular_resumen(db, {(f["usuario_id"], f["fecha"].year, f["fecha"].month) for f in filas})
+    incrementar_version_meses(db, {(f["fecha"].year, f["fecha"].month) for f in filas})
+    registrar_years(db, {f["fecha"].year for f in filas})
+    # Lo último: bloquea el contador de turnos_cambios hasta el commit (ver services/cambios.py)
+    cambios = registrar_cambios(db, filas)
+    registrar_historial(db, cambios, anteriores or {})
+    anotar_cambios(db, cambios)  # /turnos/stream, tras el commit
+    depurar_years(db, {c["fecha"].year for c in cambios if c["eliminado"]})
+
+def registrar_years(db: Session, years: set[int]) -> None:
+    """Añade al catálogo turnos_years los años que aún no estén"""
+    if not years:
+        return
+    stmt = insert_dialecto(db)(TurnosYear).values([{"year": y} for y in sorted(years)])
+    db.execute(stmt.on_conflict_do_nothing(index_elements=[TurnosYear.year]))
+
+def depurar_years(db: Session, years: set[int]) -> None:
+    """Quita de turnos_years los años que se han quedado sin turnos (tras borrar o mover celdas)"""
+    for year in years:
+        queda = db.query(TurnoModel.id).filter(
+            TurnoModel.fecha >= date(year, 1, 1),
+            TurnoModel.fecha < date(year + 1, 1, 1)
+        ).first()
+        if queda is None:
+            db.query(TurnosYear).filter(TurnosYear.year == year).delete(synchronize_session=False)
+
+def incrementar_version_meses(db: Session, meses: set[tuple[int, int]]) -> None:
+    """Sube el contador de escrituras de cada (year, month); invalida los ETag de /turnos/mes"""
+    if not meses:
+        return
+    stmt = insert_dialecto(db)(TurnoVersionMes).values(
+        [{"year": y, "month": m, "version": 1} for y, m in sorted(meses)]
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[TurnoVersionMes.year, TurnoVersionMes.month],
+        set_={"version": TurnoVersionMes.version + 1}
+    ))
+
+def upsert_turnos(db: Session, filas: list[dict], actualizar: list[str], donde=None) -> list:
+    """
+    Inserta o actualiza turnos por (usuario_id, fecha) con INSERT ... ON CONFLICT
+    sobre uq_usuario_fecha, sin hacer commit.
+
+    - filas: valores de cada turno, todas con las mismas claves; si una celda se repite gana la última.
+    - actualizar: columnas que se sobrescriben cuando la celda ya existe.
+    - donde: condición opcional del DO UPDATE; las filas que no la cumplen quedan intactas
+      y no aparecen en el resultado.
+
+    Es una única sentencia ejecutada con todas las filas como parámetros: SQLAlchemy
+    la compila una vez y la envía en páginas de varias filas por VALUES
+    ("insertmanyvalues"), en vez de compilar un INSERT distinto por lote.
+
+    Antes se lee en una consulta el estado de las celdas que ya existen, para el
+    histórico (y, en SQLite, para saber cuáles se crean).
+
+    Devuelve un dict por fila escrita (COLUMNAS_RESULTADO) con un campo extra `creado`.
+    """
+    unicas = {(f["usuario_id"], f["fecha"]): f for f in filas}
+    if not unicas:
+        return []
+    anteriores = leer_anteriores(db, unicas)
+
+    stmt = insert_dialecto(db)(TurnoModel)
+    set_ = {col: stmt.excluded[col] for col in actualizar}
+    set_["updated_at"] = func.now()
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TurnoModel.usuario_id, TurnoModel.fecha],
+        set_=set_,
+        where=donde
+    )
+    filas = list(unicas.values())
+    conexion = db.connection()
+    if db.get_bind().dialect.name == "postgresql":
+        # xmax = 0 solo en las filas recién insertadas
+        escritas = conexion.execute(
+            stmt.returning(*COLUMNAS_RESULTADO, literal_column("(xmax = 0)").label("creado")), filas
+        ).all()
+        resultado = [fila._asdict() for fila in escritas]
+    else:
+        resultado = [
+            {**fila._asdict(), "creado": (fila.usuario_id, fila.fecha) not in anteriores}
+            for fila in conexion.execute(stmt.returning(*COLUMNAS_RESULTADO), filas).all()
+        ]
+    registrar_escritura(db, resultado, anteriores)
+    return resultado
@@ -0,0 +1,214 @@
+# backend/app/services/validacion.py
+"""
+Validación del cuadrante: cobertura mínima por rol y franja y reglas de descanso.
+
+El rango se carga como una matriz usuario × día de índices de código (NumPy) y
+cada regla es una operación sobre la matriz entera, sin bucles por celda:
+
+- cobertura: personas de cada rol por franja y día frente al mínimo pedido
+- noche_mañana: un turno de noche seguido de uno de mañana al día siguiente
+- dias_consecutivos: rachas de días trabajados por encima del máximo
+- descanso: horas entre el fin de un turno y el inicio del siguiente trabajado,
+  con hora_inicio y horas del catálogo (los códigos sin hora_inicio no cuentan)
+
+Se leen también unos días antes del rango, para que las rachas y descansos que
+empiezan antes de `desde` se midan bien; las infracciones solo se dan dentro del rango.
+"""
+from datetime import date, timedelta
+from typing import Optional
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.models.turno import Turno as TurnoModel
+from app.models.usuario import Usuario
+from app.models.rol import Rol
+from app.schemas.turno import CoberturaMinima
+from app.services.codigos import catalogo
+from app.services.festivos import get_festivos_rango
+
+FRANJAS = ("mañana", "tarde", "noche")
+MAÑANA, NOCHE = FRANJAS.index("mañana"), FRANJAS.index("noche")
+
+# (rol, franja, mínimo, días) cuando la petición no trae cobertura. En fin de semana y
+# festivo los roles 24/7 hacen turnos de 12 h (FM/FN), así que la tarde solo se exige en laborables.
+COBERTURA_POR_DEFECTO = (
+    ("jefe", "mañana", 1, "todos"),
+    ("jefe", "tarde", 1, "laborables"),
+    ("jefe", "noche", 1, "todos"),
+    ("operador", "mañana", 1, "todos"),
+    ("operador", "tarde", 1, "laborables"),
+    ("operador", "noche", 1, "todos"),
+)
+
+def cobertura_por_defecto(db: Session) -> list[CoberturaMinima]:
+    roles = {r.nombre: r.id for r in db.query(Rol.id, Rol.nombre)}
+    return [
+        CoberturaMinima(rol_id=roles[rol], franja=franja, minimo=minimo, dias=dias)
+        for rol, franja, minimo, dias in COBERTURA_POR_DEFECTO if rol in roles
+    ]
+
+def _atributos_codigos(catalogo_codigos) -> tuple[dict, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Índice de cada código (0 = sin turno o código desconocido) y sus atributos por índice"""
+    codigos = list(catalogo_codigos.codigos.values())
+    indice = {c.codigo: i + 1 for i, c in enumerate(codigos)}
+    trabaja = np.zeros(len(codigos) + 1, dtype=bool)
+    franja = np.full(len(codigos) + 1, -1, dtype=np.int8)
+    inicio = np.full(len(codigos) + 1, -1, dtype=np.int32)
+    horas = np.zeros(len(codigos) + 1, dtype=np.int32)
+    for i, c in enumerate(codigos, start=1):
+        trabaja[i] = c.contable
+        if c.contable and c.franja in FRANJAS:
+            franja[i] = FRANJAS.index(c.franja)
+        if c.contable and c.hora_inicio is not None:
+            inicio[i] = c.hora_inicio
+        horas[i] = c.horas
+    return indice, trabaja, franja, inicio, horas
+
+def _select_matriz(inicio: date, fin: date, rol_ids: Optional[list[int]]):
+    """Las celdas de [inicio, fin] con el rol de su usuario, en una sola consulta"""
+    consulta = select(TurnoModel.usuario_id, Usuario.rol_id, TurnoModel.fecha, TurnoModel.turno).join(
+        Usuario, Usuario.id == TurnoModel.usuario_id
+    ).where(
+        TurnoModel.fecha >= inicio,
+        TurnoModel.fecha <= fin
+    )
+    if rol_ids is not None:
+        consulta = consulta.where(Usuario.rol_id.in_(rol_ids))
+    return consulta
+
+def _cargar_matriz(filas: list, inicio: date, fin: date,
+                   indice: dict) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(usuario_ids, rol por usuario, matriz usuario × día de [inicio, fin]) a partir de las filas de _select_matriz"""
+    n_dias = (fin - inicio).days + 1
+    if not filas:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros((0, n_dias), dtype=np.int16)
+
+    usuario_col, rol_col, fecha_col, turno_col = zip(*filas)
+    usuario_ids, fila = np.unique(np.array(usuario_col, dtype=np.int64), return_inverse=True)
+    roles = np.zeros(len(usuario_ids), dtype=np.int64)
+    roles[fila] = np.array([r if r is not None else -1 for r in rol_col], dtype=np.int64)
+    base = inicio.toordinal()
+    dia = np.fromiter((f.toordinal() - base for f in fecha_col), dtype=np.int32, count=len(filas))
+    codigo = np.fromiter((indice.get(t, 0) for t in turno_col), dtype=np.int16, count=len(filas))
+    matriz = np.zeros((len(usuario_ids), n_dias), dtype=np.int16)
+    matriz[fila, dia] = codigo
+    return usuario_ids, roles, matriz
+
+def validar_turnos(db: Session, desde: date, hasta: date, rol_ids: Optional[list[int]] = None,
+                   cobertura: Optional[list[CoberturaMinima]] = None,
+                   max_dias_consecutivos: int = 6, descanso_minimo_horas: int = 12) -> dict:
+    """Evalúa todas las reglas sobre [desde, hasta] (incluido); ver el docstring del módulo"""
+    if cobertura is None:
+        cobertura = cobertura_por_defecto(db)
+    inicio = desde - timedelta(days=max_dias_consecutivos)
+    codigos = catalogo(db)
+    filas = db.execute(_select_matriz(inicio, hasta, rol_ids)).all()
+    festivos = get_festivos_rango(db, desde, hasta + timedelta(days=1))
+    return _evaluar(filas, codigos, festivos, desde, hasta, rol_ids, cobertura,
+                    max_dias_consecutivos, descanso_minimo_horas)
+
+async def validar_turnos_async(db: AsyncSession, desde: date, hasta: date, rol_ids: Optional[list[int]] = None,
+                               cobertura: Optional[list[CoberturaMinima]] = None,
+                               max_dias_consecutivos: int = 6, descanso_minimo_horas: int = 12) -> dict:
+    """validar_turnos sobre AsyncSession: las consultas se esperan y las reglas se evalúan en el threadpool"""
+    if cobertura is None:
+        cobertura = await db.run_sync(cobertura_por_defecto)
+    inicio = desde - timedelta(days=max_dias_consecutivos)
+    codigos = await db.run_sync(catalogo)
+    filas = (await db.execute(_select_matriz(inicio, hasta, rol_ids))).all()
+    festivos = await db.run_sync(get_festivos_rango, desde, hasta + timedelta(days=1))
+    return await run_in_threadpool(_evaluar, filas, codigos, festivos, desde, hasta, rol_ids, cobertura,
+                                   max_dias_consecutivos, descanso_minimo_horas)
+
+def _evaluar(filas: list, codigos, festivos: set[date], desde: date, hasta: date,
+             rol_ids: Optional[list[int]], cobertura: list[CoberturaMinima],
+             max_dias_consecutivos: int, descanso_minimo_horas: int) -> dict:
+    """Las reglas sobre las filas ya leídas; no toca la base"""
+    margen = max_dias_consecutivos
+    inicio = desde - timedelta(days=margen)
+    indice, es_trabajo, franja_codigo, inicio_codigo, horas_codigo = _atributos_codigos(codigos)
+    usuario_ids, roles, matriz = _cargar_matriz(filas, inicio, hasta, indice)
+    n_dias = matriz.shape[1]
+
+    trabaja = es_trabajo[matriz]
+    franja = franja_codigo[matriz]
+    dentro = np.arange(n_dias) >= margen  # columnas de [desde, hasta]
+    infracciones = []
+
+    def celdas(regla: str, mascara: np.ndarray, detalle):
+        filas, columnas = np.nonzero(mascara & dentro)
+        for f, d in zip(filas.tolist(), columnas.tolist()):
+            infracciones.append({
+                "regla": regla, "fecha": inicio + timedelta(days=d),
+                "usuario_id": int(usuario_ids[f]), "rol_id": int(roles[f]) if roles[f] >= 0 else None,
+                "franja": None, "detalle": detalle(f, d),
+            })
+
+    # Noche seguida de mañana
+    noche_mañana = np.zeros_like(trabaja)
+    noche_mañana[:, 1:] = (franja[:, :-1] == NOCHE) & (franja[:, 1:] == MAÑANA)
+    celdas("noche_mañana", noche_mañana, lambda f, d: "Mañana después de noche")
+
+    # Días seguidos: acumulado de días trabajados menos su valor en el último día libre
+    acumulado = np.cumsum(trabaja, axis=1, dtype=np.int32)
+    racha = acumulado - np.maximum.accumulate(np.where(trabaja, 0, acumulado), axis=1)
+    celdas("dias_consecutivos", racha > max_dias_consecutivos,
+           lambda f, d: f"{racha[f, d]} días seguidos (máximo {max_dias_consecutivos})")
+
+    # Descanso entre turnos, en horas desde el inicio de la matriz
+    columnas = np.arange(n_dias, dtype=np.int32)
+    con_hora = trabaja & (inicio_codigo[matriz] >= 0)
+    entrada = columnas * 24 + inicio_codigo[matriz]
+    salida = entrada + horas_codigo[matriz]
+    ultimo = np.maximum.accumulate(np.where(con_hora, columnas, -1), axis=1)
+    anterior = np.full_like(ultimo, -1)
+    anterior[:, 1:] = ultimo[:, :-1]
+    salida_anterior = np.take_along_axis(salida, np.maximum(anterior, 0), axis=1)
+    descanso = entrada - salida_anterior
+    # La mañana tras noche ya sale en su propia regla
+    corto = con_hora & (anterior >= 0) & (descanso < descanso_minimo_horas) & ~noche_mañana
+    celdas("descanso", corto, lambda f, d: f"{descanso[f, d]} h de descanso (mínimo {descanso_minimo_horas})")
+
+    # Dotación por rol, franja y día
+    dias = [desde + timedelta(days=d) for d in range(n_dias - margen)]
+    franja_rango = franja[:, margen:]
+    dotacion = {nombre: (franja_rango == i).sum(axis=0) for i, nombre in enumerate(FRANJAS)}
+    dotacion_roles = {}
+    for rol_id in np.unique(roles[roles >= 0]).tolist():
+        franja_rol = franja_rango[roles == rol_id]
+        dotacion_roles[rol_id] = {nombre: (franja_rol == i).sum(axis=0) for i, nombre in enumerate(FRANJAS)}
+
+    # Cobertura mínima (días en que no se llega)
+    laborable = np.array([dia.weekday() < 5 and dia not in festivos for dia in dias], dtype=bool)
+    aplica_dias = {"todos": np.ones(len(dias), dtype=bool), "laborables": laborable, "no_laborables": ~laborable}
+    for regla in cobertura:
+        if rol_ids is not None and regla.rol_id not in rol_ids:
+            continue
+        personas = dotacion_roles.get(regla.rol_id, {}).get(regla.franja, np.zeros(len(dias), dtype=np.int64))
+        for d in np.nonzero((personas < regla.minimo) & aplica_dias[regla.dias])[0].tolist():
+            infracciones.append({
+                "regla": "cobertura", "fecha": dias[d], "usuario_id": None,
+                "rol_id": regla.rol_id, "franja": regla.franja,
+                "detalle": f"{personas[d]} de {regla.minimo} personas",
+            })
+
+    infracciones.sort(key=lambda i: (i["fecha"], i["usuario_id"] or 0, i["regla"]))
+    total_infracciones = {}
+    for i in infracciones:
+        total_infracciones[i["regla"]] = total_infracciones.get(i["regla"], 0) + 1
+
+    return {
+        "desde": desde,
+        "hasta": hasta,
+        "usuarios": len(usuario_ids),
+        "dias": dias,
+        "dotacion": {nombre: valores.tolist() for nombre, valores in dotacion.items()},
+        "dotacion_roles": [
+            {"rol_id": rol_id, "franjas": {nombre: valores.tolist() for nombre, valores in franjas.items()}}
+            for rol_id, franjas in dotacion_roles.items()
+        ],
+        "infracciones": infracciones,
+        "total_infracciones": total_infracciones,
+    }
@@ -0,0 +1,13 @@
+# backend/benchmarks/__init__.py
+"""
+Benchmarks de la API sobre un CPD sintético.
+
+Desde backend/:
+
+    python -m benchmarks run --db sqlite:///bench.db --regenerar --salida antes.json
+    python -m benchmarks run --db sqlite:///bench.db --salida despues.json
+    python -m benchmarks comparar antes.json despues.json
+
+--db acepta también una Postgres local (postgresql+psycopg2://...). Usar siempre
+una base dedicada: --regenerar borra y recrea todas las tablas.
+"""
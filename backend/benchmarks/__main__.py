@@ -0,0 +1,131 @@
+# backend/benchmarks/__main__.py
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+def _commit_actual() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def preparar_esquema(regenerar: bool):
+    """
+    Base nueva: create_all y `alembic stamp head`, para que el arranque la dé por lista
+    (las migraciones ya siembran roles y códigos, que pone generar_dataset).
+    Base ya migrada: `alembic upgrade head`.
+    """
+    from alembic import command
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from sqlalchemy import text
+    from app import arranque, database
+    from app.models import base
+
+    if regenerar:
+        base.Base.metadata.drop_all(bind=database.engine)
+        with database.engine.begin() as conexion:
+            conexion.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    with database.engine.connect() as conexion:
+        revisiones = MigrationContext.configure(conexion).get_current_heads()
+    if revisiones:
+        arranque.migrar()
+    else:
+        base.Base.metadata.create_all(bind=database.engine)
+        command.stamp(Config(str(arranque.RUTA_ALEMBIC_INI)), "head")
+
+def run(args):
+    if args.db:
+        # Antes de importar app: database.py crea el engine al importarse
+        os.environ["DATABASE_URL"] = args.db
+    from fastapi.testclient import TestClient
+    from app import arranque, database
+    from app.main import app
+    from app.models.usuario import Usuario
+    from benchmarks.escenarios import Contexto, ejecutar
+    from benchmarks.generador import generar_dataset
+
+    preparar_esquema(args.regenerar)
+
+    db = database.SessionLocal()
+    try:
+        dataset = None
+        if db.query(Usuario.id).first() is None:
+            print(f"Generando dataset ({args.usuarios} usuarios, {args.years} años)...", file=sys.stderr)
+            dataset = generar_dataset(db, args.usuarios, args.years, args.year_inicio, args.semilla)
+        usuario_ids = [uid for (uid,) in db.query(Usuario.id).filter(
+            Usuario.estado == "activo").order_by(Usuario.id).all()]
+        year = args.year_inicio or datetime.now().year - 1
+    finally:
+        db.close()
+
+    ctx = Contexto(year=year, month=args.mes, usuario_ids=usuario_ids)
+    with TestClient(app) as cliente:
+        if not arranque.estado.listo:
+            print(f"Aviso: la aplicación no arrancó del todo ({arranque.estado.error})", file=sys.stderr)
+        escenarios = ejecutar(cliente, ctx, args.repeticiones, args.filtro)
+
+    resultado = {
+        "meta": {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "commit": _commit_actual(),
+            "dialecto": database.engine.dialect.name,
+            "db_modo": database.DB_MODO,
+            "python": platform.python_version(),
+            "repeticiones": args.repeticiones,
+            "year": ctx.year,
+            "month": ctx.month,
+            "usuarios_activos": len(usuario_ids),
+            "dataset": dataset,
+        },
+        "escenarios": escenarios,
+    }
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    for nombre, r in escenarios.items():
+        print(f"{nombre:<28} p50 {r['p50_ms']:>9.2f} ms  p95 {r['p95_ms']:>9.2f} ms  "
+              f"SQL {r['consultas']:>4}  HTTP {','.join(map(str, r['estados']))}")
+
+def comparar(args):
+    from benchmarks.comparar import cargar, comparar as comparar_resultados, imprimir
+    filas = comparar_resultados(cargar(args.antes), cargar(args.despues), args.umbral)
+    imprimir(filas)
+    if args.fallar_si_peor and any(f["veredicto"] == "peor" for f in filas):
+        sys.exit(1)
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks de la API")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_run = sub.add_parser("run", help="Genera el dataset si hace falta y ejecuta los escenarios")
+    p_run.add_argument("--db", help="URL de la base (por defecto DATABASE_URL)")
+    p_run.add_argument("--regenerar", action="store_true", help="Borra y recrea las tablas antes de generar")
+    p_run.add_argument("--usuarios", type=int, default=60)
+    p_run.add_argument("--years", type=int, default=2)
+    p_run.add_argument("--year-inicio", type=int, default=None, help="Primer año del dataset (por defecto el anterior al actual)")
+    p_run.add_argument("--semilla", type=int, default=42)
+    p_run.add_argument("--mes", type=int, default=3, help="Mes usado por los escenarios mensuales")
+    p_run.add_argument("--repeticiones", type=int, default=20)
+    p_run.add_argument("--filtro", help="Solo escenarios cuyo nombre contenga este texto")
+    p_run.add_argument("--salida", help="Fichero JSON de resultados")
+    p_run.set_defaults(func=run)
+
+    p_cmp = sub.add_parser("comparar", help="Compara dos ficheros de resultados")
+    p_cmp.add_argument("antes")
+    p_cmp.add_argument("despues")
+    p_cmp.add_argument("--umbral", type=float, default=10.0, help="Cambio de p50 (%%) que se considera significativo")
+    p_cmp.add_argument("--fallar-si-peor", action="store_true", help="Sale con código 1 si algún escenario empeora")
+    p_cmp.set_defaults(func=comparar)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# backend/benchmarks/comparar.py
+"""Comparación de dos ficheros de resultados de `python -m benchmarks run`"""
+import json
+
+# Cambios de p50 por debajo de este porcentaje se consideran ruido
+UMBRAL_CAMBIO = 10.0
+
+def cargar(ruta: str) -> dict:
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+def comparar(antes: dict, despues: dict, umbral: float = UMBRAL_CAMBIO) -> list[dict]:
+    filas = []
+    for nombre in sorted(set(antes["escenarios"]) | set(despues["escenarios"])):
+        a = antes["escenarios"].get(nombre)
+        d = despues["escenarios"].get(nombre)
+        if a is None or d is None:
+            filas.append({"escenario": nombre, "veredicto": "nuevo" if a is None else "eliminado"})
+            continue
+        cambio = (d["p50_ms"] - a["p50_ms"]) / a["p50_ms"] * 100 if a["p50_ms"] else 0.0
+        if cambio > umbral:
+            veredicto = "peor"
+        elif cambio < -umbral:
+            veredicto = "mejor"
+        else:
+            veredicto = "igual"
+        filas.append({
+            "escenario": nombre,
+            "p50_antes": a["p50_ms"], "p50_despues": d["p50_ms"],
+            "p95_antes": a["p95_ms"], "p95_despues": d["p95_ms"],
+            "consultas_antes": a["consultas"], "consultas_despues": d["consultas"],
+            "cambio_pct": round(cambio, 1),
+            "veredicto": veredicto,
+        })
+    return filas
+
+def imprimir(filas: list[dict]):
+    print(f"{'escenario':<28} {'p50 antes':>10} {'p50 después':>12} {'p95 antes':>10} {'p95 después':>12} "
+          f"{'SQL':>9} {'cambio':>8}  veredicto")
+    for f in filas:
+        if "cambio_pct" not in f:
+            print(f"{f['escenario']:<28} {'':>10} {'':>12} {'':>10} {'':>12} {'':>9} {'':>8}  {f['veredicto']}")
+            continue
+        sql = f"{f['consultas_antes']}→{f['consultas_despues']}"
+        print(f"{f['escenario']:<28} {f['p50_antes']:>10.2f} {f['p50_despues']:>12.2f} "
+              f"{f['p95_antes']:>10.2f} {f['p95_despues']:>12.2f} {sql:>9} {f['cambio_pct']:>7.1f}%  {f['veredicto']}")
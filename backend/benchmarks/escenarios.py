@@ -0,0 +1,127 @@
+# backend/benchmarks/escenarios.py
+"""
+Escenarios cronometrados: una petición HTTP por repetición contra la app en proceso
+(TestClient), midiendo tiempo de respuesta y número de sentencias SQL.
+"""
+import statistics
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Callable, Optional
+from app import database
+from app.perfilado import contar_consultas
+
+TIPOS_REPORTE = ("trabajados", "turnos", "festivos", "vacaciones")
+# El reporte de festivos solo existe por mes
+TIPOS_REPORTE_ANUAL = ("trabajados", "turnos", "vacaciones")
+
+@dataclass
+class Contexto:
+    """Datos del dataset que necesitan los escenarios para construir sus peticiones"""
+    year: int
+    month: int
+    usuario_ids: list[int]
+
+@dataclass
+class Escenario:
+    nombre: str
+    metodo: str
+    ruta: Callable[[Contexto], str]
+    cuerpo: Optional[Callable[[Contexto], dict]] = None
+    cabeceras: Optional[Callable[[Contexto, object], dict]] = None  # recibe el cliente
+
+def _celdas_lote(ctx: Contexto) -> dict:
+    inicio = date(ctx.year, ctx.month, 1)
+    return {"celdas": [
+        {"usuario_id": uid, "fecha": (inicio + timedelta(days=d)).isoformat(), "turno": "M"}
+        for uid in ctx.usuario_ids[:20] for d in range(5)
+    ]}
+
+def _ausencias_lote(ctx: Contexto) -> dict:
+    inicio = date(ctx.year, ctx.month, 10)
+    return {"ausencias": [
+        {"usuario_id": uid, "fecha_inicio": inicio.isoformat(),
+         "fecha_fin": (inicio + timedelta(days=6)).isoformat(), "tipo": "v"}
+        for uid in ctx.usuario_ids[:10]
+    ]}
+
+def _etag_mes(ctx: Contexto, cliente) -> dict:
+    etag = cliente.get(f"/turnos/mes/{ctx.year}/{ctx.month}").headers.get("etag")
+    return {"If-None-Match": etag} if etag else {}
+
+ESCENARIOS: list[Escenario] = [
+    Escenario("turnos_mes", "GET", lambda c: f"/turnos/mes/{c.year}/{c.month}"),
+    Escenario("turnos_mes_304", "GET", lambda c: f"/turnos/mes/{c.year}/{c.month}", cabeceras=_etag_mes),
+    Escenario("usuarios_lista", "GET", lambda c: "/usuarios/"),
+    Escenario("festivos_fechas", "GET", lambda c: f"/festivos/fechas?year={c.year}"),
+    Escenario("reportes_years", "GET", lambda c: "/reportes/years"),
+    *[
+        Escenario(f"reporte_{tipo}_mensual", "POST", lambda c, t=tipo: f"/reportes/{t}",
+                  lambda c: {"year": c.year, "month": c.month})
+        for tipo in TIPOS_REPORTE
+    ],
+    *[
+        Escenario(f"reporte_{tipo}_anual", "POST", lambda c, t=tipo: f"/reportes/{t}",
+                  lambda c: {"year": c.year})
+        for tipo in TIPOS_REPORTE_ANUAL
+    ],
+    Escenario("asignar_lote", "POST", lambda c: "/turnos/asignar/lote", _celdas_lote),
+    Escenario("ausencia_rango_lote", "POST", lambda c: "/turnos/ausencia/rango/lote", _ausencias_lote),
+    Escenario("cumpleanos_mes", "POST", lambda c: f"/turnos/cumpleanos/mes/{c.year}/{c.month}"),
+    Escenario("cumpleanos_year", "POST", lambda c: f"/turnos/cumpleanos/{c.year}"),
+]
+
+def percentil(valores: list[float], p: float) -> float:
+    """Percentil por interpolación lineal (p entre 0 y 100)"""
+    ordenados = sorted(valores)
+    if len(ordenados) == 1:
+        return ordenados[0]
+    posicion = (len(ordenados) - 1) * p / 100
+    base = int(posicion)
+    siguiente = min(base + 1, len(ordenados) - 1)
+    return ordenados[base] + (ordenados[siguiente] - ordenados[base]) * (posicion - base)
+
+def ejecutar_escenario(cliente, escenario: Escenario, ctx: Contexto,
+                       repeticiones: int, calentamiento: int = 1) -> dict:
+    engines = [database.engine] + ([database.async_engine] if database.async_engine is not None else [])
+    ruta = escenario.ruta(ctx)
+    cuerpo = escenario.cuerpo(ctx) if escenario.cuerpo else None
+    cabeceras = escenario.cabeceras(ctx, cliente) if escenario.cabeceras else None
+
+    def peticion():
+        return cliente.request(escenario.metodo, ruta, json=cuerpo, headers=cabeceras)
+
+    for _ in range(calentamiento):
+        peticion()
+
+    tiempos, consultas, estados = [], [], set()
+    for _ in range(repeticiones):
+        with contar_consultas(*engines) as perfil:
+            inicio = time.perf_counter()
+            respuesta = peticion()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        consultas.append(perfil.consultas)
+        estados.add(respuesta.status_code)
+
+    return {
+        "metodo": escenario.metodo,
+        "ruta": ruta,
+        "repeticiones": repeticiones,
+        "estados": sorted(estados),
+        "p50_ms": round(percentil(tiempos, 50), 3),
+        "p95_ms": round(percentil(tiempos, 95), 3),
+        "media_ms": round(statistics.fmean(tiempos), 3),
+        "min_ms": round(min(tiempos), 3),
+        "max_ms": round(max(tiempos), 3),
+        "consultas": max(consultas),
+        "bytes": len(respuesta.content),
+    }
+
+def ejecutar(cliente, ctx: Contexto, repeticiones: int = 20, filtro: Optional[str] = None) -> dict:
+    """Ejecuta los escenarios (los que contienen `filtro` en el nombre, si se indica)"""
+    resultados = {}
+    for escenario in ESCENARIOS:
+        if filtro and filtro not in escenario.nombre:
+            continue
+        resultados[escenario.nombre] = ejecutar_escenario(cliente, escenario, ctx, repeticiones)
+    return resultados
@@ -0,0 +1,174 @@
+# backend/benchmarks/generador.py
+"""
+Generador de un CPD sintético: roles de init_db.sql, códigos de turno, usuarios, festivos y turnos.
+
+Con la misma semilla genera siempre los mismos datos, para que los resultados de
+dos ejecuciones del benchmark sean comparables.
+"""
+import random
+from dataclasses import asdict
+from datetime import date, timedelta
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.models.rol import Rol
+from app.models.usuario import Usuario
+from app.models.turno import Turno
+from app.models.festivo import FestivoMadrid
+from app.models.codigo import TurnoCodigo
+from app.services.festivos import regenerar_festivos, get_festivos_rango
+from app.services.codigos import CODIGOS_POR_DEFECTO, cargar_catalogo
+from app.services.resumen import reconstruir_resumen
+
+ROLES = (
+    ("jefe", "Jefe de turno 24/7"),
+    ("operador", "Operador de turno 24/7"),
+    ("emc", "EMC - Horario de oficina"),
+)
+
+# Reparto de usuarios entre roles (jefe, operador, emc)
+REPARTO_ROLES = (0.15, 0.65, 0.20)
+
+FESTIVOS = (
+    ("fijo", "01/01", None, "Año Nuevo", "Nacional"),
+    ("fijo", "06/01", None, "Epifanía del Señor", "Nacional"),
+    ("pascua", None, -3, "Jueves Santo", "Nacional"),
+    ("pascua", None, -2, "Viernes Santo", "Nacional"),
+    ("fijo", "01/05", None, "Fiesta del Trabajo", "Nacional"),
+    ("fijo", "02/05", None, "Fiesta de la Comunidad de Madrid", "Madrid"),
+    ("fijo", "15/05", None, "San Isidro", "Madrid"),
+    ("fijo", "15/08", None, "Asunción de la Virgen", "Nacional"),
+    ("fijo", "12/10", None, "Fiesta Nacional de España", "Nacional"),
+    ("fijo", "01/11", None, "Todos los Santos", "Nacional"),
+    ("fijo", "09/11", None, "Almudena", "Madrid"),
+    ("fijo", "06/12", None, "Día de la Constitución", "Nacional"),
+    ("fijo", "08/12", None, "Inmaculada Concepción", "Nacional"),
+    ("fijo", "25/12", None, "Navidad", "Nacional"),
+)
+
+# Ciclo de los roles 24/7; cada usuario entra con un desfase distinto
+CICLO_24_7 = ("M", "M", "T", "T", "N", "N", "d", "d", "d", "d")
+# En fin de semana y festivo los turnos de mañana/noche pasan a ser de 12 h
+TURNO_FESTIVO = {"M": "FM1", "T": "FM2", "N": "FN1"}
+
+DIAS_VACACIONES = 22
+PROB_BAJA = 0.004       # probabilidad diaria de empezar una baja
+PROB_RETEN = 0.03       # probabilidad de que un día libre sea de retén
+TAMANO_LOTE = 5000
+
+def _usuarios(rnd: random.Random, n: int, roles: dict[str, int], year_inicio: int) -> list[dict]:
+    nombres_rol = [nombre for nombre, _ in ROLES]
+    usuarios = []
+    for i in range(n):
+        rol = rnd.choices(nombres_rol, weights=REPARTO_ROLES)[0]
+        ingreso = date(year_inicio - rnd.randint(0, 8), rnd.randint(1, 12), rnd.randint(1, 28))
+        usuarios.append({
+            "nombres": f"Nombre{i:04d}",
+            "apellidos": f"Apellido{rnd.randint(1, 500):03d} Apellido{rnd.randint(1, 500):03d}",
+            "usuario": f"bench{i:04d}",
+            "cumple_anios": date(rnd.randint(1965, 2000), rnd.randint(1, 12), rnd.randint(1, 28)),
+            "telefono": f"6{rnd.randint(0, 99999999):08d}",
+            "fecha_ingreso": ingreso,
+            "estado": "activo" if rnd.random() > 0.05 else "inactivo",
+            "rol_id": roles[rol],
+        })
+    return usuarios
+
+def _ausencias_year(rnd: random.Random, year: int) -> dict[date, str]:
+    """Vacaciones (2-3 bloques, sobre todo en verano) y alguna baja para un usuario y año"""
+    ausencias: dict[date, str] = {}
+    restantes = DIAS_VACACIONES
+    while restantes > 0:
+        largo = min(restantes, rnd.choice((3, 5, 7, 10, 14)))
+        mes = rnd.choices(range(1, 13), weights=(1, 1, 1, 2, 1, 3, 6, 6, 2, 1, 1, 3))[0]
+        inicio = date(year, mes, rnd.randint(1, 28))
+        for k in range(largo):
+            ausencias[inicio + timedelta(days=k)] = "v"
+        restantes -= largo
+    dia = date(year, 1, 1)
+    while dia.year == year:
+        if rnd.random() < PROB_BAJA:
+            for k in range(rnd.randint(1, 7)):
+                ausencias.setdefault(dia + timedelta(days=k), "b")
+        dia += timedelta(days=1)
+    return ausencias
+
+def _turnos_usuario(rnd: random.Random, usuario_id: int, usuario: dict, rol: str,
+                    inicio: date, fin: date, festivos: set[date]) -> list[dict]:
+    desfase = rnd.randrange(len(CICLO_24_7))
+    ausencias: dict[date, str] = {}
+    for year in range(inicio.year, fin.year + 1):
+        ausencias.update(_ausencias_year(rnd, year))
+        cumple = usuario["cumple_anios"]
+        ausencias[date(year, cumple.month, cumple.day)] = "c"
+
+    filas = []
+    dia = max(inicio, usuario["fecha_ingreso"])
+    while dia < fin:
+        no_laborable = dia.weekday() >= 5 or dia in festivos
+        if dia in ausencias:
+            turno = ausencias[dia]
+        elif rol == "emc":
+            turno = "d" if no_laborable else "M"
+        else:
+            turno = CICLO_24_7[((dia - inicio).days + desfase) % len(CICLO_24_7)]
+            if no_laborable:
+                turno = TURNO_FESTIVO.get(turno, turno)
+        filas.append({
+            "usuario_id": usuario_id,
+            "fecha": dia,
+            "turno": turno,
+            "es_reten": turno == "d" and rol != "emc" and rnd.random() < PROB_RETEN,
+            "generado_automático": True,
+            "modificado_manual": False,
+            "estado": "activo",
+        })
+        dia += timedelta(days=1)
+    return filas
+
+def generar_dataset(db: Session, usuarios: int = 60, years: int = 2,
+                    year_inicio: int | None = None, semilla: int = 42) -> dict:
+    """
+    Llena una base vacía: roles, festivos, `usuarios` usuarios y `years` años de turnos
+    desde `year_inicio` (por defecto, el año anterior al actual). Hace commit.
+    """
+    rnd = random.Random(semilla)
+    year_inicio = year_inicio or date.today().year - 1
+    inicio, fin = date(year_inicio, 1, 1), date(year_inicio + years, 1, 1)
+
+    for nombre, descripcion in ROLES:
+        db.add(Rol(nombre=nombre, descripcion=descripcion))
+    db.add_all(TurnoCodigo(**asdict(c)) for c in CODIGOS_POR_DEFECTO)
+    for regla, dia_mes, desplazamiento, descripcion, tipo in FESTIVOS:
+        db.add(FestivoMadrid(regla=regla, dia_mes=dia_mes, desplazamiento_pascua=desplazamiento,
+                             descripcion=descripcion, tipo=tipo))
+    db.flush()
+    cargar_catalogo(db)
+    regenerar_festivos(db)
+    festivos = get_festivos_rango(db, inicio, fin)
+
+    roles = {r.nombre: r.id for r in db.query(Rol).all()}
+    nombres_rol = {v: k for k, v in roles.items()}
+    datos_usuarios = _usuarios(rnd, usuarios, roles, year_inicio)
+    ids = db.execute(insert(Usuario).returning(Usuario.id, sort_by_parameter_order=True), datos_usuarios).scalars().all()
+
+    total_turnos = 0
+    lote: list[dict] = []
+    for usuario_id, usuario in zip(ids, datos_usuarios):
+        lote.extend(_turnos_usuario(rnd, usuario_id, usuario, nombres_rol[usuario["rol_id"]],
+                                    inicio, fin, festivos))
+        if len(lote) >= TAMANO_LOTE:
+            db.execute(insert(Turno), lote)
+            total_turnos += len(lote)
+            lote = []
+    if lote:
+        db.execute(insert(Turno), lote)
+        total_turnos += len(lote)
+    db.commit()
+
+    # Los turnos se insertan sin pasar por la API: rehace resumen_mensual y turnos_years
+    reconstruir_resumen(db)
+
+    return {
+        "usuarios": usuarios, "years": years, "year_inicio": year_inicio,
+        "semilla": semilla, "turnos": total_turnos, "festivos": len(festivos),
+    }
@@ -0,0 +1,17 @@
+# backend/conftest.py
+"""
+Tests contra una SQLite temporal migrada con alembic (la URL de .env no se toca).
+
+Se ejecutan desde backend/ con `python -m pytest`.
+"""
+import os
+import tempfile
+
+# Antes de importar app: database crea el engine al importarse
+_DIRECTORIO = tempfile.mkdtemp(prefix="turnos_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DIRECTORIO}/turnos.db"
+os.environ["DB_MODO"] = "sync"
+os.environ["DATABASE_READ_URLS"] = ""
+os.environ["SQL_PERFIL_LOG"] = os.path.join(_DIRECTORIO, "sql_lentas.log")
+
+pytest_plugins = ["app.pytest_perfilado"]
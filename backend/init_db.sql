@@ -6,4 +6,12 @@ VALUES
     ('jefe', 'Jefe de turno 24/7'),
     ('operador', 'Operador de turno 24/7'),
     ('emc', 'EMC - Horario de oficina')
-ON CONFLICT (nombre) DO NOTHING;
\ No newline at end of file
+ON CONFLICT (nombre) DO NOTHING;
+-- Festivos como reglas de recurrencia (fijo / pascua / unico).
+-- Solo para bases creadas con create_all antes de Alembic: aplicar y después
+-- `alembic stamp 0001_baseline` + `alembic upgrade head` (ver migrations/README).
+-- Las bases nuevas se crean con `alembic upgrade head`, que ya incluye los roles.
+ALTER TABLE festivos_madrid_espana ADD COLUMN IF NOT EXISTS regla VARCHAR(10) NOT NULL DEFAULT 'fijo';
+ALTER TABLE festivos_madrid_espana ADD COLUMN IF NOT EXISTS desplazamiento_pascua INTEGER;
+ALTER TABLE festivos_madrid_espana ADD COLUMN IF NOT EXISTS fecha DATE;
+ALTER TABLE festivos_madrid_espana ALTER COLUMN dia_mes DROP NOT NULL;
@@ -0,0 +1,46 @@
+# backend/migrations/env.py
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import create_engine, pool
+from app.database import SQLALCHEMY_DATABASE_URL
+from app.models import base, rol, usuario, turno, festivo, resumen, cumpleanos, codigo, historial, trabajo  # noqa: F401 (registran tablas)
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = base.Base.metadata
+
+def incluir_nombre(nombre, tipo, padres) -> bool:
+    """Las particiones anuales de turnos_asignados no están en los modelos: autogenerate las ignora"""
+    if tipo == "table" and nombre and nombre.startswith("turnos_asignados_"):
+        return False
+    return True
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=SQLALCHEMY_DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        include_name=incluir_nombre,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    engine = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=incluir_nombre,
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
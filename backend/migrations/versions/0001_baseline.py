@@ -0,0 +1,100 @@
+"""Esquema base: las tablas que creaba create_all antes de Alembic
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-17
+
+Bases ya existentes (creadas con create_all + init_db.sql): no aplicar esta
+migración, marcarla con `alembic stamp 0001_baseline` y seguir con upgrade head
+(ver migrations/README: después hay que rellenar resumen_mensual).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0001_baseline'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('roles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('nombre', sa.String(length=50), nullable=False),
+        sa.Column('descripcion', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('nombre')
+    )
+    op.create_index('ix_roles_id', 'roles', ['id'])
+
+    op.create_table('usuarios',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('nombres', sa.String(length=100), nullable=False),
+        sa.Column('apellidos', sa.String(length=100), nullable=False),
+        sa.Column('usuario', sa.String(length=50), nullable=False),
+        sa.Column('cumple_anios', sa.Date(), nullable=True),
+        sa.Column('telefono', sa.String(length=20), nullable=True),
+        sa.Column('fecha_ingreso', sa.Date(), nullable=False),
+        sa.Column('fecha_salida', sa.Date(), nullable=True),
+        sa.Column('estado', sa.String(length=20), nullable=True),
+        sa.Column('rol_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['rol_id'], ['roles.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('usuario')
+    )
+    op.create_index('ix_usuarios_id', 'usuarios', ['id'])
+
+    op.create_table('turnos_asignados',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column('turno', sa.String(length=10), nullable=False),
+        sa.Column('generado_automático', sa.Boolean(), nullable=True),
+        sa.Column('modificado_manual', sa.Boolean(), nullable=True),
+        sa.Column('es_reten', sa.Boolean(), nullable=True),
+        sa.Column('estado', sa.String(length=20), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('usuario_id', 'fecha', name='uq_usuario_fecha')
+    )
+    op.create_index('ix_turnos_asignados_id', 'turnos_asignados', ['id'])
+
+    op.create_table('festivos_madrid_espana',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('dia_mes', sa.String(length=5), nullable=False),
+        sa.Column('descripcion', sa.String(length=255), nullable=False),
+        sa.Column('tipo', sa.String(length=20), nullable=False),
+        sa.Column('estado', sa.String(length=20), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_festivos_madrid_espana_id', 'festivos_madrid_espana', ['id'])
+
+    # Roles base (mismos que init_db.sql); el código cuenta con los ids 1-3
+    roles = sa.table('roles', sa.column('id', sa.Integer), sa.column('nombre', sa.String), sa.column('descripcion', sa.String))
+    op.bulk_insert(roles, [
+        {'id': 1, 'nombre': 'jefe', 'descripcion': 'Jefe de turno 24/7'},
+        {'id': 2, 'nombre': 'operador', 'descripcion': 'Operador de turno 24/7'},
+        {'id': 3, 'nombre': 'emc', 'descripcion': 'EMC - Horario de oficina'},
+    ])
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("SELECT setval(pg_get_serial_sequence('roles', 'id'), 3)")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_festivos_madrid_espana_id', table_name='festivos_madrid_espana')
+    op.drop_table('festivos_madrid_espana')
+    op.drop_index('ix_turnos_asignados_id', table_name='turnos_asignados')
+    op.drop_table('turnos_asignados')
+    op.drop_index('ix_usuarios_id', table_name='usuarios')
+    op.drop_table('usuarios')
+    op.drop_index('ix_roles_id', table_name='roles')
+    op.drop_table('roles')
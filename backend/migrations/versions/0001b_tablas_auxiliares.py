@@ -0,0 +1,92 @@
+"""Tablas auxiliares (resumen, festivos por fecha, versiones de mes, cumpleaños) y reglas de festivos
+
+Revision ID: 0001b_tablas_auxiliares
+Revises: 0001_baseline
+Create Date: 2026-10-17
+
+Tablas añadidas después del esquema base, cuando aún se creaban con create_all.
+En una base marcada con `alembic stamp 0001_baseline` se crean vacías: resumen_mensual
+y festivos_fecha se rellenan para los turnos existentes con
+`python -m app.services.resumen` (ver migrations/README).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0001b_tablas_auxiliares'
+down_revision: Union[str, Sequence[str], None] = '0001_baseline'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('turnos_version_mes',
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('year', 'month')
+    )
+
+    op.create_table('resumen_mensual',
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Integer(), nullable=False),
+        sa.Column('codigos', sa.JSON(), nullable=False),
+        sa.Column('horas_trabajadas', sa.Integer(), nullable=False),
+        sa.Column('horas_trabajadas_raw', sa.Integer(), nullable=False),
+        sa.Column('dias_trabajados', sa.Integer(), nullable=False),
+        sa.Column('dias_festivos', sa.Integer(), nullable=False),
+        sa.Column('dias_vacaciones', sa.Integer(), nullable=False),
+        sa.Column('cumple_tomado', sa.Boolean(), nullable=False),
+        sa.Column('actualizado_en', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('usuario_id', 'year', 'month')
+    )
+
+    # Festivos como reglas: los existentes son de día fijo (regla 'fijo' por defecto)
+    with op.batch_alter_table('festivos_madrid_espana') as batch:
+        batch.add_column(sa.Column('regla', sa.String(length=10), nullable=False, server_default='fijo'))
+        batch.add_column(sa.Column('desplazamiento_pascua', sa.Integer(), nullable=True))
+        batch.add_column(sa.Column('fecha', sa.Date(), nullable=True))
+        batch.alter_column('dia_mes', existing_type=sa.String(length=5), nullable=True)
+
+    op.create_table('festivos_fecha',
+        sa.Column('festivo_id', sa.Integer(), nullable=False),
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['festivo_id'], ['festivos_madrid_espana.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('festivo_id', 'fecha')
+    )
+    op.create_index('ix_festivos_fecha_fecha', 'festivos_fecha', ['fecha'])
+    op.create_index('ix_festivos_fecha_year', 'festivos_fecha', ['year'])
+
+    op.create_table('festivos_years',
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('generado_en', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('year')
+    )
+
+    op.create_table('cumpleanos_procesados',
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Integer(), nullable=False),
+        sa.Column('firma', sa.String(length=100), nullable=False),
+        sa.Column('procesado_en', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('year', 'month')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('cumpleanos_procesados')
+    op.drop_table('festivos_years')
+    op.drop_index('ix_festivos_fecha_year', table_name='festivos_fecha')
+    op.drop_index('ix_festivos_fecha_fecha', table_name='festivos_fecha')
+    op.drop_table('festivos_fecha')
+    with op.batch_alter_table('festivos_madrid_espana') as batch:
+        batch.alter_column('dia_mes', existing_type=sa.String(length=5), nullable=False)
+        batch.drop_column('fecha')
+        batch.drop_column('desplazamiento_pascua')
+        batch.drop_column('regla')
+    op.drop_table('resumen_mensual')
+    op.drop_table('turnos_version_mes')
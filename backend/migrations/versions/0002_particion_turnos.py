@@ -0,0 +1,135 @@
+"""Índice por fecha, catálogo turnos_years y partición anual de turnos_asignados
+
+Revision ID: 0002_particion_turnos
+Revises: 0001b_tablas_auxiliares
+Create Date: 2026-10-17
+
+En PostgreSQL turnos_asignados pasa a ser una tabla particionada por rango de
+fecha (una partición por año + una DEFAULT). La PK pasa a ser (id, fecha) porque
+toda clave única de una tabla particionada debe incluir la columna de partición;
+uq_usuario_fecha ya la incluye. En el resto de motores solo se crea el índice.
+
+Las particiones de años siguientes se crean con:
+    python -m app.services.particiones
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0002_particion_turnos'
+down_revision: Union[str, Sequence[str], None] = '0001b_tablas_auxiliares'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNAS = ('id, usuario_id, fecha, turno, "generado_automático", modificado_manual, '
+            'es_reten, estado, created_at, updated_at')
+
+
+def _particionar_postgresql() -> None:
+    conn = op.get_bind()
+    op.execute("ALTER TABLE turnos_asignados RENAME TO turnos_asignados_previa")
+    op.execute("ALTER TABLE turnos_asignados_previa RENAME CONSTRAINT uq_usuario_fecha TO uq_usuario_fecha_previa")
+    op.execute("ALTER TABLE turnos_asignados_previa RENAME CONSTRAINT turnos_asignados_pkey TO turnos_asignados_previa_pkey")
+    op.execute("ALTER INDEX ix_turnos_asignados_id RENAME TO ix_turnos_asignados_previa_id")
+    # La secuencia del serial se conserva (el DROP de la tabla vieja se la llevaría)
+    secuencia = conn.execute(sa.text("SELECT pg_get_serial_sequence('turnos_asignados_previa', 'id')")).scalar()
+    op.execute(f"ALTER SEQUENCE {secuencia} OWNED BY NONE")
+
+    op.execute(f"""
+        CREATE TABLE turnos_asignados (
+            id INTEGER NOT NULL DEFAULT nextval('{secuencia}'::regclass),
+            usuario_id INTEGER NOT NULL REFERENCES usuarios (id),
+            fecha DATE NOT NULL,
+            turno VARCHAR(10) NOT NULL,
+            "generado_automático" BOOLEAN,
+            modificado_manual BOOLEAN,
+            es_reten BOOLEAN,
+            estado VARCHAR(20),
+            created_at TIMESTAMP DEFAULT now(),
+            updated_at TIMESTAMP DEFAULT now(),
+            CONSTRAINT turnos_asignados_pkey PRIMARY KEY (id, fecha),
+            CONSTRAINT uq_usuario_fecha UNIQUE (usuario_id, fecha)
+        ) PARTITION BY RANGE (fecha)
+    """)
+    op.execute("CREATE INDEX ix_turnos_asignados_id ON turnos_asignados (id)")
+    op.execute("CREATE INDEX ix_turnos_fecha ON turnos_asignados (fecha)")
+
+    minimo = conn.execute(sa.text("SELECT min(fecha) FROM turnos_asignados_previa")).scalar()
+    maximo = conn.execute(sa.text("SELECT max(fecha) FROM turnos_asignados_previa")).scalar()
+    siguiente = date.today().year + 1
+    desde = min(minimo.year, siguiente) if minimo else date.today().year
+    hasta = max(maximo.year, siguiente) if maximo else siguiente
+    for year in range(desde, hasta + 1):
+        op.execute(
+            f"CREATE TABLE turnos_asignados_y{year} PARTITION OF turnos_asignados "
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        )
+    op.execute("CREATE TABLE turnos_asignados_default PARTITION OF turnos_asignados DEFAULT")
+
+    op.execute(f"INSERT INTO turnos_asignados ({COLUMNAS}) SELECT {COLUMNAS} FROM turnos_asignados_previa")
+    op.execute("DROP TABLE turnos_asignados_previa")
+    op.execute(f"ALTER SEQUENCE {secuencia} OWNED BY turnos_asignados.id")
+
+
+def _desparticionar_postgresql() -> None:
+    conn = op.get_bind()
+    secuencia = conn.execute(sa.text(
+        "SELECT pg_get_serial_sequence('turnos_asignados', 'id')"
+    )).scalar()
+    op.execute(f"ALTER SEQUENCE {secuencia} OWNED BY NONE")
+    op.execute("ALTER TABLE turnos_asignados RENAME TO turnos_asignados_particionada")
+    op.execute("ALTER TABLE turnos_asignados_particionada RENAME CONSTRAINT uq_usuario_fecha TO uq_usuario_fecha_particionada")
+    op.execute("ALTER TABLE turnos_asignados_particionada RENAME CONSTRAINT turnos_asignados_pkey TO turnos_asignados_particionada_pkey")
+    op.execute("ALTER INDEX ix_turnos_asignados_id RENAME TO ix_turnos_asignados_particionada_id")
+    op.execute("ALTER INDEX ix_turnos_fecha RENAME TO ix_turnos_fecha_particionada")
+    op.execute(f"""
+        CREATE TABLE turnos_asignados (
+            id INTEGER NOT NULL DEFAULT nextval('{secuencia}'::regclass),
+            usuario_id INTEGER NOT NULL REFERENCES usuarios (id),
+            fecha DATE NOT NULL,
+            turno VARCHAR(10) NOT NULL,
+            "generado_automático" BOOLEAN,
+            modificado_manual BOOLEAN,
+            es_reten BOOLEAN,
+            estado VARCHAR(20),
+            created_at TIMESTAMP DEFAULT now(),
+            updated_at TIMESTAMP DEFAULT now(),
+            CONSTRAINT turnos_asignados_pkey PRIMARY KEY (id),
+            CONSTRAINT uq_usuario_fecha UNIQUE (usuario_id, fecha)
+        )
+    """)
+    op.execute("CREATE INDEX ix_turnos_asignados_id ON turnos_asignados (id)")
+    op.execute(f"INSERT INTO turnos_asignados ({COLUMNAS}) SELECT {COLUMNAS} FROM turnos_asignados_particionada")
+    # Borra también todas las particiones
+    op.execute("DROP TABLE turnos_asignados_particionada")
+    op.execute(f"ALTER SEQUENCE {secuencia} OWNED BY turnos_asignados.id")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        _particionar_postgresql()
+    else:
+        op.create_index('ix_turnos_fecha', 'turnos_asignados', ['fecha'])
+
+    op.create_table('turnos_years',
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('year')
+    )
+    extraer_year = sa.cast(sa.extract('year', sa.column('fecha')), sa.Integer)
+    op.execute(
+        sa.table('turnos_years', sa.column('year')).insert().from_select(
+            ['year'],
+            sa.select(extraer_year).select_from(sa.table('turnos_asignados', sa.column('fecha'))).distinct()
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('turnos_years')
+    if op.get_bind().dialect.name == 'postgresql':
+        _desparticionar_postgresql()
+    else:
+        op.drop_index('ix_turnos_fecha', table_name='turnos_asignados')
@@ -0,0 +1,38 @@
+"""Índices para los filtros del listado paginado de usuarios
+
+Revision ID: 0003_indices_usuarios
+Revises: 0002_particion_turnos
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0003_indices_usuarios'
+down_revision: Union[str, Sequence[str], None] = '0002_particion_turnos'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNAS_NOMBRE = ('nombres', 'apellidos', 'usuario')
+
+
+def upgrade() -> None:
+    op.create_index('ix_usuarios_rol_estado', 'usuarios', ['rol_id', 'estado', 'id'])
+    op.create_index('ix_usuarios_estado', 'usuarios', ['estado', 'id'])
+    op.create_index('ix_usuarios_fecha_ingreso', 'usuarios', ['fecha_ingreso'])
+    op.create_index('ix_usuarios_fecha_salida', 'usuarios', ['fecha_salida'])
+    # LIKE 'x%' solo usa el índice en PostgreSQL con varchar_pattern_ops (salvo collation C)
+    ops = ' varchar_pattern_ops' if op.get_bind().dialect.name == 'postgresql' else ''
+    for columna in COLUMNAS_NOMBRE:
+        op.create_index(f'ix_usuarios_{columna}_lower', 'usuarios', [sa.text(f'lower({columna}){ops}')])
+
+
+def downgrade() -> None:
+    for columna in COLUMNAS_NOMBRE:
+        op.drop_index(f'ix_usuarios_{columna}_lower', table_name='usuarios')
+    op.drop_index('ix_usuarios_fecha_salida', table_name='usuarios')
+    op.drop_index('ix_usuarios_fecha_ingreso', table_name='usuarios')
+    op.drop_index('ix_usuarios_estado', table_name='usuarios')
+    op.drop_index('ix_usuarios_rol_estado', table_name='usuarios')
@@ -0,0 +1,50 @@
+"""Catálogo de códigos de turno turnos_codigos
+
+Revision ID: 0004_turnos_codigos
+Revises: 0003_indices_usuarios
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0004_turnos_codigos'
+down_revision: Union[str, Sequence[str], None] = '0003_indices_usuarios'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Los códigos que hasta ahora estaban fijos en app/services/codigos.py
+CODIGOS = [
+    ('M', 'Mañana', 8, 'mañana', True, None, 'FFFFFFFF'),
+    ('T', 'Tarde', 8, 'tarde', True, None, 'FFFFFFFF'),
+    ('N', 'Noche', 8, 'noche', True, None, 'FFFFFFFF'),
+    ('FM1', 'Mañana Casa', 12, 'mañana', True, None, 'FFFFA500'),
+    ('FM2', 'Mañana Oficina', 12, 'mañana', True, None, 'FFFFA500'),
+    ('FN1', 'Noche Casa', 12, 'noche', True, None, 'FFDA70D6'),
+    ('FN2', 'Noche Oficina', 12, 'noche', True, None, 'FFDA70D6'),
+    ('v', 'Vacaciones', 0, None, False, 'vacaciones', 'FFFFFF00'),
+    ('b', 'Baja', 0, None, False, 'baja', 'FFFF0000'),
+    ('c', 'Cumpleaños', 0, None, False, 'cumpleaños', 'FFFFFF00'),
+    ('d', 'Descanso', 0, None, False, 'descanso', 'FFA9A9A9'),
+]
+
+
+def upgrade() -> None:
+    tabla = op.create_table('turnos_codigos',
+        sa.Column('codigo', sa.String(length=10), nullable=False),
+        sa.Column('descripcion', sa.String(length=100), nullable=False),
+        sa.Column('horas', sa.Integer(), nullable=False),
+        sa.Column('franja', sa.String(length=10), nullable=True),
+        sa.Column('contable', sa.Boolean(), nullable=False),
+        sa.Column('ausencia', sa.String(length=20), nullable=True),
+        sa.Column('color', sa.String(length=8), nullable=True),
+        sa.PrimaryKeyConstraint('codigo')
+    )
+    columnas = ('codigo', 'descripcion', 'horas', 'franja', 'contable', 'ausencia', 'color')
+    op.bulk_insert(tabla, [dict(zip(columnas, fila)) for fila in CODIGOS])
+
+
+def downgrade() -> None:
+    op.drop_table('turnos_codigos')
@@ -0,0 +1,33 @@
+"""Hora de inicio de cada código de turno (turnos_codigos.hora_inicio)
+
+Revision ID: 0005_hora_inicio_codigos
+Revises: 0004_turnos_codigos
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0005_hora_inicio_codigos'
+down_revision: Union[str, Sequence[str], None] = '0004_turnos_codigos'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Entrada de los turnos contables de la semilla: 8 h (7-15, 15-23, 23-7) y 12 h (7-19, 19-7)
+HORAS_INICIO = {'M': 7, 'T': 15, 'N': 23, 'FM1': 7, 'FM2': 7, 'FN1': 19, 'FN2': 19}
+
+
+def upgrade() -> None:
+    op.add_column('turnos_codigos', sa.Column('hora_inicio', sa.Integer(), nullable=True))
+    for codigo, hora in HORAS_INICIO.items():
+        op.execute(
+            sa.text("UPDATE turnos_codigos SET hora_inicio = :hora WHERE codigo = :codigo")
+            .bindparams(hora=hora, codigo=codigo)
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('turnos_codigos') as batch_op:
+        batch_op.drop_column('hora_inicio')
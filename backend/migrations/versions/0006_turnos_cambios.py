@@ -0,0 +1,47 @@
+"""Registro de cambios turnos_cambios y su contador
+
+Revision ID: 0006_turnos_cambios
+Revises: 0005_hora_inicio_codigos
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0006_turnos_cambios'
+down_revision: Union[str, Sequence[str], None] = '0005_hora_inicio_codigos'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('turnos_cambios',
+        sa.Column('seq', sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column('turno_id', sa.Integer(), nullable=True),
+        sa.Column('turno', sa.String(length=10), nullable=True),
+        sa.Column('es_reten', sa.Boolean(), nullable=True),
+        sa.Column('generado_automático', sa.Boolean(), nullable=True),
+        sa.Column('modificado_manual', sa.Boolean(), nullable=True),
+        sa.Column('estado', sa.String(length=20), nullable=True),
+        sa.Column('eliminado', sa.Boolean(), nullable=False),
+        sa.Column('registrado_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('seq')
+    )
+    op.create_index('ix_turnos_cambios_registrado_at', 'turnos_cambios', ['registrado_at'])
+    contador = op.create_table('turnos_cambios_contador',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('seq', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # La fila única que bloquean las escrituras (ver app/services/cambios.py)
+    op.bulk_insert(contador, [{'id': 1, 'seq': 0}])
+
+
+def downgrade() -> None:
+    op.drop_table('turnos_cambios_contador')
+    op.drop_index('ix_turnos_cambios_registrado_at', table_name='turnos_cambios')
+    op.drop_table('turnos_cambios')
@@ -0,0 +1,52 @@
+"""Histórico turnos_historial e instantáneas mensuales turnos_instantaneas
+
+Revision ID: 0007_turnos_historial
+Revises: 0006_turnos_cambios
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0007_turnos_historial'
+down_revision: Union[str, Sequence[str], None] = '0006_turnos_cambios'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('turnos_historial',
+        sa.Column('seq', sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column('turno', sa.String(length=10), nullable=True),
+        sa.Column('es_reten', sa.Boolean(), nullable=True),
+        sa.Column('modificado_manual', sa.Boolean(), nullable=True),
+        sa.Column('turno_anterior', sa.String(length=10), nullable=True),
+        sa.Column('es_reten_anterior', sa.Boolean(), nullable=True),
+        sa.Column('modificado_manual_anterior', sa.Boolean(), nullable=True),
+        sa.Column('registrado_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('seq')
+    )
+    op.create_index('ix_turnos_historial_fecha_seq', 'turnos_historial', ['fecha', 'seq'])
+    op.create_index('ix_turnos_historial_usuario_fecha', 'turnos_historial', ['usuario_id', 'fecha'])
+    op.create_table('turnos_instantaneas',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Integer(), nullable=False),
+        sa.Column('seq', sa.BigInteger(), nullable=False),
+        sa.Column('tomada_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.Column('celdas', sa.JSON(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_turnos_instantaneas_mes', 'turnos_instantaneas', ['year', 'month', 'tomada_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_turnos_instantaneas_mes', table_name='turnos_instantaneas')
+    op.drop_table('turnos_instantaneas')
+    op.drop_index('ix_turnos_historial_usuario_fecha', table_name='turnos_historial')
+    op.drop_index('ix_turnos_historial_fecha_seq', table_name='turnos_historial')
+    op.drop_table('turnos_historial')
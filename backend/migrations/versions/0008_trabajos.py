@@ -0,0 +1,44 @@
+"""Trabajos en segundo plano (POST /jobs)
+
+Revision ID: 0008_trabajos
+Revises: 0007_turnos_historial
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0008_trabajos'
+down_revision: Union[str, Sequence[str], None] = '0007_turnos_historial'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('trabajos',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tipo', sa.String(length=30), nullable=False),
+        sa.Column('parametros', sa.JSON(), nullable=False),
+        sa.Column('estado', sa.String(length=20), nullable=False),
+        sa.Column('progreso', sa.Float(), nullable=False),
+        sa.Column('mensaje', sa.String(length=200), nullable=True),
+        sa.Column('cancelar', sa.Boolean(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('resultado', sa.JSON(), nullable=True),
+        sa.Column('contenido', sa.LargeBinary(), nullable=True),
+        sa.Column('nombre_fichero', sa.String(length=200), nullable=True),
+        sa.Column('tipo_medio', sa.String(length=100), nullable=True),
+        sa.Column('creado_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.Column('iniciado_at', sa.TIMESTAMP(), nullable=True),
+        sa.Column('actualizado_at', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.Column('terminado_at', sa.TIMESTAMP(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_trabajos_estado_creado', 'trabajos', ['estado', 'creado_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_trabajos_estado_creado', table_name='trabajos')
+    op.drop_table('trabajos')
@@ -0,0 +1,47 @@
+"""Años pendientes de regenerar en resumen_mensual
+
+Revision ID: 0009_resumen_pendiente
+Revises: 0008_trabajos
+Create Date: 2026-10-17
+
+Marca los años con turnos (usuario y mes) que no tienen fila en resumen_mensual,
+p. ej. en bases marcadas con `alembic stamp 0001_baseline` que aún no han pasado por
+`python -m app.services.resumen`. Los reportes anuales de esos años leen
+turnos_asignados hasta que se regeneran.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0009_resumen_pendiente'
+down_revision: Union[str, Sequence[str], None] = '0008_trabajos'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    tabla = op.create_table('resumen_pendiente',
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('detectado_en', sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('year')
+    )
+
+    conn = op.get_bind()
+    turnos = sa.table('turnos_asignados', sa.column('usuario_id', sa.Integer), sa.column('fecha', sa.Date))
+    resumen = sa.table('resumen_mensual', sa.column('usuario_id', sa.Integer),
+                       sa.column('year', sa.Integer), sa.column('month', sa.Integer))
+    con_turnos = {
+        (int(y), int(m), u) for y, m, u in conn.execute(sa.select(
+            sa.extract('year', turnos.c.fecha), sa.extract('month', turnos.c.fecha), turnos.c.usuario_id
+        ).distinct())
+    }
+    resumidos = {tuple(r) for r in conn.execute(sa.select(resumen.c.year, resumen.c.month, resumen.c.usuario_id))}
+    pendientes = sorted({y for y, _, _ in con_turnos - resumidos})
+    if pendientes:
+        op.bulk_insert(tabla, [{'year': y} for y in pendientes])
+
+
+def downgrade() -> None:
+    op.drop_table('resumen_pendiente')
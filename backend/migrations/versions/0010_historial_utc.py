@@ -0,0 +1,46 @@
+"""Marcas de tiempo del histórico en UTC
+
+Revision ID: 0010_historial_utc
+Revises: 0009_resumen_pendiente
+Create Date: 2026-10-17
+
+En Postgres now() en una columna TIMESTAMP guarda la hora local del servidor, pero
+/turnos/mes/{year}/{month}/historial compara con ?en= pasado a UTC. Cambia el
+valor por defecto de turnos_historial.registrado_at y turnos_instantaneas.tomada_at
+a timezone('utc', now()) y pasa a UTC las filas existentes con la zona actual del
+servidor. En SQLite CURRENT_TIMESTAMP ya es UTC y no hay nada que cambiar.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0010_historial_utc'
+down_revision: Union[str, Sequence[str], None] = '0009_resumen_pendiente'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNAS = (('turnos_historial', 'registrado_at'), ('turnos_instantaneas', 'tomada_at'))
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        return
+    for tabla, columna in COLUMNAS:
+        op.alter_column(tabla, columna, server_default=sa.text("timezone('utc', now())"))
+        op.execute(
+            f"UPDATE {tabla} SET {columna} = "
+            f"timezone('utc', {columna} AT TIME ZONE current_setting('TimeZone'))"
+        )
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        return
+    for tabla, columna in COLUMNAS:
+        op.execute(
+            f"UPDATE {tabla} SET {columna} = "
+            f"timezone(current_setting('TimeZone'), {columna} AT TIME ZONE 'utc')"
+        )
+        op.alter_column(tabla, columna, server_default=sa.func.now())
@@ -0,0 +1,33 @@
+"""Resultados de trabajos en ficheros
+
+Revision ID: 0011_trabajos_ficheros
+Revises: 0010_historial_utc
+Create Date: 2026-10-17
+
+Los ficheros generados por los trabajos (exportaciones) pasan de la columna
+trabajos.contenido a un fichero en TRABAJOS_DIR; la fila solo guarda su nombre en
+ruta_fichero. Los resultados de fichero ya guardados se pierden: esos trabajos
+quedan como completados sin resultado y se pueden relanzar.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0011_trabajos_ficheros'
+down_revision: Union[str, Sequence[str], None] = '0010_historial_utc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('trabajos') as batch_op:
+        batch_op.add_column(sa.Column('ruta_fichero', sa.String(length=100), nullable=True))
+        batch_op.drop_column('contenido')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('trabajos') as batch_op:
+        batch_op.add_column(sa.Column('contenido', sa.LargeBinary(), nullable=True))
+        batch_op.drop_column('ruta_fichero')
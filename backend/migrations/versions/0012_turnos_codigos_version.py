@@ -0,0 +1,33 @@
+"""Versión del catálogo de códigos
+
+Revision ID: 0012_turnos_codigos_version
+Revises: 0011_trabajos_ficheros
+Create Date: 2026-10-17
+
+Fila única que sube con cada cambio de turnos_codigos a través de la API. Cada
+worker guarda el catálogo en memoria y lo recarga cuando la versión cambia
+(ver app/services/codigos.py).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0012_turnos_codigos_version'
+down_revision: Union[str, Sequence[str], None] = '0011_trabajos_ficheros'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    tabla = op.create_table('turnos_codigos_version',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(tabla, [{'id': 1, 'version': 0}])
+
+
+def downgrade() -> None:
+    op.drop_table('turnos_codigos_version')
@@ -0,0 +1,54 @@
+# backend/tests/test_consultas.py
+"""Presupuesto de consultas SQL de los endpoints más pesados (ver app/pytest_perfilado.py)"""
+from datetime import date, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from app import arranque, database
+from app.main import app
+from app.models.usuario import Usuario
+from app.models.turno import Turno
+from app.models.festivo import FestivoMadrid
+from app.services.resumen import reconstruir_resumen
+
+USUARIOS = 25
+YEAR = 2025
+CODIGOS = ["M", "T", "N", "FM1", "FN1", "v", "b", "d"]
+
+@pytest.fixture(scope="module")
+def client():
+    arranque.migrar()
+    db = database.SessionLocal()
+    try:
+        for i in range(USUARIOS):
+            db.add(Usuario(nombres=f"Nombre{i}", apellidos=f"Apellido{i}", usuario=f"usuario{i}",
+                           cumple_anios=date(1990, 1 + i % 12, 1 + i % 28), fecha_ingreso=date(2020, 1, 1),
+                           estado="activo", rol_id=1 + i % 2))
+        for dia_mes, descripcion in (("01/01", "Año nuevo"), ("06/01", "Reyes"), ("25/12", "Navidad")):
+            db.add(FestivoMadrid(dia_mes=dia_mes, descripcion=descripcion, tipo="Nacional"))
+        db.flush()
+        inicio = date(YEAR, 1, 1)
+        for usuario_id in range(1, USUARIOS + 1):
+            for k in range(365):
+                db.add(Turno(usuario_id=usuario_id, fecha=inicio + timedelta(days=k),
+                             turno=CODIGOS[(usuario_id + k) % len(CODIGOS)]))
+        db.flush()
+        reconstruir_resumen(db)
+        db.commit()
+    finally:
+        db.close()
+    with TestClient(app) as client:
+        assert arranque.estado.listo, arranque.estado.error
+        yield client
+
+def test_rejilla_mensual(client, max_consultas):
+    with max_consultas(4):
+        respuesta = client.get(f"/turnos/mes/{YEAR}/3")
+    assert respuesta.status_code == 200
+    assert len(respuesta.json()) == USUARIOS * 31
+
+@pytest.mark.parametrize("reporte", ["trabajados", "turnos", "vacaciones"])
+def test_reporte_anual(client, max_consultas, reporte):
+    with max_consultas(4):
+        respuesta = client.post(f"/reportes/{reporte}", json={"year": YEAR})
+    assert respuesta.status_code == 200
+    assert len(respuesta.json()) == USUARIOS
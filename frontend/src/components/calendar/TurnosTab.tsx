@@ -1,6 +1,6 @@
 // src/components/calendar/TurnosTab.tsx
 import React, { useState } from 'react';
-import { asignarTurno } from '../../services/turnosApi';
+import { asignarTurnosLote } from '../../services/turnosApi';
 import toast from 'react-hot-toast';
 import type{ Usuario } from '../../types';
 
@@ -19,14 +19,12 @@ const TurnosTab: React.FC<TurnosTabProps> = ({ usuario, fechas, onSuccess }) =>
   const handleSubmit = async () => {
     setLoading(true);
     try {
-      for (const fecha of fechas) {
-        await asignarTurno({
-          usuario_id: usuario.id,
-          fecha,
-          turno,
-          es_reten: esReten
-        });
-      }
+      await asignarTurnosLote(fechas.map(fecha => ({
+        usuario_id: usuario.id,
+        fecha,
+        turno,
+        es_reten: esReten
+      })));
       toast.success(`✅ ${fechas.length} turnos asignados correctamente`);
       onSuccess();
     } catch (err: any) {
@@ -3,10 +3,10 @@ import { useState, useMemo, useEffect } from "react";
 import { useUsuarios } from "../../hooks/useUsuarios";
 import { useTurnosPorMes } from "../../hooks/useTurnos";
 import CellSelectorModal from "../calendar/CellSelectorModal";
-import { asignarCumpleanosMes } from "../../services/turnosApi";
+import { asignarCumpleanosMes, descargarTurnosMes } from "../../services/turnosApi";
 import type { Usuario, Turno } from "../../types";
-import { exportToExcel } from "../../utils/exportToExcel";
-import { getFestivos } from "../../services/festivosApi";
+import { saveAs } from "file-saver";
+import { getFechasFestivas } from "../../services/festivosApi";
 
 const getDaysOfMonth = (year: number, month: number) => {
   const daysInMonth = new Date(year, month + 1, 0).getDate();
@@ -26,7 +26,7 @@ const getDayName = (dateString: string) => {
 };
 
 const TurnosExcelView = () => {
-  const { usuarios, loading: loadingUsuarios } = useUsuarios();
+  const { usuarios: usuariosActivos, loading: loadingUsuarios } = useUsuarios({ estado: "activo" });
   const [selectedUsuario, setSelectedUsuario] = useState<Usuario | null>(null);
   const [selectedFechas, setSelectedFechas] = useState<string[]>([]);
   const [modalOpen, setModalOpen] = useState(false);
@@ -59,31 +59,14 @@ const TurnosExcelView = () => {
   const {
     turnos,
     loading: loadingTurnos,
-    refetch: refetchTurnos,
+    sincronizar: sincronizarTurnos,
   } = useTurnosPorMes(selectedYear, selectedMonth);
 
   useEffect(() => {
     const cargarFestivos = async () => {
       try {
-        const festivosData = await getFestivos();
-        const festivosSet = new Set<string>();
-
-        festivosData.forEach((festivo) => {
-          // Solo festivos activos
-          if (festivo.estado === "activo") {
-            // Verificar si el festivo está en el mes actual
-            const [dia, mes] = festivo.dia_mes.split("/").map(Number);
-            if (mes - 1 === selectedMonth) {
-              // mes - 1 porque selectedMonth es 0-11
-              // Crear fecha completa para comparar con las fechas de los días
-              const fechaCompleta = `${selectedYear}-${String(mes).padStart(
-                2,
-                "0"
-              )}-${String(dia).padStart(2, "0")}`;
-              festivosSet.add(fechaCompleta);
-            }
-          }
-        });
+        const fechasData = await getFechasFestivas(selectedYear, selectedMonth + 1); // selectedMonth es 0-11
+        const festivosSet = new Set<string>(fechasData.map((f) => f.fecha));
 
         setFestivos(festivosSet);
       } catch (error) {
@@ -103,7 +86,7 @@ const TurnosExcelView = () => {
     const aplicarCumpleanosAuto = async () => {
       try {
         await asignarCumpleanosMes(selectedYear, selectedMonth);
-        await refetchTurnos();
+        await sincronizarTurnos();
       } catch (err) {
         console.warn("No se pudieron asignar cumpleaños automáticos");
       }
@@ -192,19 +175,18 @@ const TurnosExcelView = () => {
 
   const handleSuccess = () => {
     handleCloseModal();
-    refetchTurnos();
+    sincronizarTurnos(); // solo las celdas cambiadas (/turnos/cambios), no el mes entero
   };
 
-  const handleExportToExcel = () => {
-    const exportData = {
-      year: selectedYear,
-      month: selectedMonth,
-      usuarios: usuarios.filter((u) => u.estado === "activo"),
-      turnos: turnosMap,
-      festivos: festivos,
-    };
-
-    exportToExcel(exportData);
+  // ✅ El Excel se genera en el servidor (mismo formato que utils/exportToExcel.ts)
+  const handleExportToExcel = async () => {
+    try {
+      const blob = await descargarTurnosMes(selectedYear, selectedMonth, "xlsx");
+      const monthName = new Date(selectedYear, selectedMonth).toLocaleString("es-ES", { month: "long" });
+      saveAs(blob, `Turnos_${monthName}_${selectedYear}.xlsx`);
+    } catch (error) {
+      console.error("Error al exportar turnos:", error);
+    }
   };
 
   const getCellColor = (
@@ -230,7 +212,6 @@ const TurnosExcelView = () => {
   };
 
   const days = getDaysOfMonth(selectedYear, selectedMonth);
-  const usuariosActivos = usuarios.filter((u) => u.estado === "activo");
 
   const usuariosActivosPorGrupo = {
     jefes: usuariosActivos.filter((u) => u.rol_id === 1),
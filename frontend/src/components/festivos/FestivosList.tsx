@@ -44,7 +44,7 @@ const FestivosList = () => {
     if (festivo) {
       setEditingFestivo(festivo);
       setFormData({
-        dia_mes: festivo.dia_mes,
+        dia_mes: festivo.dia_mes ?? "",
         descripcion: festivo.descripcion,
         tipo: festivo.tipo,
         estado: festivo.estado,
@@ -66,7 +66,7 @@ const FestivosList = () => {
 
     // Validación de formato DD/MM
     const dateRegex = /^(0[1-9]|[12][0-9]|3[01])\/(0[1-9]|1[0-2])$/;
-    if (!dateRegex.test(formData.dia_mes)) {
+    if (!dateRegex.test(formData.dia_mes ?? "")) {
       toast.error("Formato de fecha debe ser DD/MM (ej: 01/01)");
       return;
     }
@@ -125,10 +125,17 @@ const FestivosList = () => {
     return months[monthIndex - 1] || "";
   };
 
+  // ✅ "DD/MM" del festivo; los de Pascua no tienen día fijo y se agrupan aparte
+  const diaMesFestivo = (f: Festivo): string => {
+    if (f.dia_mes) return f.dia_mes;
+    if (f.fecha) return `${f.fecha.slice(8, 10)}/${f.fecha.slice(5, 7)}`;
+    return "00/00";
+  };
+
   // ✅ Función para comparar fechas DD/MM
   const sortByDate = (a: Festivo, b: Festivo): number => {
-    const [dayA, monthA] = a.dia_mes.split("/").map(Number);
-    const [dayB, monthB] = b.dia_mes.split("/").map(Number);
+    const [dayA, monthA] = diaMesFestivo(a).split("/").map(Number);
+    const [dayB, monthB] = diaMesFestivo(b).split("/").map(Number);
     const dateA = monthA * 100 + dayA; // Ej: 12/25 → 1225
     const dateB = monthB * 100 + dayB;
     return dateA - dateB;
@@ -140,13 +147,13 @@ const FestivosList = () => {
       .filter(f => activeTab === 'activos' ? f.estado === 'activo' : f.estado === 'inactivo')
       .filter(f => {
         if (!filtroMes) return true;
-        const mesFestivo = f.dia_mes.split('/')[1];
+        const mesFestivo = diaMesFestivo(f).split('/')[1];
         return mesFestivo === filtroMes;
       })
       .filter(f => {
         if (!busqueda.trim()) return true;
         const q = busqueda.toLowerCase();
-        return f.descripcion.toLowerCase().includes(q) || f.dia_mes.includes(q);
+        return f.descripcion.toLowerCase().includes(q) || diaMesFestivo(f).includes(q);
       })
       .sort(sortByDate);
   }, [festivos, activeTab, filtroMes, busqueda]);
@@ -155,7 +162,7 @@ const FestivosList = () => {
   const festivosPorMes = useMemo(() => {
     const map: Record<string, Festivo[]> = {};
     festivosFiltrados.forEach(f => {
-      const mes = f.dia_mes.split('/')[1];
+      const mes = diaMesFestivo(f).split('/')[1];
       if (!map[mes]) map[mes] = [];
       map[mes].push(f);
     });
@@ -265,8 +272,8 @@ const FestivosList = () => {
                 {lista.map(f => (
                   <li key={f.id} className="group flex items-start gap-4 px-5 py-3 hover:bg-gray-50 transition">
                     <div className="flex flex-col items-center w-14 shrink-0">
-                      <span className="text-lg font-semibold text-blue-600 leading-none">{f.dia_mes.split('/')[0]}</span>
-                      <span className="mt-1 text-[10px] uppercase tracking-wide text-gray-400">{f.dia_mes.split('/')[1]}</span>
+                      <span className="text-lg font-semibold text-blue-600 leading-none">{diaMesFestivo(f).split('/')[0]}</span>
+                      <span className="mt-1 text-[10px] uppercase tracking-wide text-gray-400">{diaMesFestivo(f).split('/')[1]}</span>
                     </div>
                     <div className="flex-1 min-w-0">
                       <div className="flex flex-wrap items-center gap-2 mb-1">
@@ -307,7 +314,7 @@ const FestivosList = () => {
               type="text"
               placeholder="01/01"
               autoFocus
-              value={formData.dia_mes}
+              value={formData.dia_mes ?? ""}
               onChange={(e) =>
                 setFormData({ ...formData, dia_mes: e.target.value })
               }
@@ -42,7 +42,7 @@ interface ReporteFiltros {
 }
 
 const ReportesPage: React.FC = () => {
-  const { usuarios: allUsuarios, loading: loadingUsuarios } = useUsuarios();
+  const { usuarios: allUsuarios, loading: loadingUsuarios } = useUsuarios({ estado: 'activo' });
   const [usuariosFiltrados, setUsuariosFiltrados] = useState<Usuario[]>([]);
   const [filtros, setFiltros] = useState<ReporteFiltros>({
     year: new Date().getFullYear(),
@@ -56,7 +56,7 @@ const ReportesPage: React.FC = () => {
   useEffect(() => {
     if (allUsuarios.length > 0) {
       const filtrados = allUsuarios.filter(u => 
-        u.estado === 'activo' && (u.rol_id === 1 || u.rol_id === 2)
+        u.rol_id === 1 || u.rol_id === 2
       );
       setUsuariosFiltrados(filtrados);
     }
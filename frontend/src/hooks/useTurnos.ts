@@ -1,7 +1,11 @@
 // src/hooks/useTurnos.ts
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { api } from '../services/api';
-import type { Turno } from '../types';
+import { getCambiosTurnos, aplicarCambios, abrirStreamTurnos, loteACambios } from '../services/turnosApi';
+import type { Turno, LoteCambiosStream } from '../types';
+
+// Respaldo por si el stream se corta: cada cuánto se pide /turnos/cambios igualmente
+const INTERVALO_SINCRONIZACION_MS = 30000;
 
 // ✅ Corregido: convierte month 0-11 → 1-12 antes de enviar al backend
 export const getTurnosPorMes = async (year: number, monthZeroBased: number) => {
@@ -14,12 +18,17 @@ export const useTurnosPorMes = (year: number, month: number) => {
   const [turnos, setTurnos] = useState<Turno[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  // Cursor de /turnos/cambios que corresponde a `turnos` (null hasta la primera carga)
+  const cursorRef = useRef<number | null>(null);
 
   const fetchTurnos = async () => {
     try {
       setLoading(true);
-      const data = await getTurnosPorMes(year, month); // month es 0-11 desde el componente
-      setTurnos(data);
+      const monthOneBased = month + 1; // month es 0-11 desde el componente
+      const response = await api.get<Turno[]>(`/turnos/mes/${year}/${monthOneBased}`);
+      const cursor = response.headers['x-cursor-cambios'];
+      cursorRef.current = cursor !== undefined ? Number(cursor) : null;
+      setTurnos(response.data);
     } catch (err: any) {
       setError('Error al cargar turnos: ' + err.message);
     } finally {
@@ -27,14 +36,56 @@ export const useTurnosPorMes = (year: number, month: number) => {
     }
   };
 
+  // ✅ Solo las celdas cambiadas desde el último cursor; si caducó (410), recarga el mes
+  const sincronizar = async () => {
+    const desde = cursorRef.current;
+    if (desde === null) return fetchTurnos();
+    try {
+      const { cursor, cambios } = await getCambiosTurnos(desde, year, month);
+      if (cursorRef.current !== desde) return; // otra carga o sincronización llegó antes
+      cursorRef.current = cursor;
+      setTurnos((actuales) => aplicarCambios(actuales, cambios));
+    } catch (err: any) {
+      if (err.response?.status === 410) return fetchTurnos();
+      console.warn('No se pudieron sincronizar los turnos:', err.message);
+    }
+  };
+
+  // ✅ Ediciones de otros planificadores en vivo (/turnos/stream)
+  const aplicarLote = (lote: LoteCambiosStream) => {
+    if (cursorRef.current === null) return; // la carga en curso ya trae el estado
+    if (lote.desde !== cursorRef.current) {
+      sincronizar(); // falta algún lote (otro worker, reconexión...): se pide lo que falte
+      return;
+    }
+    cursorRef.current = lote.cursor;
+    if (lote.celdas.length > 0) {
+      setTurnos((actuales) => aplicarCambios(actuales, loteACambios(lote)));
+    }
+  };
+
   useEffect(() => {
+    cursorRef.current = null;
     fetchTurnos();
+    const stream = abrirStreamTurnos(year, month);
+    stream.addEventListener('abierto', (e) => {
+      const { cursor } = JSON.parse((e as MessageEvent).data);
+      if (cursorRef.current !== null && cursor !== cursorRef.current) sincronizar();
+    });
+    stream.addEventListener('cambios', (e) => aplicarLote(JSON.parse((e as MessageEvent).data)));
+    stream.addEventListener('recargar', () => fetchTurnos());
+    const intervalo = setInterval(sincronizar, INTERVALO_SINCRONIZACION_MS);
+    return () => {
+      stream.close();
+      clearInterval(intervalo);
+    };
   }, [year, month]);
 
   return {
     turnos,
     loading,
     error,
-    refetch: fetchTurnos
+    refetch: fetchTurnos,
+    sincronizar
   };
-};
\ No newline at end of file
+};
@@ -1,9 +1,10 @@
 // src/hooks/useUsuarios.ts
 import { useState, useEffect, useMemo } from 'react';
-import { api, getRoles } from '../services/api';
-import type { Usuario, Rol } from '../types';
+import { getTodasLasPaginas, getRoles } from '../services/api';
+import type { Usuario, Rol, FiltrosUsuarios } from '../types';
 
-export const useUsuarios = () => {
+// Los filtros se aplican en el servidor y se leen solo al montar
+export const useUsuarios = (filtros: FiltrosUsuarios = {}) => {
   const [usuarios, setUsuarios] = useState<Usuario[]>([]);
   const [roles, setRoles] = useState<Rol[]>([]);
   const [loading, setLoading] = useState(true);
@@ -12,8 +13,7 @@ export const useUsuarios = () => {
 
   const fetchUsuarios = async () => {
     try {
-      const response = await api.get<Usuario[]>('/usuarios');
-      const nuevosUsuarios = response.data;
+      const nuevosUsuarios = await getTodasLasPaginas<Usuario>('/usuarios/', filtros);
 
       // Solo establecemos ordenOriginalIds la PRIMERA VEZ
       if (ordenOriginalIds.length === 0) {
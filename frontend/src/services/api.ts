@@ -1,6 +1,6 @@
 // src/services/api.ts
 import axios from 'axios';
-import type { Rol } from '../types';
+import type { Rol, Pagina } from '../types';
 import type { Usuario, UsuarioCreate } from '../types';
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
@@ -12,6 +12,41 @@ export const api = axios.create({
   },
 });
 
+// ✅ Leer lo propio recién escrito: el backend puede atender las lecturas desde réplicas
+// que van con algo de retraso, así que durante un rato tras cada escritura se piden a la
+// base principal (X-Consistencia: fuerte). Los reportes son POST pero no escriben.
+const VENTANA_CONSISTENCIA_MS = 10000;
+let ultimaEscritura = 0;
+
+const esEscritura = (method?: string, url?: string) =>
+  !!method && method.toLowerCase() !== 'get' && !url?.startsWith('/reportes') && !url?.startsWith('/turnos/validacion');
+
+api.interceptors.request.use((config) => {
+  if (config.method?.toLowerCase() === 'get' && Date.now() - ultimaEscritura < VENTANA_CONSISTENCIA_MS) {
+    config.headers.set('X-Consistencia', 'fuerte');
+  }
+  return config;
+});
+
+api.interceptors.response.use((response) => {
+  if (esEscritura(response.config.method, response.config.url)) ultimaEscritura = Date.now();
+  return response;
+});
+
+// ✅ Recorre un listado paginado por cursor hasta la última página
+export const getTodasLasPaginas = async <T>(url: string, params: object = {}): Promise<T[]> => {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const response: { data: Pagina<T> } = await api.get<Pagina<T>>(url, {
+      params: { ...params, limit: 500, cursor: cursor ?? undefined },
+    });
+    items.push(...response.data.items);
+    cursor = response.data.next_cursor;
+  } while (cursor);
+  return items;
+};
+
 export const getRoles = async () => {
   const response = await api.get<Rol[]>('/roles');
   return response.data;
@@ -1,10 +1,9 @@
 // src/services/festivosApi.ts
-import { api } from './api';
-import type { Festivo, FestivoCreate } from '../types';
+import { api, getTodasLasPaginas } from './api';
+import type { Festivo, FestivoCreate, FestivoFecha } from '../types';
 
 export const getFestivos = async (): Promise<Festivo[]> => {
-  const response = await api.get<Festivo[]>('/festivos/');
-  return response.data;
+  return getTodasLasPaginas<Festivo>('/festivos/');
 };
 
 export const crearFestivo = async (festivo: FestivoCreate): Promise<Festivo> => {
@@ -15,4 +14,10 @@ export const crearFestivo = async (festivo: FestivoCreate): Promise<Festivo> =>
 export const actualizarFestivo = async (id: number, festivo: Partial<Festivo>): Promise<Festivo> => {
   const response = await api.patch<Festivo>(`/festivos/${id}`, festivo);
   return response.data;
-};
\ No newline at end of file
+};
+
+// ✅ Fechas festivas ya calculadas en el backend (incluye festivos móviles)
+export const getFechasFestivas = async (year: number, month?: number): Promise<FestivoFecha[]> => {
+  const response = await api.get<FestivoFecha[]>('/festivos/fechas', { params: { year, month } });
+  return response.data;
+};
@@ -1,8 +1,11 @@
 import { api } from './api';
 
 interface ReporteRequest {
-  year: number;
+  year?: number;
   month?: number;
+  desde?: string; // "YYYY-MM-DD", en lugar de year/month (ambas fechas incluidas)
+  hasta?: string;
+  agrupar?: 'mes' | 'semana'; // añade "periodos" con el desglose a cada fila
 }
 
 export const getReporteTrabajados = (data: ReporteRequest) => {
@@ -24,3 +27,15 @@ export const getReporteVacaciones = (data: ReporteRequest) => {
 export const getReporteYears = () => {
   return api.get<number[]>('/reportes/years');
 };
+
+export const descargarReporte = async (
+  tipo: 'trabajados' | 'turnos' | 'festivos' | 'vacaciones',
+  data: ReporteRequest,
+  formato: 'xlsx' | 'csv' = 'xlsx'
+) => {
+  const response = await api.get(`/reportes/${tipo}/export`, {
+    params: { ...data, formato },
+    responseType: 'blob',
+  });
+  return response.data as Blob;
+};
@@ -0,0 +1,42 @@
+import { api } from './api';
+import type { Trabajo } from '../types';
+
+// ✅ Operaciones pesadas en segundo plano: se lanzan, se consulta el progreso y se descarga el resultado
+export const crearTrabajo = async (tipo: string, parametros: Record<string, unknown>) => {
+  const response = await api.post<Trabajo>('/jobs', { tipo, parametros });
+  return response.data;
+};
+
+export const getTrabajo = async (id: number) => {
+  const response = await api.get<Trabajo>(`/jobs/${id}`);
+  return response.data;
+};
+
+export const cancelarTrabajo = async (id: number) => {
+  const response = await api.delete<Trabajo>(`/jobs/${id}`);
+  return response.data;
+};
+
+// Consulta el trabajo cada `intervaloMs` hasta que termina (completado, error o cancelado)
+export const esperarTrabajo = async (
+  id: number,
+  alAvanzar?: (trabajo: Trabajo) => void,
+  intervaloMs = 1000
+): Promise<Trabajo> => {
+  for (;;) {
+    const trabajo = await getTrabajo(id);
+    alAvanzar?.(trabajo);
+    if (trabajo.estado !== 'pendiente' && trabajo.estado !== 'en_curso') return trabajo;
+    await new Promise((resolve) => setTimeout(resolve, intervaloMs));
+  }
+};
+
+export const getResultadoTrabajo = async <T>(id: number) => {
+  const response = await api.get<T>(`/jobs/${id}/resultado`);
+  return response.data;
+};
+
+export const descargarResultadoTrabajo = async (id: number) => {
+  const response = await api.get(`/jobs/${id}/resultado`, { responseType: 'blob' });
+  return response.data as Blob;
+};
@@ -1,6 +1,6 @@
 // src/services/turnosApi.ts
 import { api } from './api';
-import type { Turno } from '../types';
+import type { Turno, MatrizTurnosMes, CambioTurno, CambiosTurnos, LoteCambiosStream } from '../types';
 
 // ✅ NUEVO: usa /turnos/asignar para evitar duplicados
 export const asignarTurno = async (data: {
@@ -13,6 +13,21 @@ export const asignarTurno = async (data: {
   return response.data;
 };
 
+// ✅ Asigna muchas celdas en una sola petición/transacción
+export const asignarTurnosLote = async (celdas: {
+  usuario_id: number;
+  fecha: string;
+  turno: string;
+  es_reten?: boolean;
+}[]) => {
+  const response = await api.post<{
+    turnos_creados: number;
+    turnos_actualizados: number;
+    resultados: (Turno & { creado: boolean })[];
+  }>('/turnos/asignar/lote', { celdas });
+  return response.data;
+};
+
 // ✅ Corregido: convierte month 0-11 → 1-12 antes de enviar
 export const getTurnosPorMes = async (year: number, monthZeroBased: number) => {
   const monthOneBased = monthZeroBased + 1; // 0-11 → 1-12
@@ -20,6 +35,102 @@ export const getTurnosPorMes = async (year: number, monthZeroBased: number) => {
   return response.data;
 };
 
+// ✅ Cambios del mes desde un cursor (todas las páginas); lanza 410 si el cursor caducó
+export const getCambiosTurnos = async (desde: number, year: number, monthZeroBased: number) => {
+  const cambios: CambioTurno[] = [];
+  let cursor = desde;
+  let hayMas = true;
+  while (hayMas) {
+    const response: { data: CambiosTurnos } = await api.get<CambiosTurnos>('/turnos/cambios', {
+      params: { desde: cursor, year, month: monthZeroBased + 1 },
+    });
+    cambios.push(...response.data.cambios);
+    cursor = response.data.cursor;
+    hayMas = response.data.hay_mas;
+  }
+  return { cursor, cambios };
+};
+
+// Aplica los cambios (en orden de seq) a la lista del mes: sustituye, añade o quita la celda
+export const aplicarCambios = (turnos: Turno[], cambios: CambioTurno[]) => {
+  if (cambios.length === 0) return turnos;
+  const clave = (usuarioId: number, fecha: string) => `${usuarioId}|${fecha}`;
+  const celdas = new Map(turnos.map((t) => [clave(t.usuario_id, t.fecha), t]));
+  for (const cambio of cambios) {
+    const k = clave(cambio.usuario_id, cambio.fecha);
+    if (cambio.eliminado) {
+      celdas.delete(k);
+      continue;
+    }
+    const anterior = celdas.get(k);
+    celdas.set(k, {
+      id: cambio.turno_id!,
+      usuario_id: cambio.usuario_id,
+      fecha: cambio.fecha,
+      turno: cambio.turno!,
+      es_reten: !!cambio.es_reten,
+      generado_automático: cambio.generado_automático ?? anterior?.generado_automático ?? false,
+      modificado_manual: !!cambio.modificado_manual,
+      estado: cambio.estado ?? anterior?.estado ?? 'activo',
+      created_at: anterior?.created_at ?? cambio.registrado_at ?? '',
+      updated_at: cambio.registrado_at ?? anterior?.updated_at ?? '',
+    });
+  }
+  return Array.from(celdas.values());
+};
+
+// ✅ Stream en vivo del mes (Server-Sent Events); month en base 0
+export const abrirStreamTurnos = (year: number, monthZeroBased: number) =>
+  new EventSource(`${api.defaults.baseURL}/turnos/stream?year=${year}&month=${monthZeroBased + 1}`);
+
+// Lote compacto del stream -> cambios en el formato de /turnos/cambios
+export const loteACambios = (lote: LoteCambiosStream): CambioTurno[] =>
+  lote.celdas.map(([usuario_id, fecha, turno, turno_id, es_reten, modificado_manual], i) => ({
+    seq: lote.desde + i + 1,
+    usuario_id,
+    fecha,
+    eliminado: turno === null,
+    turno_id,
+    turno,
+    es_reten,
+    generado_automático: null,
+    modificado_manual,
+    estado: null,
+    registrado_at: null,
+  }));
+
+// ✅ Formato compacto de la rejilla: una celda por (usuario, día) con índices de código
+export const getTurnosMatriz = async (year: number, monthZeroBased: number) => {
+  const response = await api.get<MatrizTurnosMes>(`/turnos/mes/${year}/${monthZeroBased + 1}`, {
+    params: { formato: 'matriz' },
+  });
+  return response.data;
+};
+
+// Celda de la matriz: fecha -> usuario -> turno (mismo mapa que arma TurnosExcelView)
+export const matrizAMapa = (matriz: MatrizTurnosMes) => {
+  const bits = (b64: string) => Uint8Array.from(atob(b64), (c) => c.charCodeAt(0));
+  const reten = bits(matriz.es_reten);
+  const manual = bits(matriz.modificado_manual);
+  const activo = (flags: Uint8Array, i: number) => ((flags[i >> 3] >> (i & 7)) & 1) === 1;
+  const mapa = new Map<string, Map<number, { turno: string; es_reten: boolean; modificado_manual: boolean }>>();
+  const nDias = matriz.dias.length;
+  matriz.dias.forEach((fecha) => mapa.set(fecha, new Map()));
+  matriz.usuarios.forEach((usuarioId, u) => {
+    for (let d = 0; d < nDias; d++) {
+      const i = u * nDias + d;
+      const codigo = matriz.celdas[i];
+      if (codigo === 0) continue;
+      mapa.get(matriz.dias[d])!.set(usuarioId, {
+        turno: matriz.codigos[codigo],
+        es_reten: activo(reten, i),
+        modificado_manual: activo(manual, i),
+      });
+    }
+  });
+  return mapa;
+};
+
 // ✅ Corregido: mismo ajuste para cumpleaños
 export const asignarCumpleanosMes = async (year: number, monthZeroBased: number) => {
   const monthOneBased = monthZeroBased + 1;
@@ -41,4 +152,16 @@ export const asignarAusenciaRango = async (
     tipo
   });
   return response.data;
-};
\ No newline at end of file
+};
+// ✅ Exportación generada en el servidor (streaming); month en base 0 como el resto de la vista
+export const descargarTurnosMes = async (
+  year: number,
+  monthZeroBased: number,
+  formato: 'xlsx' | 'csv' = 'xlsx'
+) => {
+  const response = await api.get(`/turnos/mes/${year}/${monthZeroBased + 1}/export`, {
+    params: { formato },
+    responseType: 'blob',
+  });
+  return response.data as Blob;
+};
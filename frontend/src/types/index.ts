@@ -19,6 +19,24 @@ export interface Usuario {
   rol_id: number;
 }
 
+// Filtros de GET /usuarios (fechas "YYYY-MM-DD", extremos incluidos)
+export interface FiltrosUsuarios {
+  estado?: string;
+  rol_id?: number;
+  ingreso_desde?: string;
+  ingreso_hasta?: string;
+  salida_desde?: string;
+  salida_hasta?: string;
+  nombre?: string; // prefijo de nombres, apellidos o usuario
+}
+
+// Página de un listado paginado por cursor (GET /usuarios, GET /festivos)
+export interface Pagina<T> {
+  items: T[];
+  next_cursor: string | null;
+  total: number | null; // aproximado
+}
+
 export interface UsuarioCreate {
   nombres: string;
   apellidos: string;
@@ -31,6 +49,18 @@ export interface UsuarioCreate {
   rol_id: number;
 }
 
+// GET /turnos/mes/{y}/{m}?formato=matriz (JSON): celdas[u * dias.length + d] -> índice en codigos
+export interface MatrizTurnosMes {
+  year: number;
+  month: number;
+  usuarios: number[];
+  dias: string[];
+  codigos: string[];
+  celdas: number[];
+  es_reten: string;          // bits en base64 (LSB primero)
+  modificado_manual: string; // bits en base64 (LSB primero)
+}
+
 export interface Turno {
   id: number;
   usuario_id: number;
@@ -44,6 +74,34 @@ export interface Turno {
   updated_at: string;
 }
 
+// GET /turnos/cambios?desde=<cursor>: una entrada por celda con su último estado; eliminado = lápida
+export interface CambioTurno {
+  seq: number;
+  usuario_id: number;
+  fecha: string;
+  eliminado: boolean;
+  turno_id: number | null;
+  turno: string | null;
+  es_reten: boolean | null;
+  generado_automático: boolean | null;
+  modificado_manual: boolean | null;
+  estado: string | null;
+  registrado_at: string | null;
+}
+
+export interface CambiosTurnos {
+  cursor: number; // siguiente ?desde=
+  hay_mas: boolean;
+  cambios: CambioTurno[];
+}
+
+// Evento `cambios` de GET /turnos/stream: celdas [usuario_id, fecha, turno (null = borrada), turno_id, es_reten, modificado_manual]
+export interface LoteCambiosStream {
+  desde: number; // cursor anterior al lote: si no es el del cliente, falta algo y hay que pedir /turnos/cambios
+  cursor: number;
+  celdas: [number, string, string | null, number | null, boolean, boolean][];
+}
+
 export interface Ausencia {
   id: number;
   usuario_id: number;
@@ -56,7 +114,10 @@ export interface Ausencia {
 
 export interface Festivo {
   id: number;
-  dia_mes: string; // "DD/MM"
+  regla: 'fijo' | 'pascua' | 'unico';
+  dia_mes: string | null; // "DD/MM" (regla "fijo")
+  desplazamiento_pascua: number | null; // días respecto al Domingo de Pascua
+  fecha: string | null; // regla "unico"
   descripcion: string;
   tipo: string; // "Nacional" o "Madrid"
   estado: string;
@@ -64,8 +125,35 @@ export interface Festivo {
 }
 
 export interface FestivoCreate {
-  dia_mes: string;
+  regla?: 'fijo' | 'pascua' | 'unico';
+  dia_mes?: string | null;
+  desplazamiento_pascua?: number | null;
+  fecha?: string | null;
   descripcion: string;
   tipo: string;
   estado: string;
-}
\ No newline at end of file
+}
+
+export interface FestivoFecha {
+  fecha: string; // "YYYY-MM-DD"
+  festivo_id: number;
+  descripcion: string;
+  tipo: string;
+}
+
+// Trabajo en segundo plano (POST /jobs); progreso de 0 a 1
+export interface Trabajo {
+  id: number;
+  tipo: string;
+  parametros: Record<string, unknown>;
+  estado: 'pendiente' | 'en_curso' | 'completado' | 'error' | 'cancelado';
+  progreso: number;
+  mensaje: string | null;
+  cancelar: boolean;
+  error: string | null;
+  creado_at: string;
+  iniciado_at: string | null;
+  actualizado_at: string;
+  terminado_at: string | null;
+  resultado_url: string | null;
+}
@@ -1,6 +1,15 @@
 // src/utils/exportReportToExcel.ts
-export const exportReportToExcel = (data: any[], reportType: string, filtros: any) => {
-  // Implementación básica - puedes expandirla según necesites
-  console.log('Exportando reporte:', reportType, data,filtros);
-  alert('Función de exportación implementada');
-};
\ No newline at end of file
+import { saveAs } from "file-saver";
+import { descargarReporte } from "../services/reportesApi";
+
+type TipoReporte = "trabajados" | "turnos" | "festivos" | "vacaciones";
+
+// El libro lo genera el backend (GET /reportes/{tipo}/export); aquí solo se descarga
+export const exportReportToExcel = async (
+  reportType: TipoReporte,
+  filtros: { year: number; month?: number }
+) => {
+  const blob = await descargarReporte(reportType, filtros, "xlsx");
+  const periodo = filtros.month ? `${filtros.month}_${filtros.year}` : `${filtros.year}`;
+  saveAs(blob, `Reporte_${reportType}_${periodo}.xlsx`);
+};